@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from pathlib import Path
 
 from pydantic import Field
@@ -13,6 +14,7 @@ from rent_comparator.experiments import BestOfferFinder
 from rent_comparator.experiments import SearchCriteria
 from rent_comparator.experiments.criteria import FilterParams
 from rent_comparator.experiments.criteria import FilterType
+from rent_comparator.storage import OfferStore
 
 
 class ExperimentSettings(BaseSettings):
@@ -22,9 +24,17 @@ class ExperimentSettings(BaseSettings):
         default=Path("rent_comparator/data/extracted_parameters"),
         description="Folder with extracted offer parameters",
     )
+    store: Path | None = Field(
+        default=None,
+        description="Offer store to load offers from instead of data_folder",
+    )
     criteria: SearchCriteria = Field(
         default=SearchCriteria.TOTAL_COST, description="Search criteria"
     )
+    then_by: list[SearchCriteria] = Field(
+        default_factory=list,
+        description="Criteria breaking ties of the search criteria, in order",
+    )
     filters: list[FilterType] = Field(
         default_factory=list, description="Filters to apply"
     )
@@ -53,6 +63,20 @@ class ExperimentSettings(BaseSettings):
     max_area: PositiveFloat = Field(
         default=30.0, description="Maximum area in m² (outlier filter)"
     )
+    load_workers: PositiveInt = Field(
+        default=8, description="Threads reading offer files"
+    )
+    explain: bool = Field(
+        default=False, description="Print the filter plan of the query"
+    )
+    snapshot_folder: Path | None = Field(
+        default=Path("rent_comparator/data/offer_snapshot"),
+        description=(
+            "Folder of the binary offer snapshot reused between runs, "
+            "updated with changed offer files; null disables it (not used with"
+            " --store)"
+        ),
+    )
 
     model_config = SettingsConfigDict(
         cli_parse_args=True,
@@ -75,6 +99,8 @@ class ExperimentSettings(BaseSettings):
         """Run experiment to find best offers."""
         print("=== Finding Best Offers ===")
         print(f"Criteria: {self.criteria.value}")
+        if self.then_by:
+            print(f"Then by: {[c.value for c in self.then_by]}")
         print(f"Filters: {[f.value for f in self.filters]}")
         if self.exclude_locations:
             print(f"Exclude locations: {self.exclude_locations}")
@@ -87,14 +113,18 @@ class ExperimentSettings(BaseSettings):
         )
         print(f"Top N: {self.top_n}\n")
 
-        finder = BestOfferFinder(
-            self.data_folder,
-            min_rent=self.min_rent,
-            max_rent=self.max_rent,
-            min_area=self.min_area,
-            max_area=self.max_area,
-        )
-        finder.load_offers()
+        with OfferStore(self.store) if self.store else nullcontext() as store:
+            finder = BestOfferFinder(
+                self.data_folder,
+                min_rent=self.min_rent,
+                max_rent=self.max_rent,
+                min_area=self.min_area,
+                max_area=self.max_area,
+                store=store,
+                load_workers=self.load_workers,
+                snapshot_folder=self.snapshot_folder,
+            )
+            finder.load_offers()
 
         print(
             f"Loaded {len(finder.offers)} offers (after outlier filtering)\n"
@@ -110,11 +140,14 @@ class ExperimentSettings(BaseSettings):
             ),
             exclude_offers=self.exclude_offers,
         )
+        if self.explain:
+            print(finder.explain(filter_params) + "\n")
 
         best_offers = finder.find_best(
             criteria=self.criteria,
             filter_params=filter_params,
             top_n=self.top_n,
+            then_by=self.then_by,
         )
 
         print(f"=== Top {len(best_offers)} Offers ===\n")
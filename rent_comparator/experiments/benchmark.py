@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from pydantic import Field
+from pydantic import PositiveInt
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments import FilterParams
+from rent_comparator.experiments import SearchCriteria
+from rent_comparator.experiments.criteria import FilterType
+from rent_comparator.experiments.finder import OfferResult
+from rent_comparator.experiments.location_index import fold_location
+from rent_comparator.extraction import OfferParameters
+
+_LOCATIONS = (
+    "Krzyki",
+    "Fabryczna",
+    "Psie Pole",
+    "Śródmieście",
+    "Stare Miasto",
+)
+# (criteria, then_by) pairs benchmarked
+_ORDERINGS = (
+    (SearchCriteria.TOTAL_COST, ()),
+    (SearchCriteria.COST_PER_METER, ()),
+    (SearchCriteria.TOTAL_COST, (SearchCriteria.DEPOSIT,)),
+)
+_FILTER_PARAMS = (
+    FilterParams(filters=[FilterType.EXCLUDE_ONLY_WOMEN]),
+    FilterParams(include_locations=["srodmiescie", "Psie Pole"]),
+)
+
+
+_GETTERS: dict[SearchCriteria, Callable[[OfferResult], float | None]] = {
+    SearchCriteria.TOTAL_COST: lambda o: o.total_cost,
+    SearchCriteria.COST_PER_METER: lambda o: o.cost_per_meter,
+    SearchCriteria.RENT_PRICE: lambda o: o.parameters.rent_price,
+    SearchCriteria.DEPOSIT: lambda o: o.parameters.deposit,
+    SearchCriteria.MINIMAL_RENT_DURATION: (
+        lambda o: o.parameters.minimal_rent_duration_months
+    ),
+    SearchCriteria.AREA: lambda o: (
+        None if o.parameters.area is None else -o.parameters.area
+    ),
+}
+
+
+_FLAGS: dict[FilterType, Callable[[OfferParameters], bool]] = {
+    FilterType.INCLUDE_ONLY_STUDENTS: lambda p: p.only_for_students,
+    FilterType.EXCLUDE_ONLY_STUDENTS: lambda p: not p.only_for_students,
+    FilterType.INCLUDE_ONLY_WOMEN: lambda p: p.only_for_woman,
+    FilterType.EXCLUDE_ONLY_WOMEN: lambda p: not p.only_for_woman,
+    FilterType.INCLUDE_UTILITIES: lambda p: p.utilities_included is True,
+    FilterType.EXCLUDE_UTILITIES: lambda p: p.utilities_included is False,
+}
+
+
+def _in_locations(offer: OfferResult, folded_locations: list[str]) -> bool:
+    places = [
+        fold_location(offer.parameters.location or ""),
+        fold_location(offer.parameters.address or ""),
+    ]
+    return any(
+        location in place for location in folded_locations for place in places
+    )
+
+
+def _reference_filter(
+    offers: list[OfferResult], filter_params: FilterParams
+) -> list[OfferResult]:
+    """Python equivalent of the columnar filters, one offer at a time."""
+    flags = [_FLAGS[filter_type] for filter_type in filter_params.filters]
+    excluded = [
+        fold_location(location)
+        for location in filter_params.exclude_locations or ()
+    ]
+    included = [
+        fold_location(location)
+        for location in filter_params.include_locations or ()
+    ]
+    return [
+        offer
+        for offer in offers
+        if all(flag(offer.parameters) for flag in flags)
+        and offer.file_name not in filter_params.exclude_offers
+        and not (excluded and _in_locations(offer, excluded))
+        and (not included or _in_locations(offer, included))
+    ]
+
+
+def _reference_top(
+    offers: list[OfferResult],
+    ordering: list[SearchCriteria],
+    top_n: int,
+    use_heap: bool,
+) -> list[OfferResult]:
+    """Python equivalent of the columnar selection, by sort or heap."""
+    first = _GETTERS[ordering[0]]
+    ranked = [offer for offer in offers if first(offer) is not None]
+
+    def key(offer: OfferResult) -> tuple:
+        # Missing tie-breaking values rank last
+        return tuple(
+            (value is None, value or 0)
+            for value in (_GETTERS[c](offer) for c in ordering)
+        )
+
+    if use_heap:
+        return heapq.nsmallest(top_n, ranked, key=key)
+    return sorted(ranked, key=key)[:top_n]
+
+
+def _synthetic_offers(n: int, seed: int) -> list[OfferResult]:
+    """Offers with rounded prices, so many of them tie."""
+    rng = random.Random(seed)
+    offers = []
+    for i in range(n):
+        rent = rng.randrange(600, 4000, 50)
+        other = rng.randrange(0, 600, 50)
+        area = rng.choice([None, *range(8, 30)])
+        params = OfferParameters.model_construct(
+            rent_price=float(rent),
+            other_prices=float(other),
+            area=area,
+            rooms=None,
+            address=None,
+            location=rng.choice(_LOCATIONS),
+            floor=None,
+            total_floors=None,
+            available_from=None,
+            utilities_included=rng.choice([None, True, False]),
+            deposit=float(rng.randrange(0, 5000, 500)),
+            furnished=True,
+            only_for_woman=rng.random() < 0.1,
+            only_for_students=rng.random() < 0.1,
+            minimal_rent_duration_months=rng.choice([0, 3, 6, 12]),
+            media_included=None,
+        )
+        offers.append(
+            OfferResult.model_construct(
+                source="synthetic",
+                file_name=f"offer_{i}.json",
+                url=f"https://example.com/{i}",
+                parameters=params,
+                total_cost=float(rent + other),
+                cost_per_meter=(rent + other) / area if area else None,
+            )
+        )
+    return offers
+
+
+def _best_time(function: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class FindBestBenchmarkSettings(BaseSettings):
+    """Benchmark top N selection of find_best on synthetic offers."""
+
+    sizes: list[PositiveInt] = Field(
+        default_factory=lambda: [10_000, 100_000, 1_000_000],
+        description="Numbers of synthetic offers to benchmark",
+    )
+    top_n: PositiveInt = Field(default=10, description="Offers selected")
+    repeat: PositiveInt = Field(
+        default=3, description="Timing repetitions, the best one is reported"
+    )
+    seed: int = Field(default=0, description="Seed of the synthetic corpus")
+
+    def cli_cmd(self) -> None:
+        for n in self.sizes:
+            # Uncached, every repetition selects again
+            finder = BestOfferFinder(Path(), cache_size=0)
+            finder.offers = _synthetic_offers(n, self.seed)
+            start = time.perf_counter()
+            finder.columns
+            print(
+                f"\n=== {n} offers (index built in"
+                f" {time.perf_counter() - start:.2f}s) ==="
+            )
+            for (criteria, then_by), filter_params in itertools.product(
+                _ORDERINGS, _FILTER_PARAMS
+            ):
+                ordering = [criteria, *then_by]
+                selected = finder.find_best(
+                    criteria, filter_params, self.top_n, then_by
+                )
+                for use_heap in (False, True):
+                    expected = _reference_top(
+                        _reference_filter(finder.offers, filter_params),
+                        ordering,
+                        self.top_n,
+                        use_heap,
+                    )
+                    assert selected == expected, "selection differs"
+
+                sort_time, heap_time = (
+                    _best_time(
+                        lambda: _reference_top(
+                            _reference_filter(finder.offers, filter_params),
+                            ordering,
+                            self.top_n,
+                            use_heap,
+                        ),
+                        self.repeat,
+                    )
+                    for use_heap in (False, True)
+                )
+                columnar_time = _best_time(
+                    lambda: finder.find_best(
+                        criteria, filter_params, self.top_n, then_by
+                    ),
+                    self.repeat,
+                )
+                name = " then ".join(c.value for c in ordering)
+                if filter_params.include_locations:
+                    name += " in locations"
+                print(
+                    f"{name:<39} sort {sort_time * 1e3:8.1f} ms"
+                    f"  heap {heap_time * 1e3:8.1f} ms"
+                    f"  columnar {columnar_time * 1e3:6.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    CliApp.run(FindBestBenchmarkSettings)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+
+# Rows of steps evaluated on whole columns
+ALL_ROWS = slice(None)
+# Below this fraction of rows passing, the following steps are evaluated
+# on the passing rows only, gathering from a column costs more per row
+# than combining whole columns
+_SPARSE_FRACTION = 0.05
+
+
+class FilterStep(NamedTuple):
+    """One predicate of a filter plan.
+
+    ``keep`` maps rows to a bool array of the ones passing, ``selectivity``
+    is the fraction of all rows passing and ``cost`` the relative cost per
+    row evaluated.
+    """
+
+    description: str
+    selectivity: float
+    cost: float
+    keep: Callable[[np.ndarray | slice], np.ndarray]
+
+    @property
+    def rank(self) -> float:
+        """Cost per row removed, lower runs first."""
+        removed = 1 - self.selectivity
+        return self.cost / removed if removed > 0 else np.inf
+
+
+class FilterPlan:
+    """Filter predicates ordered to remove most rows for the least work.
+
+    Steps keeping every row are skipped. Steps run on whole columns until
+    few rows pass, then only on the rows still passing, stopping once
+    none are left. Selectivities of different steps are assumed to be
+    independent to estimate the result size.
+    """
+
+    def __init__(self, steps: list[FilterStep], n_rows: int):
+        self.n_rows = n_rows
+        self.steps = sorted(
+            (step for step in steps if step.selectivity < 1),
+            key=lambda step: step.rank,
+        )
+        self.skipped = [step for step in steps if step.selectivity >= 1]
+        # Rows left after each executed step
+        self.actual: list[int] = []
+
+    @property
+    def estimated_rows(self) -> float:
+        return self.n_rows * float(
+            np.prod([step.selectivity for step in self.steps])
+        )
+
+    def rows(self) -> np.ndarray:
+        """Sorted rows passing every step."""
+        self.actual = []
+        mask: np.ndarray | None = None
+        rows: np.ndarray | None = None
+        for step in self.steps:
+            if rows is None:
+                kept = step.keep(ALL_ROWS)
+                mask = kept if mask is None else mask & kept
+                count = int(np.count_nonzero(mask))
+                if count < self.n_rows * _SPARSE_FRACTION:
+                    rows = np.flatnonzero(mask)
+            else:
+                rows = rows[step.keep(rows)]
+                count = len(rows)
+            self.actual.append(count)
+            if not count:
+                break
+        if rows is not None:
+            return rows
+        return np.arange(self.n_rows) if mask is None else np.flatnonzero(mask)
+
+    def explain(self) -> str:
+        """Steps in execution order with their estimates and, once the
+        plan ran, the rows left after each of them."""
+        lines = [f"Filter plan over {self.n_rows} offers:"]
+        for i, step in enumerate(self.steps):
+            line = (
+                f"  {i + 1}. {step.description:<40}"
+                f" keeps {step.selectivity:7.2%}  cost {step.cost:g}"
+            )
+            if i < len(self.actual):
+                line += f"  -> {self.actual[i]} offers"
+            elif self.actual:
+                line += "  (not run, no offers left)"
+            lines.append(line)
+        lines.extend(
+            f"  skipped: {step.description} (keeps every offer)"
+            for step in self.skipped
+        )
+        lines.append(f"Estimated result: {self.estimated_rows:.0f} offers")
+        return "\n".join(lines)
@@ -1,14 +1,57 @@
 from __future__ import annotations
 
 import json
+import os
+import re
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 from pydantic import BaseModel
+from pydantic_core import from_json
 from rent_comparator.extraction.models import OfferParameters
+from rent_comparator.storage import OfferStore
 
 from .criteria import FilterParams
-from .criteria import FilterType
 from .criteria import SearchCriteria
+from .offer_columns import OfferColumns
+from .result_cache import query_key
+from .result_cache import QueryResultCache
+from .snapshot import file_stat
+from .snapshot import FileStat
+from .snapshot import OfferSnapshot
+from .snapshot import SnapshotOffer
+
+# Offer files read per thread pool task, amortizing the task overhead
+_LOAD_CHUNK_SIZE = 256
+# Scraped offers are saved with the URL first, ahead of the page text
+_URL_HEAD_BYTES = 4096
+_URL_FIELD = re.compile(rb'"url":\s*("(?:[^"\\]|\\.)*")')
+
+
+def _read_url(scraped_file: Path) -> str:
+    """URL of a scraped offer without reading its page text if possible."""
+    with scraped_file.open("rb") as file:
+        head = file.read(_URL_HEAD_BYTES)
+    match = _URL_FIELD.search(head)
+    if match is not None:
+        return json.loads(match.group(1))
+    return json.loads(scraped_file.read_text(encoding="utf-8"))["url"]
+
+
+def _indexed_urls(
+    scraped_data_folder: Path, source_name: str
+) -> dict[str, str]:
+    """File name to URL map from the scrapers' ``<source>_index.json``."""
+    index_file = scraped_data_folder / f"{source_name}_index.json"
+    if not index_file.exists():
+        return {}
+    index = json.loads(index_file.read_text(encoding="utf-8"))
+    return {file_name: url for url, file_name in index.items()}
 
 
 class OfferResult(BaseModel):
@@ -22,6 +65,28 @@ class OfferResult(BaseModel):
     cost_per_meter: float | None
 
 
+class _SnapshotOffers(Sequence[OfferResult]):
+    """Offers of snapshot rows, each built on first access."""
+
+    def __init__(self, snapshot: OfferSnapshot, rows: np.ndarray):
+        self.snapshot = snapshot
+        self.rows = rows
+        self._offers: dict[int, OfferResult] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        index = range(len(self))[index]
+        if index not in self._offers:
+            self._offers[index] = BestOfferFinder._offer_result(
+                *self.snapshot.offer(int(self.rows[index]))
+            )
+        return self._offers[index]
+
+
 class BestOfferFinder:
     """Finds best rental offers based on different criteria."""
 
@@ -32,168 +97,283 @@ class BestOfferFinder:
         max_rent: float = 10000.0,
         min_area: float = 5.0,
         max_area: float = 100.0,
+        store: OfferStore | None = None,
+        load_workers: int = 8,
+        snapshot_folder: Path | None = None,
+        cache_size: int = 256,
     ):
         self.data_folder = data_folder
         self.min_rent = min_rent
         self.max_rent = max_rent
         self.min_area = min_area
         self.max_area = max_area
-        self.offers: list[OfferResult] = []
+        self.store = store
+        self.load_workers = load_workers
+        self.snapshot_folder = snapshot_folder
+        self.offers: Sequence[OfferResult] = []
+        self._columns: OfferColumns | None = None
+        # Bumped whenever offers change, invalidating cached results
+        self.version = 0
+        self.result_cache = QueryResultCache(cache_size)
 
-    def load_offers(self) -> None:
-        """Load all extracted offers from data folder."""
-        self.offers = []
-        scraped_data_folder = self.data_folder.parent / "rent_prices"
+    def _is_outlier(self, total_price: float, area: float | None) -> bool:
+        if total_price < self.min_rent or total_price > self.max_rent:
+            return True
+        return area is None or area < self.min_area or area > self.max_area
 
-        for source_folder in self.data_folder.iterdir():
-            if not source_folder.is_dir():
-                continue
+    def _is_raw_outlier(self, data: dict[str, Any]) -> bool:
+        """Outlier check on parsed but not validated parameters.
+
+        Values that do not convert are left for validation to report.
+        """
+        try:
+            area = data.get("area")
+            return self._is_outlier(
+                float(data["rent_price"]) + float(data.get("other_prices", 0)),
+                None if area is None else float(area),
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return False
+
+    def _parse_parameters(
+        self, content: str | bytes, skip_outliers: bool = True
+    ) -> OfferParameters | None:
+        """Validated parameters, or None for outliers, which are skipped
+        before the model is built."""
+        data = from_json(content)
+        if skip_outliers and self._is_raw_outlier(data):
+            return None
+        return OfferParameters.model_validate(data)
 
-            source_name = source_folder.name
+    @staticmethod
+    def _offer_result(
+        source_name: str, file_name: str, url: str, params: OfferParameters
+    ) -> OfferResult:
+        cost_per_meter = (
+            params.total_price / params.area
+            if params.area and params.area > 0
+            else None
+        )
+        return OfferResult(
+            source=source_name,
+            file_name=file_name,
+            url=url,
+            parameters=params,
+            total_cost=params.total_price,
+            cost_per_meter=cost_per_meter,
+        )
+
+    def add_offer(
+        self,
+        source_name: str,
+        file_name: str,
+        url: str,
+        params: OfferParameters,
+    ) -> OfferResult | None:
+        """Add one extracted offer unless it is an outlier."""
+        if self._is_outlier(params.total_price, params.area):
+            return None
+        offer = self._offer_result(source_name, file_name, url, params)
+        if not isinstance(self.offers, list):
+            # Offers loaded lazily from a snapshot
+            self.offers = list(self.offers)
+        self.offers.append(offer)
+        self._columns = None
+        self.version += 1
+        return offer
 
-            for offer_file in source_folder.glob("*.json"):
-                data = json.loads(offer_file.read_text(encoding="utf-8"))
-                params = OfferParameters(**data)
+    @property
+    def columns(self) -> OfferColumns:
+        """Columnar index of ``offers``, rebuilt after offers change."""
+        if self._columns is None or len(self._columns) != len(self.offers):
+            self._columns = OfferColumns(self.offers)
+            self.version += 1
+        return self._columns
 
-                # Filter outliers
-                if (
-                    params.total_price < self.min_rent
-                    or params.total_price > self.max_rent
+    def _load_offer_files(
+        self,
+        offer_files: list[Path],
+        scraped_folder: Path,
+        urls: dict[str, str],
+        skip_outliers: bool,
+    ) -> list[tuple[str, str, OfferParameters]]:
+        loaded = []
+        for offer_file in offer_files:
+            params = self._parse_parameters(
+                offer_file.read_bytes(), skip_outliers
+            )
+            if params is None:
+                continue
+            url = urls.get(offer_file.name) or _read_url(
+                scraped_folder / offer_file.name
+            )
+            loaded.append((offer_file.name, url, params))
+        return loaded
+
+    def _load_source(
+        self,
+        executor: Executor,
+        source_name: str,
+        offer_files: list[Path],
+        skip_outliers: bool = True,
+    ) -> Iterator[tuple[str, str, OfferParameters]]:
+        """Yield ``(file name, URL, parameters)`` of ``offer_files``, read
+        in chunks by ``executor``."""
+        scraped_data_folder = self.data_folder.parent / "rent_prices"
+        scraped_folder = scraped_data_folder / source_name
+        urls = _indexed_urls(scraped_data_folder, source_name)
+        chunks = [
+            offer_files[i : i + _LOAD_CHUNK_SIZE]
+            for i in range(0, len(offer_files), _LOAD_CHUNK_SIZE)
+        ]
+        for loaded in executor.map(
+            lambda chunk: self._load_offer_files(
+                chunk, scraped_folder, urls, skip_outliers
+            ),
+            chunks,
+        ):
+            yield from loaded
+
+    def _offer_file_stats(self) -> dict[str, FileStat]:
+        """``<source>/<file name>`` of every offer file with its stat."""
+        stats = {}
+        for source_entry in os.scandir(self.data_folder):
+            if not source_entry.is_dir():
+                continue
+            for entry in os.scandir(source_entry.path):
+                if entry.name.endswith(".json") and not entry.name.startswith(
+                    "."
                 ):
-                    continue
-                if params.area is None or (
-                    params.area < self.min_area or params.area > self.max_area
+                    stats[f"{source_entry.name}/{entry.name}"] = file_stat(
+                        entry
+                    )
+        return stats
+
+    def _load_snapshot_offers(self, keys: list[str]) -> list[SnapshotOffer]:
+        """Offers of the ``<source>/<file name>`` keys, outliers included."""
+        files_by_source: dict[str, list[Path]] = {}
+        for key in keys:
+            source_name = key.split("/", 1)[0]
+            files_by_source.setdefault(source_name, []).append(
+                self.data_folder / key
+            )
+        offers = {}
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            for source_name, offer_files in files_by_source.items():
+                for file_name, url, params in self._load_source(
+                    executor, source_name, offer_files, skip_outliers=False
                 ):
-                    continue
+                    offers[f"{source_name}/{file_name}"] = SnapshotOffer(
+                        source_name, file_name, url, params
+                    )
+        return [offers[key] for key in keys]
+
+    def _load_from_snapshot(self) -> None:
+        snapshot, _ = OfferSnapshot.refresh(
+            self.snapshot_folder,
+            self._offer_file_stats(),
+            self._load_snapshot_offers,
+        )
+        total_price = (
+            snapshot.rows["rent_price"] + snapshot.rows["other_prices"]
+        )
+        area = snapshot.rows["area"]
+        # NaN areas compare false, so offers without area are outliers too
+        rows = np.flatnonzero(
+            (total_price >= self.min_rent)
+            & (total_price <= self.max_rent)
+            & (area >= self.min_area)
+            & (area <= self.max_area)
+        )
+        self.offers = _SnapshotOffers(snapshot, rows)
+        self._columns = OfferColumns.from_snapshot(self.offers, snapshot, rows)
+
+    def source_state(self) -> object:
+        """Value that differs once the offers ``load_offers`` reads change."""
+        if self.store is not None:
+            return self.store.data_version()
+        return self._offer_file_stats()
+
+    def load_offers(self) -> None:
+        """Load all extracted offers from the store or data folder.
 
-                # Load URL from scraped data
-                scraped_file = (
-                    scraped_data_folder / source_name / offer_file.name
-                )
-                scraped_data = json.loads(
-                    scraped_file.read_text(encoding="utf-8")
-                )
-                url = scraped_data["url"]
-
-                cost_per_meter = (
-                    params.total_price / params.area
-                    if params.area and params.area > 0
-                    else None
-                )
-
-                self.offers.append(
-                    OfferResult(
-                        source=source_name,
-                        file_name=offer_file.name,
-                        url=url,
-                        parameters=params,
-                        total_cost=params.total_price,
-                        cost_per_meter=cost_per_meter,
+        Offer files are read in chunks by a pool of ``load_workers``
+        threads. URLs come from the scrapers' URL index when it lists the
+        offer, otherwise from the start of the scraped file, so page text
+        is not read.
+
+        With ``snapshot_folder`` set, offers come from a binary snapshot
+        there; only offer files added or modified since it was written are
+        read, and offers are built when first accessed.
+        """
+        self.offers = []
+        self._columns = None
+        self.version += 1
+
+        if self.store is not None:
+            for stored in self.store.iter_extracted():
+                params = self._parse_parameters(stored.parameters)
+                if params is not None:
+                    self.add_offer(
+                        stored.source,
+                        f"{stored.offer_id}.json",
+                        stored.url,
+                        params,
                     )
-                )
+            return
+
+        if self.snapshot_folder is not None:
+            self._load_from_snapshot()
+            return
+
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            for source_folder in self.data_folder.iterdir():
+                if not source_folder.is_dir():
+                    continue
+                for file_name, url, params in self._load_source(
+                    executor,
+                    source_folder.name,
+                    list(source_folder.glob("*.json")),
+                ):
+                    self.add_offer(source_folder.name, file_name, url, params)
 
     @staticmethod
     def apply_filters(
-        offers: list[OfferResult], filter_params: FilterParams
+        offers: Sequence[OfferResult], filter_params: FilterParams
     ) -> list[OfferResult]:
-        """Apply filters to offers list."""
-        filtered = offers
-
-        for filter_type in filter_params.filters:
-            if filter_type == FilterType.INCLUDE_ONLY_STUDENTS:
-                filtered = [
-                    o for o in filtered if o.parameters.only_for_students
-                ]
-            elif filter_type == FilterType.EXCLUDE_ONLY_STUDENTS:
-                filtered = [
-                    o for o in filtered if not o.parameters.only_for_students
-                ]
-            elif filter_type == FilterType.INCLUDE_ONLY_WOMEN:
-                filtered = [o for o in filtered if o.parameters.only_for_woman]
-            elif filter_type == FilterType.EXCLUDE_ONLY_WOMEN:
-                filtered = [
-                    o for o in filtered if not o.parameters.only_for_woman
-                ]
-            elif filter_type == FilterType.INCLUDE_UTILITIES:
-                filtered = [
-                    o
-                    for o in filtered
-                    if o.parameters.utilities_included is True
-                ]
-            elif filter_type == FilterType.EXCLUDE_UTILITIES:
-                filtered = [
-                    o
-                    for o in filtered
-                    if o.parameters.utilities_included is False
-                ]
-
-        if filter_params.exclude_locations:
-            filtered = [
-                o
-                for o in filtered
-                if not any(
-                    excluded.lower() in (o.parameters.location or "").lower()
-                    or excluded.lower() in (o.parameters.address or "").lower()
-                    for excluded in filter_params.exclude_locations
-                )
-            ]
-
-        if filter_params.include_locations:
-            filtered = [
-                o
-                for o in filtered
-                if any(
-                    included.lower() in (o.parameters.location or "").lower()
-                    or included.lower() in (o.parameters.address or "").lower()
-                    for included in filter_params.include_locations
-                )
-            ]
-
-        if filter_params.exclude_offers:
-            filtered = [
-                o
-                for o in filtered
-                if o.file_name not in filter_params.exclude_offers
-            ]
-
-        return filtered
+        """Offers passing every filter of ``filter_params``, in order."""
+        return [
+            offers[row] for row in OfferColumns(offers).rows(filter_params)
+        ]
 
     def find_best(
         self,
         criteria: SearchCriteria,
         filter_params: FilterParams,
         top_n: int = 10,
+        then_by: Sequence[SearchCriteria] = (),
     ) -> list[OfferResult]:
-        """Find best offers based on criteria."""
-        filtered_offers = self.apply_filters(self.offers, filter_params)
-
-        if criteria == SearchCriteria.TOTAL_COST:
-            sorted_offers = sorted(filtered_offers, key=lambda o: o.total_cost)
-        elif criteria == SearchCriteria.COST_PER_METER:
-            sorted_offers = sorted(
-                [o for o in filtered_offers if o.cost_per_meter is not None],
-                key=lambda o: o.cost_per_meter,
-            )
-        elif criteria == SearchCriteria.RENT_PRICE:
-            sorted_offers = sorted(
-                filtered_offers, key=lambda o: o.parameters.rent_price
-            )
-        elif criteria == SearchCriteria.DEPOSIT:
-            sorted_offers = sorted(
-                filtered_offers, key=lambda o: o.parameters.deposit
-            )
-        elif criteria == SearchCriteria.MINIMAL_RENT_DURATION:
-            sorted_offers = sorted(
-                filtered_offers,
-                key=lambda o: o.parameters.minimal_rent_duration_months,
-            )
-        elif criteria == SearchCriteria.AREA:
-            sorted_offers = sorted(
-                [o for o in filtered_offers if o.parameters.area is not None],
-                key=lambda o: o.parameters.area,
-                reverse=True,
-            )
-        else:
-            sorted_offers = filtered_offers
+        """Find best offers based on criteria.
+
+        Ties are broken by the ``then_by`` criteria in order and then by
+        load order. Filters and top N selection run on the columnar index
+        of ``offers``; results are cached until offers change.
+        """
+        columns = self.columns
+        key = query_key(criteria, filter_params, top_n, then_by)
+        cached = self.result_cache.get(key, self.version)
+        if cached is not None:
+            return list(cached)
+        rows = columns.top_rows(
+            [criteria, *then_by], columns.rows(filter_params), top_n
+        )
+        best = [self.offers[row] for row in rows]
+        self.result_cache.put(key, self.version, best)
+        return best
 
-        return sorted_offers[:top_n]
+    def explain(self, filter_params: FilterParams) -> str:
+        """Filter plan ``find_best`` uses for ``filter_params``, with the
+        offers left after each step."""
+        plan = self.columns.plan(filter_params)
+        plan.rows()
+        return plan.explain()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+
+# Letters that do not decompose into a base letter and a diacritic
+_UNDECOMPOSED = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ß": "ss"})
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def fold_location(text: str) -> str:
+    """Casefolded ``text`` without diacritics, with punctuation and
+    whitespace runs collapsed to single spaces."""
+    text = text.casefold()
+    if not text.isascii():
+        text = _COMBINING.sub(
+            "", unicodedata.normalize("NFKD", text.translate(_UNDECOMPOSED))
+        )
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+class LocationIndex:
+    """Token index of folded place texts for substring search.
+
+    A place is a ``"\\0"``-separated location and address; each part is
+    folded by :func:`fold_location`, so a query only matches within one of
+    them. Every token of a folded query occurs in a token of each matching
+    place, so only places reached from the token vocabulary are checked
+    for a multi-token query. The matches of the ``cache_size`` most
+    recently used queries are kept, lookups may come from several threads.
+    """
+
+    def __init__(self, places: Sequence[str], cache_size: int = 256):
+        self.places = [
+            "\0".join(fold_location(part) for part in place.split("\0"))
+            for place in places
+        ]
+        self._postings: dict[str, list[int]] = {}
+        for place_id, place in enumerate(self.places):
+            for token in set(place.replace("\0", " ").split()):
+                self._postings.setdefault(token, []).append(place_id)
+        self.cache_size = cache_size
+        self._matches: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _token_matches(self, query_token: str) -> np.ndarray:
+        place_ids = [
+            place_ids
+            for token, place_ids in self._postings.items()
+            if query_token in token
+        ]
+        if not place_ids:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(place_ids))
+
+    def _search(self, query: str) -> np.ndarray:
+        query_tokens = query.split()
+        if not query_tokens:
+            return np.arange(len(self.places))
+        candidates = self._token_matches(query_tokens[0])
+        if len(query_tokens) == 1:
+            # Tokens are split at every separator, so a single token
+            # query is in a place exactly when it is in one of its tokens
+            return candidates
+        for query_token in query_tokens[1:]:
+            candidates = np.intersect1d(
+                candidates, self._token_matches(query_token)
+            )
+        return np.array(
+            [
+                place_id
+                for place_id in candidates
+                if query in self.places[place_id]
+            ],
+            dtype=np.intp,
+        )
+
+    def matching(self, location: str) -> np.ndarray:
+        """Ids of the places containing ``location``, cached per query."""
+        query = fold_location(location)
+        with self._lock:
+            place_ids = self._matches.get(query)
+            if place_ids is not None:
+                self._matches.move_to_end(query)
+                return place_ids
+        place_ids = self._search(query)
+        with self._lock:
+            if self.cache_size:
+                self._matches[query] = place_ids
+                self._matches.move_to_end(query)
+                if len(self._matches) > self.cache_size:
+                    self._matches.popitem(last=False)
+        return place_ids
+
+    def mask(self, locations: Sequence[str]) -> np.ndarray:
+        """Places containing any of ``locations``."""
+        place_mask = np.zeros(len(self.places), dtype=bool)
+        for location in locations:
+            place_mask[self.matching(location)] = True
+        return place_mask
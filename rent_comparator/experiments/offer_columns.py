@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import functools
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .criteria import FilterParams
+from .criteria import FilterType
+from .criteria import SearchCriteria
+from .filter_plan import FilterPlan
+from .filter_plan import FilterStep
+from .location_index import LocationIndex
+
+if TYPE_CHECKING:
+    from rent_comparator.extraction.models import OfferParameters
+
+    from .finder import OfferResult
+    from .snapshot import OfferSnapshot
+
+
+def place_key(params: OfferParameters) -> str:
+    """Lowercased location and address searched by location filters."""
+    return f"{params.location or ''}\0{params.address or ''}".lower()
+
+
+class OfferColumns:
+    """Columnar copy of offers for vectorized filtering and sorting.
+
+    Numeric fields are float arrays with NaN for missing values, boolean
+    flags are bool arrays and row ``i`` belongs to ``offers[i]``. Location
+    filters search a token index of the distinct places, ignoring case
+    and diacritics. Filters run as a :class:`FilterPlan` ordered by the
+    fraction of offers each keeps.
+    """
+
+    def __init__(self, offers: Sequence[OfferResult]):
+        self.offers = offers
+        parameters = [offer.parameters for offer in offers]
+        self.total_cost = np.array(
+            [offer.total_cost for offer in offers], dtype=float
+        )
+        self.cost_per_meter = np.array(
+            [
+                (
+                    np.nan
+                    if offer.cost_per_meter is None
+                    else offer.cost_per_meter
+                )
+                for offer in offers
+            ],
+            dtype=float,
+        )
+        self.rent_price = np.array(
+            [p.rent_price for p in parameters], dtype=float
+        )
+        self.deposit = np.array([p.deposit for p in parameters], dtype=float)
+        self.minimal_rent_duration = np.array(
+            [p.minimal_rent_duration_months for p in parameters], dtype=float
+        )
+        self.area = np.array(
+            [np.nan if p.area is None else p.area for p in parameters],
+            dtype=float,
+        )
+        self.only_for_students = np.array(
+            [p.only_for_students for p in parameters], dtype=bool
+        )
+        self.only_for_woman = np.array(
+            [p.only_for_woman for p in parameters], dtype=bool
+        )
+        self.utilities_included = np.array(
+            [p.utilities_included is True for p in parameters], dtype=bool
+        )
+        self.utilities_excluded = np.array(
+            [p.utilities_included is False for p in parameters], dtype=bool
+        )
+        # Offers share few distinct places, substrings are searched in
+        # those and mapped back to rows
+        places: dict[str, int] = {}
+        self.place_ids = np.array(
+            [places.setdefault(place_key(p), len(places)) for p in parameters],
+            dtype=np.intp,
+        )
+        self.places = list(places)
+        self._file_names = lambda: (offer.file_name for offer in offers)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        offers: Sequence[OfferResult],
+        snapshot: OfferSnapshot,
+        rows: np.ndarray,
+    ) -> OfferColumns:
+        """Columns of the snapshot ``rows`` that ``offers`` were read from,
+        without building the offers."""
+        data = snapshot.rows[rows]
+        columns = cls.__new__(cls)
+        columns.offers = offers
+        columns.total_cost = data["rent_price"] + data["other_prices"]
+        columns.rent_price = np.array(data["rent_price"])
+        columns.deposit = np.array(data["deposit"])
+        columns.minimal_rent_duration = np.array(data["minimal_rent_duration"])
+        columns.area = np.array(data["area"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns.cost_per_meter = np.where(
+                columns.area > 0, columns.total_cost / columns.area, np.nan
+            )
+        columns.only_for_students = np.array(data["only_for_students"])
+        columns.only_for_woman = np.array(data["only_for_woman"])
+        columns.utilities_included = data["utilities_included"] == 1
+        columns.utilities_excluded = data["utilities_included"] == 0
+        columns.place_ids = data["place_id"].astype(np.intp)
+        columns.places = snapshot.places
+        columns._file_names = lambda: map(snapshot.file_name, rows)
+        return columns
+
+    def __len__(self) -> int:
+        # Not of offers, which may be the finder's list growing after this
+        return len(self.total_cost)
+
+    @functools.cached_property
+    def rows_by_file_name(self) -> dict[str, list[int]]:
+        rows_by_file_name: dict[str, list[int]] = {}
+        for row, file_name in enumerate(self._file_names()):
+            rows_by_file_name.setdefault(file_name, []).append(row)
+        return rows_by_file_name
+
+    @functools.cached_property
+    def location_index(self) -> LocationIndex:
+        return LocationIndex(self.places)
+
+    @functools.cached_property
+    def _flags(self) -> dict[FilterType, tuple[np.ndarray, bool, float]]:
+        """Column, whether it is negated and fraction of offers passing of
+        every flag filter."""
+        flags = {}
+        for include, exclude, column in (
+            (
+                FilterType.INCLUDE_ONLY_STUDENTS,
+                FilterType.EXCLUDE_ONLY_STUDENTS,
+                self.only_for_students,
+            ),
+            (
+                FilterType.INCLUDE_ONLY_WOMEN,
+                FilterType.EXCLUDE_ONLY_WOMEN,
+                self.only_for_woman,
+            ),
+        ):
+            fraction = float(column.mean()) if len(self) else 0.0
+            flags[include] = (column, False, fraction)
+            flags[exclude] = (column, True, 1 - fraction)
+        for filter_type, column in (
+            (FilterType.INCLUDE_UTILITIES, self.utilities_included),
+            (FilterType.EXCLUDE_UTILITIES, self.utilities_excluded),
+        ):
+            fraction = float(column.mean()) if len(self) else 0.0
+            flags[filter_type] = (column, False, fraction)
+        return flags
+
+    @functools.cached_property
+    def _place_counts(self) -> np.ndarray:
+        return np.bincount(self.place_ids, minlength=len(self.places))
+
+    def _flag_step(self, filter_type: FilterType) -> FilterStep:
+        column, negated, fraction = self._flags[filter_type]
+        return FilterStep(
+            filter_type.value,
+            fraction,
+            1,
+            (lambda rows: ~column[rows]) if negated else column.__getitem__,
+        )
+
+    def _location_step(
+        self, locations: list[str], include: bool
+    ) -> FilterStep:
+        key = tuple(sorted(set(locations)))
+        place_mask = self.location_index.mask(key)
+        fraction = (
+            self._place_counts[place_mask].sum() / len(self)
+            if len(self)
+            else 0
+        )
+
+        def keep(rows: np.ndarray | slice) -> np.ndarray:
+            matches = place_mask[self.place_ids[rows]]
+            return matches if include else ~matches
+
+        return FilterStep(
+            f"{'include' if include else 'exclude'}_locations {list(key)}",
+            fraction if include else 1 - fraction,
+            2,
+            keep,
+        )
+
+    def _exclude_offers_step(self, names: Iterable[str]) -> FilterStep:
+        excluded = np.array(
+            sorted(
+                row
+                for name in names
+                for row in self.rows_by_file_name.get(name, ())
+            ),
+            dtype=np.intp,
+        )
+
+        def keep(rows: np.ndarray | slice) -> np.ndarray:
+            if isinstance(rows, slice):
+                mask = np.ones(len(self), dtype=bool)
+                mask[excluded] = False
+                return mask
+            return np.isin(rows, excluded, invert=True)
+
+        return FilterStep(
+            f"exclude_offers ({len(excluded)} offers)",
+            1 - len(excluded) / len(self) if len(self) else 0,
+            4,
+            keep,
+        )
+
+    def plan(self, filter_params: FilterParams) -> FilterPlan:
+        """Plan of the filters of ``filter_params``, ordered by the
+        fraction of offers each keeps and its cost."""
+        steps = [
+            self._flag_step(filter_type)
+            for filter_type in dict.fromkeys(filter_params.filters)
+        ]
+        if filter_params.exclude_locations:
+            steps.append(
+                self._location_step(filter_params.exclude_locations, False)
+            )
+        if filter_params.include_locations:
+            steps.append(
+                self._location_step(filter_params.include_locations, True)
+            )
+        if filter_params.exclude_offers:
+            steps.append(
+                self._exclude_offers_step(filter_params.exclude_offers)
+            )
+        return FilterPlan(steps, len(self))
+
+    def rows(self, filter_params: FilterParams) -> np.ndarray:
+        """Sorted rows passing every filter of ``filter_params``."""
+        return self.plan(filter_params).rows()
+
+    def sort_key(self, criteria: SearchCriteria) -> np.ndarray | None:
+        """Ascending sort key, NaN for offers the criteria cannot rank."""
+        if criteria == SearchCriteria.TOTAL_COST:
+            return self.total_cost
+        if criteria == SearchCriteria.COST_PER_METER:
+            return self.cost_per_meter
+        if criteria == SearchCriteria.RENT_PRICE:
+            return self.rent_price
+        if criteria == SearchCriteria.DEPOSIT:
+            return self.deposit
+        if criteria == SearchCriteria.MINIMAL_RENT_DURATION:
+            return self.minimal_rent_duration
+        if criteria == SearchCriteria.AREA:
+            # Largest first
+            return -self.area
+        return None
+
+    def top_rows(
+        self,
+        criteria: Sequence[SearchCriteria],
+        rows: np.ndarray,
+        top_n: int,
+    ) -> np.ndarray:
+        """The ``top_n`` best of the sorted ``rows``.
+
+        Offers are ordered by the first criteria, ties are broken by the
+        following ones and then by row like a stable sort. Offers the
+        first criteria cannot rank are left out, the others are ranked
+        last by a tie-breaking criteria they lack. Only the offers tied
+        with or better than the ``top_n``-th one are sorted.
+        """
+        keys = [
+            key
+            for criterion in criteria
+            if (key := self.sort_key(criterion)) is not None
+        ]
+        if not keys:
+            return rows[:top_n]
+        rows = rows[~np.isnan(keys[0][rows])]
+        primary = keys[0][rows]
+        if top_n < len(rows):
+            kth = np.partition(primary, top_n - 1)[top_n - 1]
+            rows = rows[primary <= kth]
+        # lexsort sorts by the last key first
+        order = np.lexsort((rows, *(key[rows] for key in reversed(keys))))
+        return rows[order][:top_n]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from .criteria import FilterParams
+from .criteria import SearchCriteria
+from .location_index import fold_location
+
+if TYPE_CHECKING:
+    from .finder import OfferResult
+
+
+def _locations_key(locations: list[str] | None) -> tuple[str, ...]:
+    return tuple(
+        sorted({fold_location(location) for location in locations or ()})
+    )
+
+
+def query_key(
+    criteria: SearchCriteria,
+    filter_params: FilterParams,
+    top_n: int,
+    then_by: Sequence[SearchCriteria] = (),
+) -> Hashable:
+    """Key equal for queries that always select the same offers.
+
+    Filters are combined with AND and locations are matched folded, so
+    their order, duplicates and case do not matter; only the names of
+    excluded offers are used. A tie-breaking criteria repeating an earlier
+    one is dropped.
+    """
+    return (
+        tuple(dict.fromkeys([criteria, *then_by])),
+        tuple(sorted(set(filter_params.filters))),
+        _locations_key(filter_params.exclude_locations),
+        _locations_key(filter_params.include_locations),
+        tuple(sorted(filter_params.exclude_offers)),
+        top_n,
+    )
+
+
+class QueryResultCache:
+    """LRU cache of ``find_best`` results for one dataset version.
+
+    Looking up a different version than the cached results belong to
+    clears the cache. Lookups may come from several threads.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._version: int | None = None
+        self._results: OrderedDict[Hashable, tuple[OfferResult, ...]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(
+        self, key: Hashable, version: int
+    ) -> tuple[OfferResult, ...] | None:
+        with self._lock:
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(
+        self, key: Hashable, version: int, result: Sequence[OfferResult]
+    ) -> None:
+        with self._lock:
+            if version != self._version or self.max_size == 0:
+                return
+            self._results[key] = tuple(result)
+            self._results.move_to_end(key)
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from rent_comparator.extraction.models import OfferParameters
+
+from .offer_columns import place_key
+
+_VERSION = 2
+_ARRAYS = ("rows", "strings", "offsets")
+# Source, file name, URL and parameters JSON of every row
+_STRINGS_PER_ROW = 4
+_ROW_DTYPE = np.dtype(
+    [
+        ("rent_price", "f8"),
+        ("other_prices", "f8"),
+        ("area", "f8"),
+        ("deposit", "f8"),
+        ("minimal_rent_duration", "f8"),
+        # 1 included, 0 not included, -1 unknown
+        ("utilities_included", "i1"),
+        ("only_for_students", "?"),
+        ("only_for_woman", "?"),
+        ("place_id", "i4"),
+    ]
+)
+
+
+class SnapshotOffer(NamedTuple):
+    source: str
+    file_name: str
+    url: str
+    parameters: OfferParameters
+
+
+class FileStat(NamedTuple):
+    mtime_ns: int
+    size: int
+
+
+def file_stat(path: Path | os.DirEntry) -> FileStat:
+    stat = path.stat()
+    return FileStat(stat.st_mtime_ns, stat.st_size)
+
+
+def _array_file(name: str, generation: int) -> str:
+    return f"{name}-{generation}.npy"
+
+
+def _generation(folder: Path) -> int:
+    """Generation of the snapshot in ``folder``, 0 if there is none."""
+    try:
+        manifest = json.loads((folder / "manifest.json").read_text())
+        return int(manifest.get("generation", 0))
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class OfferSnapshot:
+    """Binary copy of every loaded offer, before outlier filtering.
+
+    Numeric and flag fields form a memory-mapped structured array and
+    strings are kept in one UTF-8 blob with offsets, so opening a snapshot
+    reads only its small manifest. Rows are tied to the modification time
+    and size of the file they were loaded from.
+
+    Every save writes arrays under a new generation number and then
+    switches the manifest to them, so arrays a loaded snapshot maps are
+    never overwritten.
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        strings: np.ndarray,
+        offsets: np.ndarray,
+        places: list[str],
+        files: list[tuple[str, FileStat]],
+    ):
+        self.rows = rows
+        self.strings = strings
+        self.offsets = offsets
+        self.places = places
+        self.files = files
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def string(self, row: int, field: int) -> str:
+        i = row * _STRINGS_PER_ROW + field
+        return bytes(
+            self.strings[self.offsets[i] : self.offsets[i + 1]]
+        ).decode()
+
+    def file_name(self, row: int) -> str:
+        return self.string(row, 1)
+
+    def offer(self, row: int) -> SnapshotOffer:
+        source, file_name, url, parameters = (
+            self.string(row, field) for field in range(_STRINGS_PER_ROW)
+        )
+        return SnapshotOffer(
+            source,
+            file_name,
+            url,
+            OfferParameters.model_validate_json(parameters),
+        )
+
+    @classmethod
+    def load(cls, folder: Path) -> OfferSnapshot | None:
+        """Open the snapshot in ``folder``, None if missing or invalid."""
+        try:
+            manifest = json.loads((folder / "manifest.json").read_text())
+            if manifest["version"] != _VERSION:
+                return None
+            rows, strings, offsets = (
+                np.load(
+                    folder / _array_file(name, manifest["generation"]),
+                    mmap_mode="r",
+                )
+                for name in _ARRAYS
+            )
+            snapshot = cls(
+                rows=rows,
+                strings=strings,
+                offsets=offsets,
+                places=manifest["places"],
+                files=[
+                    (key, FileStat(*stat)) for key, stat in manifest["files"]
+                ],
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+        if (
+            snapshot.rows.dtype != _ROW_DTYPE
+            or len(snapshot.files) != len(snapshot)
+            or len(snapshot.offsets) != len(snapshot) * _STRINGS_PER_ROW + 1
+        ):
+            return None
+        return snapshot
+
+    def save(self, folder: Path) -> None:
+        """Write the arrays of a new generation, then the manifest, and
+        delete the arrays of older generations that are not open."""
+        folder.mkdir(parents=True, exist_ok=True)
+        generation = _generation(folder) + 1
+        array_files = [_array_file(name, generation) for name in _ARRAYS]
+        for array_file, array in zip(
+            array_files, (self.rows, self.strings, self.offsets)
+        ):
+            np.save(folder / array_file, array)
+        tmp_path = folder / "manifest.tmp.json"
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "version": _VERSION,
+                    "generation": generation,
+                    "places": self.places,
+                    "files": self.files,
+                },
+                ensure_ascii=False,
+            )
+        )
+        tmp_path.replace(folder / "manifest.json")
+        for path in folder.glob("*.npy"):
+            if path.name in array_files:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                # Still mapped on Windows, deleted by a later save
+                pass
+
+    @classmethod
+    def _build(
+        cls,
+        previous: OfferSnapshot | None,
+        kept: np.ndarray,
+        offers: Iterable[tuple[SnapshotOffer, str, FileStat]],
+    ) -> OfferSnapshot:
+        """Snapshot of the ``kept`` rows of ``previous`` and new
+        ``(offer, file key, file stat)``."""
+        places: dict[str, int] = {}
+        row_arrays = []
+        strings: list[bytes] = []
+        lengths = []
+        files = []
+        if previous is not None and len(kept):
+            place_ids = np.array(
+                [
+                    places.setdefault(place, len(places))
+                    for place in previous.places
+                ],
+                dtype=np.int32,
+            )
+            rows = previous.rows[kept]
+            rows["place_id"] = place_ids[rows["place_id"]]
+            row_arrays.append(rows)
+            bounds = previous.offsets[
+                kept[:, None] * _STRINGS_PER_ROW
+                + np.arange(_STRINGS_PER_ROW + 1)
+            ]
+            lengths.append(np.diff(bounds).ravel())
+            strings.extend(
+                bytes(previous.strings[start:end])
+                for start, end in zip(bounds[:, 0], bounds[:, -1])
+            )
+            files.extend(previous.files[row] for row in kept)
+
+        records = []
+        new_strings = []
+        for offer, key, stat in offers:
+            params = offer.parameters
+            records.append(
+                (
+                    params.rent_price,
+                    params.other_prices,
+                    np.nan if params.area is None else params.area,
+                    params.deposit,
+                    params.minimal_rent_duration_months,
+                    (
+                        -1
+                        if params.utilities_included is None
+                        else int(params.utilities_included)
+                    ),
+                    params.only_for_students,
+                    params.only_for_woman,
+                    places.setdefault(place_key(params), len(places)),
+                )
+            )
+            new_strings.extend(
+                value.encode()
+                for value in (
+                    offer.source,
+                    offer.file_name,
+                    offer.url,
+                    params.model_dump_json(),
+                )
+            )
+            files.append((key, stat))
+        row_arrays.append(np.array(records, dtype=_ROW_DTYPE))
+        lengths.append(np.array([len(s) for s in new_strings], dtype=np.int64))
+        strings.extend(new_strings)
+
+        offsets = np.zeros(
+            sum(len(part) for part in lengths) + 1, dtype=np.int64
+        )
+        np.cumsum(np.concatenate(lengths), out=offsets[1:])
+        return cls(
+            rows=np.concatenate(row_arrays),
+            strings=np.frombuffer(b"".join(strings), dtype=np.uint8),
+            offsets=offsets,
+            places=list(places),
+            files=files,
+        )
+
+    @classmethod
+    def refresh(
+        cls,
+        folder: Path,
+        files: dict[str, FileStat],
+        load: Callable[[list[str]], list[SnapshotOffer]],
+    ) -> tuple[OfferSnapshot, int]:
+        """Snapshot of ``files`` (key to current stat), updating the one in
+        ``folder``.
+
+        Only new and modified files are passed to ``load``, which returns
+        their offers in order; rows of deleted files are dropped. Returns
+        the snapshot and the number of files loaded.
+        """
+        snapshot = cls.load(folder)
+        kept = []
+        known = set()
+        if snapshot is not None:
+            for row, (key, stat) in enumerate(snapshot.files):
+                if files.get(key) == stat:
+                    kept.append(row)
+                    known.add(key)
+        changed = [key for key in files if key not in known]
+        if snapshot is not None and not changed and len(kept) == len(snapshot):
+            return snapshot, 0
+
+        loaded = load(changed)
+        snapshot = cls._build(
+            snapshot,
+            np.array(kept, dtype=np.intp),
+            ((offer, key, files[key]) for key, offer in zip(changed, loaded)),
+        )
+        snapshot.save(folder)
+        return snapshot, len(changed)
@@ -1,6 +1,42 @@
 from __future__ import annotations
 
-from .extractor import OfferExtractor
+import importlib
+from typing import Any
+
+from .cache import ExtractionCache
 from .models import OfferParameters
 
-__all__ = ["OfferParameters", "OfferExtractor"]
+# Imported on first use, so reading offer parameters (e.g. in experiments)
+# does not pay for importing the LLM clients or the scrapers
+_LAZY_EXPORTS = {
+    "BatchExtraction": ".batch_api",
+    "BatchProvider": ".batch_api",
+    "OpenAIBatchProvider": ".batch_api",
+    "OfferExtractor": ".extractor",
+    "ExtractionScheduler": ".scheduler",
+    "TextPreprocessor": ".preprocessing",
+    "preprocess_offer_text": ".preprocessing",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(
+        importlib.import_module(_LAZY_EXPORTS[name], __name__), name
+    )
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "BatchExtraction",
+    "BatchProvider",
+    "OpenAIBatchProvider",
+    "ExtractionCache",
+    "OfferParameters",
+    "OfferExtractor",
+    "ExtractionScheduler",
+    "TextPreprocessor",
+    "preprocess_offer_text",
+]
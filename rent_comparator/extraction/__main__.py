@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from collections.abc import Callable
+from collections.abc import Iterator
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from fnmatch import fnmatch
+from functools import partial
+from itertools import chain
 from pathlib import Path
+from typing import NamedTuple
 
 from pydantic import Field
+from pydantic import PositiveFloat
 from pydantic import PositiveInt
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings
 from pydantic_settings import CliApp
 from pydantic_settings import SettingsConfigDict
+from rent_comparator.extraction import BatchExtraction
+from rent_comparator.extraction import ExtractionCache
+from rent_comparator.extraction import ExtractionScheduler
 from rent_comparator.extraction import OfferExtractor
+from rent_comparator.extraction import OfferParameters
+from rent_comparator.extraction import OpenAIBatchProvider
+from rent_comparator.extraction import TextPreprocessor
+from rent_comparator.storage import OfferStore
 from tqdm import tqdm
 
 
@@ -34,6 +50,60 @@ class ExtractionSettings(BaseSettings):
     max_workers: PositiveInt = Field(
         default=10, description="Number of parallel extraction workers"
     )
+    store: Path | None = Field(
+        default=None,
+        description="Offer store to read offers from and save parameters to",
+    )
+    cache: Path | None = Field(
+        default=None,
+        description="Extraction cache reused for repeated and duplicate offers",
+    )
+    cache_max_entries: PositiveInt = Field(
+        default=100_000,
+        description="Cached extractions kept before the oldest are evicted",
+    )
+    requests_per_minute: PositiveFloat | None = Field(
+        default=None,
+        description="Provider request limit, enables the async scheduler",
+    )
+    tokens_per_minute: PositiveInt | None = Field(
+        default=None,
+        description="Provider token limit, enables the async scheduler",
+    )
+    batch_size: PositiveInt = Field(
+        default=1, description="Offers sent to the LLM in one request"
+    )
+    batch_token_budget: PositiveInt = Field(
+        default=16_000,
+        description="Estimated tokens at most packed into one batch request",
+    )
+    batch_api: bool = Field(
+        default=False,
+        description="Submit pending offers to the provider batch API",
+    )
+    batch_api_folder: Path = Field(
+        default=Path("rent_comparator/data/batch_api"),
+        description="Request files and state of batch API submissions",
+    )
+    batch_api_base_url: str | None = Field(
+        default=None, description="Batch API base URL, e.g. a local stub"
+    )
+    poll_interval: PositiveFloat = Field(
+        default=60.0, description="Seconds between batch status checks"
+    )
+    preprocess: bool = Field(
+        default=True,
+        description="Strip page boilerplate from offer text before the LLM",
+    )
+    rule_confidence: float | None = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description=(
+            "Take fields matched by regex rules with at least this"
+            " confidence instead of asking the LLM, e.g. 0.8"
+        ),
+    )
     model_config = SettingsConfigDict(
         cli_parse_args=True,
         env_file=".env",
@@ -43,66 +113,307 @@ class ExtractionSettings(BaseSettings):
     )
 
     @staticmethod
-    def _extract_single_offer(
-        extractor: OfferExtractor, offer_file: Path, output_file: Path
-    ) -> str:
-        scraped_data = json.loads(offer_file.read_text(encoding="utf-8"))
+    def _offer_input(job: _ExtractionJob) -> tuple[str, dict | None]:
+        """Offer text and known parameters to extract from."""
+        scraped_data = job.load()
         offer_text = scraped_data["text"]
+        # The page text is kept even with known parameters, fields left to
+        # the LLM are often in its parameter sections, not the description
+        known_parameters = scraped_data.get("parameters")
+        if job.preprocess is not None:
+            offer_text = job.preprocess(offer_text)
 
-        result = extractor.extract(offer_text)
-        output_file.write_text(result.model_dump_json(indent=2))
+        return offer_text, known_parameters
 
-        return str(output_file)
+    @staticmethod
+    def _read_scraped_file(offer_file: Path) -> dict:
+        return json.loads(offer_file.read_text(encoding="utf-8"))
 
-    def cli_cmd(self) -> None:
-        self.output_folder.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _write_parameters(output_file: Path, result: OfferParameters) -> None:
+        output_file.write_text(result.model_dump_json(indent=2))
 
-        extractor = OfferExtractor(
-            model=self.model,
-            temperature=self.temperature,
-            api_key=self.openai_api_key,
-        )
+    @staticmethod
+    def _save_stored_parameters(
+        store: OfferStore,
+        source_name: str,
+        offer_id: str,
+        result: OfferParameters,
+    ) -> None:
+        store.add_extracted(source_name, offer_id, result.model_dump_json())
 
-        total_extracted = 0
+    @staticmethod
+    def _source_preprocess(
+        preprocessor: TextPreprocessor | None, source_name: str
+    ) -> Callable[[str], str] | None:
+        if preprocessor is None:
+            return None
+        return partial(preprocessor, source_name=source_name)
 
+    def _folder_jobs(
+        self, preprocessor: TextPreprocessor | None
+    ) -> Iterator[tuple[str, list[_ExtractionJob]]]:
+        """Yield per source the extractions whose output file is missing."""
         for source_folder in self.data_folder.glob(
             self.folder_extraction_pattern
         ):
             if not source_folder.is_dir():
                 continue
 
-            source_name = source_folder.name
-            print(f"\n=== Extracting from {source_name} ===")
-
-            output_source_folder = self.output_folder / source_name
+            output_source_folder = self.output_folder / source_folder.name
             output_source_folder.mkdir(parents=True, exist_ok=True)
+            preprocess = self._source_preprocess(
+                preprocessor, source_folder.name
+            )
 
-            offers_to_process = []
+            jobs = []
             for offer_file in source_folder.glob(self.file_extraction_pattern):
                 output_file = output_source_folder / f"{offer_file.stem}.json"
                 if output_file.exists():
                     continue
-                offers_to_process.append((offer_file, output_file))
-
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [
-                    executor.submit(
-                        self._extract_single_offer, extractor, of, out
+                jobs.append(
+                    _ExtractionJob(
+                        name=offer_file.stem,
+                        load=partial(self._read_scraped_file, offer_file),
+                        save=partial(self._write_parameters, output_file),
+                        preprocess=preprocess,
                     )
-                    for of, out in offers_to_process
+                )
+            yield source_folder.name, jobs
+
+    def _store_jobs(
+        self, store: OfferStore, preprocessor: TextPreprocessor | None
+    ) -> Iterator[tuple[str, list[_ExtractionJob]]]:
+        """Yield per source the stored offers without extracted parameters."""
+        for source_name in store.sources():
+            if not fnmatch(source_name, self.folder_extraction_pattern):
+                continue
+            preprocess = self._source_preprocess(preprocessor, source_name)
+            yield source_name, [
+                _ExtractionJob(
+                    name=offer_id,
+                    load=partial(store.get_scraped, source_name, offer_id),
+                    save=partial(
+                        self._save_stored_parameters,
+                        store,
+                        source_name,
+                        offer_id,
+                    ),
+                    preprocess=preprocess,
+                )
+                for offer_id in store.pending_extraction(source_name)
+                if fnmatch(f"{offer_id}.json", self.file_extraction_pattern)
+            ]
+
+    def _batches(
+        self, jobs: list[_ExtractionJob]
+    ) -> list[list[_ExtractionJob]]:
+        return [
+            jobs[i : i + self.batch_size]
+            for i in range(0, len(jobs), self.batch_size)
+        ]
+
+    def _run_jobs(
+        self, extractor: OfferExtractor, jobs: list[_ExtractionJob]
+    ) -> int:
+        if len(jobs) == 1:
+            results = [extractor.extract(*self._offer_input(jobs[0]))]
+        else:
+            results = extractor.extract_batch(
+                [self._offer_input(job) for job in jobs],
+                batch_size=self.batch_size,
+                token_budget=self.batch_token_budget,
+            )
+        for job, result in zip(jobs, results):
+            job.save(result)
+        return len(jobs)
+
+    async def _run_jobs_async(
+        self,
+        extractor: OfferExtractor,
+        jobs: list[_ExtractionJob],
+        semaphore: asyncio.Semaphore,
+    ) -> int:
+        # Bounds how many offers are loaded while waiting for the scheduler
+        async with semaphore:
+            if len(jobs) == 1:
+                results = [
+                    await extractor.extract_async(*self._offer_input(jobs[0]))
                 ]
+            else:
+                results = await extractor.extract_batch_async(
+                    [self._offer_input(job) for job in jobs],
+                    batch_size=self.batch_size,
+                    token_budget=self.batch_token_budget,
+                )
+            for job, result in zip(jobs, results):
+                job.save(result)
+        return len(jobs)
+
+    def _extract_threaded(
+        self,
+        extractor: OfferExtractor,
+        sources: Iterator[tuple[str, list[_ExtractionJob]]],
+    ) -> int:
+        total_extracted = 0
+        for source_name, jobs in sources:
+            print(f"\n=== Extracting from {source_name} ===")
+
+            with (
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor,
+                tqdm(
+                    total=len(jobs), desc=f"  {source_name}", unit="offer"
+                ) as progress,
+            ):
+                futures = {
+                    executor.submit(self._run_jobs, extractor, batch): batch
+                    for batch in self._batches(jobs)
+                }
 
-                for _ in tqdm(
-                    as_completed(futures),
-                    total=len(futures),
-                    desc=f"  {source_name}",
-                    unit="offer",
+                for future in as_completed(futures):
+                    try:
+                        n_extracted = future.result()
+                    except Exception as e:
+                        tqdm.write(f"  Extraction failed: {e!r}")
+                        continue
+                    progress.update(n_extracted)
+                    total_extracted += n_extracted
+        return total_extracted
+
+    async def _extract_scheduled(
+        self,
+        extractor: OfferExtractor,
+        sources: Iterator[tuple[str, list[_ExtractionJob]]],
+    ) -> int:
+        total_extracted = 0
+        semaphore = asyncio.Semaphore(2 * self.max_workers)
+        for source_name, jobs in sources:
+            print(f"\n=== Extracting from {source_name} ===")
+
+            with tqdm(
+                total=len(jobs), desc=f"  {source_name}", unit="offer"
+            ) as progress:
+                for future in asyncio.as_completed(
+                    [
+                        self._run_jobs_async(extractor, batch, semaphore)
+                        for batch in self._batches(jobs)
+                    ]
                 ):
-                    total_extracted += 1
+                    try:
+                        n_extracted = await future
+                    except Exception as e:
+                        tqdm.write(f"  Extraction failed: {e!r}")
+                        continue
+                    progress.update(n_extracted)
+                    total_extracted += n_extracted
+        return total_extracted
+
+    def _extract_batch_api(
+        self,
+        extractor: OfferExtractor,
+        sources: Iterator[tuple[str, list[_ExtractionJob]]],
+    ) -> int:
+        jobs = {
+            f"{source_name}/{job.name}": job
+            for source_name, source_jobs in sources
+            for job in source_jobs
+        }
+        offers = {
+            custom_id: self._offer_input(job)
+            for custom_id, job in jobs.items()
+        }
+        batch_extraction = BatchExtraction(
+            extractor,
+            OpenAIBatchProvider(
+                self.openai_api_key, base_url=self.batch_api_base_url
+            ),
+            self.batch_api_folder,
+            poll_interval=self.poll_interval,
+        )
+
+        print(f"\n=== Batch API: {len(offers)} pending offers ===")
+        total_extracted = 0
+        for results in chain(
+            [batch_extraction.submit(offers)], batch_extraction.results(offers)
+        ):
+            for result in results:
+                if result.parameters is None:
+                    print(f"  Extraction failed: {result.custom_id}")
+                    continue
+                jobs[result.custom_id].save(result.parameters)
+                total_extracted += 1
+        return total_extracted
+
+    def _create_scheduler(self) -> ExtractionScheduler | None:
+        if self.requests_per_minute is None and self.tokens_per_minute is None:
+            return None
+        limits = {
+            name: value
+            for name, value in (
+                ("requests_per_minute", self.requests_per_minute),
+                ("tokens_per_minute", self.tokens_per_minute),
+            )
+            if value is not None
+        }
+        return ExtractionScheduler(max_concurrency=self.max_workers, **limits)
+
+    def cli_cmd(self) -> None:
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+
+        scheduler = self._create_scheduler()
+        preprocessor = TextPreprocessor() if self.preprocess else None
+
+        with (
+            OfferStore(self.store) if self.store else nullcontext() as store,
+            (
+                ExtractionCache(self.cache, self.cache_max_entries)
+                if self.cache
+                else nullcontext()
+            ) as cache,
+        ):
+            extractor = OfferExtractor(
+                model=self.model,
+                temperature=self.temperature,
+                api_key=self.openai_api_key,
+                cache=cache,
+                scheduler=scheduler,
+                min_rule_confidence=self.rule_confidence,
+            )
+            sources = (
+                self._folder_jobs(preprocessor)
+                if store is None
+                else self._store_jobs(store, preprocessor)
+            )
+            if self.batch_api:
+                total_extracted = self._extract_batch_api(extractor, sources)
+            elif scheduler is None:
+                total_extracted = self._extract_threaded(extractor, sources)
+            else:
+                total_extracted = asyncio.run(
+                    self._extract_scheduled(extractor, sources)
+                )
 
         print("\n=== Extraction Complete ===")
         print(f"Total offers extracted: {total_extracted}")
-        print(f"Results saved to: {self.output_folder}")
+        print(f"Results saved to: {self.store or self.output_folder}")
+        if preprocessor is not None and preprocessor.tokens_before:
+            print(f"Offer text: {preprocessor.report()}")
+        if scheduler is not None:
+            print(f"Throughput: {scheduler.report()}")
+        if cache is not None:
+            print(
+                f"Cache: {cache.hits} hits, {cache.misses} misses"
+                f" ({cache.hit_rate:.0%} hit rate)"
+            )
+
+
+class _ExtractionJob(NamedTuple):
+    """Reads one scraped offer and saves its extracted parameters."""
+
+    name: str
+    load: Callable[[], dict]
+    save: Callable[[OfferParameters], None]
+    preprocess: Callable[[str], str] | None = None
 
 
 if __name__ == "__main__":
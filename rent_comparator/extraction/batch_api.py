@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+from typing import Protocol
+
+import openai
+from pydantic import BaseModel
+from pydantic import SecretStr
+
+from .extractor import OfferExtractor
+from .models import OfferParameters
+
+_FINISHED_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class BatchStatus(NamedTuple):
+    """State of a submitted batch as reported by the provider."""
+
+    status: str
+    output_file_id: str | None = None
+    error_file_id: str | None = None
+
+
+class BatchProvider(Protocol):
+    """Provider side of a batch API, stubbed out in tests."""
+
+    def upload(self, path: Path) -> str:
+        """Upload a JSONL request file, returning its file ID."""
+
+    def submit(self, file_id: str) -> str:
+        """Start a batch for an uploaded file, returning the batch ID."""
+
+    def status(self, batch_id: str) -> BatchStatus: ...
+
+    def download(self, file_id: str) -> bytes: ...
+
+
+class OpenAIBatchProvider:
+    """OpenAI batch API; ``base_url`` may point to a local stub server."""
+
+    def __init__(self, api_key: SecretStr, base_url: str | None = None):
+        self.client = openai.OpenAI(
+            api_key=api_key.get_secret_value(), base_url=base_url
+        )
+
+    def upload(self, path: Path) -> str:
+        with path.open("rb") as file:
+            return self.client.files.create(file=file, purpose="batch").id
+
+    def submit(self, file_id: str) -> str:
+        return self.client.batches.create(
+            input_file_id=file_id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        ).id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = self.client.batches.retrieve(batch_id)
+        return BatchStatus(
+            status=batch.status,
+            output_file_id=batch.output_file_id,
+            error_file_id=batch.error_file_id,
+        )
+
+    def download(self, file_id: str) -> bytes:
+        return self.client.files.content(file_id).content
+
+
+class SubmittedBatch(BaseModel):
+    batch_id: str
+    request_file: str
+    custom_ids: list[str]
+    ingested: bool = False
+
+
+class _BatchState(BaseModel):
+    batches: list[SubmittedBatch] = []
+
+
+class BatchResult(NamedTuple):
+    custom_id: str
+    parameters: OfferParameters | None
+    error: str | None = None
+
+
+class BatchExtraction:
+    """Bulk extraction through a provider batch API.
+
+    Requests are written to JSONL files in ``folder`` and submitted, the
+    submitted batches are recorded in ``folder/state.json``. Running again
+    after an interruption polls the recorded batches instead of
+    submitting their offers twice, and a batch is marked ingested only
+    after all of its results were consumed.
+    """
+
+    def __init__(
+        self,
+        extractor: OfferExtractor,
+        provider: BatchProvider,
+        folder: Path,
+        max_requests_per_batch: int = 10_000,
+        poll_interval: float = 60.0,
+    ):
+        self.extractor = extractor
+        self.provider = provider
+        self.folder = folder
+        self.max_requests_per_batch = max_requests_per_batch
+        self.poll_interval = poll_interval
+        self._state_file = folder / "state.json"
+        folder.mkdir(parents=True, exist_ok=True)
+        self._state = (
+            _BatchState.model_validate_json(self._state_file.read_text())
+            if self._state_file.exists()
+            else _BatchState()
+        )
+
+    def _save_state(self) -> None:
+        self._state_file.write_text(self._state.model_dump_json(indent=2))
+
+    def in_flight(self) -> set[str]:
+        """Custom IDs of offers in batches that are not ingested yet."""
+        return {
+            custom_id
+            for batch in self._state.batches
+            if not batch.ingested
+            for custom_id in batch.custom_ids
+        }
+
+    def submit(
+        self, offers: dict[str, tuple[str, dict[str, Any] | None]]
+    ) -> list[BatchResult]:
+        """Submit ``custom_id -> (offer_text, known_parameters)`` offers.
+
+        Offers already in flight are skipped. Returns the results of
+        offers that need no LLM request at all.
+        """
+        in_flight = self.in_flight()
+        requests = []
+        resolved = []
+        for custom_id, (offer_text, known_parameters) in offers.items():
+            if custom_id in in_flight:
+                continue
+            body = self.extractor.batch_api_body(offer_text, known_parameters)
+            if body is None:
+                resolved.append(
+                    BatchResult(
+                        custom_id,
+                        self.extractor.parse_batch_api_answer(
+                            None, offer_text, known_parameters
+                        ),
+                    )
+                )
+                continue
+            requests.append(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+
+        for start in range(0, len(requests), self.max_requests_per_batch):
+            chunk = requests[start : start + self.max_requests_per_batch]
+            request_file = (
+                self.folder / f"requests_{len(self._state.batches)}.jsonl"
+            )
+            request_file.write_text(
+                "".join(
+                    json.dumps(request, ensure_ascii=False) + "\n"
+                    for request in chunk
+                ),
+                encoding="utf-8",
+            )
+            batch_id = self.provider.submit(self.provider.upload(request_file))
+            self._state.batches.append(
+                SubmittedBatch(
+                    batch_id=batch_id,
+                    request_file=request_file.name,
+                    custom_ids=[request["custom_id"] for request in chunk],
+                )
+            )
+            self._save_state()
+            print(f"  Submitted batch {batch_id} ({len(chunk)} offers)")
+        return resolved
+
+    def _wait(self, batch: SubmittedBatch) -> BatchStatus:
+        while True:
+            status = self.provider.status(batch.batch_id)
+            if status.status in _FINISHED_STATUSES:
+                return status
+            time.sleep(self.poll_interval)
+
+    def _parse_output(
+        self,
+        content: bytes,
+        offers: dict[str, tuple[str, dict[str, Any] | None]],
+    ) -> Iterator[BatchResult]:
+        for line in content.decode().splitlines():
+            if not line.strip():
+                continue
+            answer = json.loads(line)
+            custom_id = answer["custom_id"]
+            response = answer.get("response") or {}
+            if answer.get("error") or response.get("status_code") != 200:
+                yield BatchResult(
+                    custom_id, None, str(answer.get("error") or response)
+                )
+                continue
+            try:
+                message = response["body"]["choices"][0]["message"]
+                parameters = self.extractor.parse_batch_api_answer(
+                    message["content"], *offers[custom_id]
+                )
+            except Exception as e:
+                yield BatchResult(custom_id, None, repr(e))
+                continue
+            yield BatchResult(custom_id, parameters)
+
+    def results(
+        self, offers: dict[str, tuple[str, dict[str, Any] | None]]
+    ) -> Iterator[list[BatchResult]]:
+        """Wait for every pending batch and yield its results.
+
+        ``offers`` must contain the offers of the pending batches to merge
+        their known parameters. Offers missing from the output are
+        reported as errors, so they are submitted again on the next run.
+        """
+        for batch in self._state.batches:
+            if batch.ingested:
+                continue
+            status = self._wait(batch)
+            print(f"  Batch {batch.batch_id} {status.status}")
+            results = []
+            if status.output_file_id is not None:
+                results = list(
+                    self._parse_output(
+                        self.provider.download(status.output_file_id),
+                        offers,
+                    )
+                )
+            answered = {result.custom_id for result in results}
+            results.extend(
+                BatchResult(custom_id, None, f"batch {status.status}")
+                for custom_id in batch.custom_ids
+                if custom_id not in answered
+            )
+            yield results
+            batch.ingested = True
+            self._save_state()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import math
+import time
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from rent_comparator.extraction.preprocessing import preprocess_offer_text
+from rent_comparator.extraction.rules import extract_rule_parameters
+from rent_comparator.extraction.rules import RuleMatch
+from rent_comparator.scrapers import WebsiteType
+
+_FIELDS = (
+    "rent_price",
+    "other_prices",
+    "area",
+    "deposit",
+    "rooms",
+    "floor",
+    "total_floors",
+)
+
+
+def _agrees(rule_value: Any, llm_value: Any) -> bool:
+    if isinstance(rule_value, float) and isinstance(llm_value, (int, float)):
+        return math.isclose(rule_value, llm_value, rel_tol=0.01)
+    return rule_value == llm_value
+
+
+class RuleBenchmarkSettings(BaseSettings):
+    """Compare rule-based extraction with the LLM results in data.zip."""
+
+    data_zip: Path = Field(
+        default=Path("rent_comparator/data.zip"),
+        description="Archive with scraped offers and their LLM parameters",
+    )
+    min_confidence: float = Field(
+        default=0.8, description="Confidence from which a rule value is used"
+    )
+    show_disagreements: bool = Field(
+        default=False, description="Print rule values differing from the LLM"
+    )
+
+    def _load_offers(self) -> list[tuple[str, str, dict[str, Any]]]:
+        """``(name, preprocessed text, LLM parameters)`` of every offer."""
+        offers = []
+        with zipfile.ZipFile(self.data_zip) as archive:
+            names = set(archive.namelist())
+            for name in sorted(names):
+                if "/rent_prices/" not in name or not name.endswith(".json"):
+                    continue
+                parameters_name = name.replace(
+                    "/rent_prices/", "/extracted_parameters/"
+                )
+                if parameters_name not in names:
+                    continue
+                website_type = next(
+                    (w for w in WebsiteType if f"/{w.value}/" in name), None
+                )
+                offers.append(
+                    (
+                        name,
+                        preprocess_offer_text(
+                            json.loads(archive.read(name))["text"],
+                            website_type,
+                        ),
+                        json.loads(archive.read(parameters_name)),
+                    )
+                )
+        return offers
+
+    def cli_cmd(self) -> None:
+        offers = self._load_offers()
+        start = time.perf_counter()
+        matches: list[dict[str, RuleMatch]] = [
+            extract_rule_parameters(text) for _, text, _ in offers
+        ]
+        elapsed = time.perf_counter() - start
+        print(
+            f"Rules on {len(offers)} offers:"
+            f" {elapsed * 1e6 / len(offers):.0f} µs/offer\n"
+        )
+
+        covered: Counter[str] = Counter()
+        agreed: Counter[str] = Counter()
+        for (name, _, llm), offer_matches in zip(offers, matches):
+            for field in _FIELDS:
+                match = offer_matches.get(field)
+                if match is None or match.confidence < self.min_confidence:
+                    continue
+                covered[field] += 1
+                if _agrees(match.value, llm.get(field)):
+                    agreed[field] += 1
+                elif self.show_disagreements:
+                    print(
+                        f"  {name} {field}: rules {match.value},"
+                        f" LLM {llm.get(field)}"
+                    )
+
+        print(f"{'Field':<14}{'Coverage':>10}{'Agreement':>11}")
+        for field in _FIELDS:
+            agreement = (
+                f"{agreed[field] / covered[field]:.0%}"
+                if covered[field]
+                else "-"
+            )
+            print(
+                f"{field:<14}{covered[field] / len(offers):>10.0%}"
+                f"{agreement:>11}"
+            )
+
+
+if __name__ == "__main__":
+    CliApp.run(RuleBenchmarkSettings)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .models import OfferParameters
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    parameters TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used);
+"""
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(
+    offer_text: str,
+    model: str,
+    prompt_version: str,
+    known_parameters: dict[str, Any] | None = None,
+) -> str:
+    """Hash of the normalized offer text and everything shaping the answer.
+
+    Whitespace is collapsed before hashing, so the same listing scraped
+    again or cross-posted on another site maps to the same key.
+    """
+    normalized = _WHITESPACE.sub(" ", offer_text).strip()
+    payload = json.dumps(
+        [
+            normalized,
+            model,
+            prompt_version,
+            known_parameters or {},
+        ],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ExtractionCache:
+    """Persistent, size-bounded cache of LLM extraction results.
+
+    Entries are kept in SQLite and the least recently used ones are evicted
+    once there are more than ``max_entries``. The cache can be shared
+    between threads.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> ExtractionCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def get(self, key: str) -> OfferParameters | None:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT parameters FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute(
+                "UPDATE extractions SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return OfferParameters.model_validate_json(row[0])
+
+    def put(self, key: str, parameters: OfferParameters) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?)",
+                (key, parameters.model_dump_json(), time.time()),
+            )
+            (n_entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM extractions"
+            ).fetchone()
+            if n_entries > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM extractions WHERE key IN (SELECT key FROM"
+                    " extractions ORDER BY last_used LIMIT ?)",
+                    (n_entries - self.max_entries,),
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM extractions"
+            ).fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        self._connection.close()
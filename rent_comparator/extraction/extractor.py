@@ -1,11 +1,74 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
+from collections.abc import Iterable
+from typing import Any
+
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
+from pydantic import create_model
+from pydantic import Field
 from pydantic import SecretStr
+from pydantic import ValidationError
 
+from .cache import cache_key
+from .cache import ExtractionCache
 from .models import OfferParameters
+from .preprocessing import estimate_text_tokens
+from .rules import rule_parameters
+from .scheduler import estimate_tokens
+from .scheduler import ExtractionScheduler
+
+# Bump whenever the prompt changes so cached extractions are not reused
+PROMPT_VERSION = "1"
+
+_SYSTEM_PROMPT = (
+    "You are an expert at extracting structured information from rental property listings. "
+    "Extract all relevant parameters from the offer text. "
+    "If a parameter is not mentioned or unclear, set it to null. "
+    "For prices, extract only numeric values without currency symbols. "
+    "For boolean fields, determine based on context. "
+    "For address, extract the full street address if available. "
+    "For location, extract the neighborhood, district, or general area. "
+    "For minimal_rent_duration_months, extract the minimum rental period in months."
+)
+_BATCH_PROMPT = (
+    " The message contains several numbered offers. Return the parameters"
+    " of every offer, each with its offer_number. Parameters listed as"
+    " already known for an offer are correct and must be kept."
+)
+# Answer tokens per offer in a batch, used when packing batches
+_BATCH_OUTPUT_TOKENS = 300
+
+
+class _BatchOffer(OfferParameters):
+    offer_number: int = Field(description="Number of the offer")
+
+
+class _OfferBatch(BaseModel):
+    """Parameters of every offer in the request."""
+
+    offers: list[_BatchOffer]
+
+
+@functools.cache
+def _partial_model(missing: frozenset[str]) -> type[BaseModel]:
+    """OfferParameters with only the ``missing`` fields."""
+    fields = OfferParameters.model_fields
+    return create_model(
+        "OfferParameters",
+        __base__=BaseModel,
+        __doc__=OfferParameters.__doc__,
+        **{
+            name: (fields[name].annotation, fields[name])
+            for name in fields
+            if name in missing
+        },
+    )
 
 
 class OfferExtractor:
@@ -16,29 +79,434 @@ class OfferExtractor:
         api_key: SecretStr,
         model: str = "gpt-4o-mini",
         temperature: float = 0.0,
+        cache: ExtractionCache | None = None,
+        scheduler: ExtractionScheduler | None = None,
+        min_rule_confidence: float | None = None,
     ):
-        self.llm = ChatOpenAI(
+        self.model = model
+        self.cache = cache
+        self.scheduler = scheduler
+        self.min_rule_confidence = min_rule_confidence
+        self.chat = ChatOpenAI(
             model=model, api_key=api_key, temperature=temperature
-        ).with_structured_output(OfferParameters)
-
-    def extract(self, offer_text: str) -> OfferParameters:
-        """Extract parameters from offer text."""
-        messages = [
-            SystemMessage(
-                content=(
-                    "You are an expert at extracting structured information from rental property listings. "
-                    "Extract all relevant parameters from the offer text. "
-                    "If a parameter is not mentioned or unclear, set it to null. "
-                    "For prices, extract only numeric values without currency symbols. "
-                    "For boolean fields, determine based on context. "
-                    "For address, extract the full street address if available. "
-                    "For location, extract the neighborhood, district, or general area. "
-                    "For minimal_rent_duration_months, extract the minimum rental period in months."
+        )
+        self.llm = self.chat.with_structured_output(OfferParameters)
+        self._partial_llms: dict[frozenset[str], Any] = {}
+        self.batch_llm = self.chat.with_structured_output(_OfferBatch)
+
+    @staticmethod
+    def _messages(
+        offer_text: str, known_parameters: dict[str, Any] | None = None
+    ) -> list:
+        human_content = (
+            f"Extract rental parameters from this offer:\n\n{offer_text}"
+        )
+        if known_parameters:
+            human_content = (
+                "These parameters are already known:\n"
+                f"{json.dumps(known_parameters, ensure_ascii=False)}\n\n"
+                + human_content
+            )
+        return [
+            SystemMessage(content=_SYSTEM_PROMPT),
+            HumanMessage(content=human_content),
+        ]
+
+    def _partial_llm(self, missing: frozenset[str]) -> Any:
+        """Structured-output LLM asking only for the ``missing`` fields."""
+        if missing not in self._partial_llms:
+            self._partial_llms[missing] = self.chat.with_structured_output(
+                _partial_model(missing)
+            )
+        return self._partial_llms[missing]
+
+    @staticmethod
+    def _known_parameters(
+        known_parameters: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """Keep only known values that are valid OfferParameters fields."""
+        valid = {}
+        for name, value in (known_parameters or {}).items():
+            if name not in OfferParameters.model_fields:
+                continue
+            try:
+                OfferParameters.__pydantic_validator__.validate_assignment(
+                    OfferParameters.model_construct(), name, value
                 )
+            except ValidationError:
+                continue
+            valid[name] = value
+        return valid
+
+    def _resolve_known(
+        self, offer_text: str, known_parameters: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Valid known parameters plus values read by the regex rules.
+
+        Rules are used only with ``min_rule_confidence`` set and only for
+        matches at least that confident; given parameters take precedence.
+        """
+        known = self._known_parameters(known_parameters)
+        if self.min_rule_confidence is None:
+            return known
+        rules = self._known_parameters(
+            rule_parameters(offer_text, self.min_rule_confidence)
+        )
+        return {**rules, **known}
+
+    def _cache_key(self, offer_text: str, known: dict[str, Any]) -> str:
+        return cache_key(offer_text, self.model, PROMPT_VERSION, known)
+
+    def extract(
+        self,
+        offer_text: str,
+        known_parameters: dict[str, Any] | None = None,
+    ) -> OfferParameters:
+        """Extract parameters from offer text.
+
+        Parameters already read from structured page data are passed as
+        ``known_parameters``; the LLM is then asked only for the remaining
+        fields and is skipped entirely when nothing is missing. With
+        ``min_rule_confidence`` set, fields matched by the regex rules are
+        known as well. Results are looked up in and saved to ``cache``
+        when one is configured.
+        """
+        known = self._resolve_known(offer_text, known_parameters)
+        if self.cache is None:
+            return self._extract(offer_text, known)
+
+        key = self._cache_key(offer_text, known)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._extract(offer_text, known)
+            self.cache.put(key, result)
+        return result
+
+    async def extract_async(
+        self,
+        offer_text: str,
+        known_parameters: dict[str, Any] | None = None,
+    ) -> OfferParameters:
+        """Like ``extract``, but the request goes through ``scheduler``."""
+        known = self._resolve_known(offer_text, known_parameters)
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(offer_text, known)
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+
+        if self.scheduler is None:
+            self.scheduler = ExtractionScheduler()
+        result = await self._aextract(offer_text, known)
+
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    async def aextract_many(
+        self, offers: Iterable[tuple[str, dict[str, Any] | None]]
+    ) -> list[OfferParameters | BaseException]:
+        """Extract ``(offer_text, known_parameters)`` pairs concurrently.
+
+        Results keep the order of ``offers``; failed extractions are
+        returned as their exception instead of cancelling the others.
+        """
+        return await asyncio.gather(
+            *(
+                self.extract_async(offer_text, known_parameters)
+                for offer_text, known_parameters in offers
             ),
+            return_exceptions=True,
+        )
+
+    @staticmethod
+    def _batch_messages(offers: list[tuple[str, dict[str, Any]]]) -> list:
+        parts = []
+        for number, (offer_text, known) in enumerate(offers, start=1):
+            part = f"=== Offer {number} ===\n"
+            if known:
+                part += (
+                    "Already known:"
+                    f" {json.dumps(known, ensure_ascii=False)}\n"
+                )
+            parts.append(part + offer_text)
+        return [
+            SystemMessage(content=_SYSTEM_PROMPT + _BATCH_PROMPT),
             HumanMessage(
-                content=f"Extract rental parameters from this offer:\n\n{offer_text}"
+                content="Extract rental parameters from these offers:\n\n"
+                + "\n\n".join(parts)
             ),
         ]
 
-        return self.llm.invoke(messages)
+    @staticmethod
+    def _pack(
+        offers: list[tuple[str, dict[str, Any]]],
+        indices: list[int],
+        batch_size: int,
+        token_budget: int,
+    ) -> list[list[int]]:
+        """Group offers into batches of at most ``batch_size`` offers and
+        about ``token_budget`` tokens; a larger offer is sent alone."""
+        batches: list[list[int]] = []
+        batch_tokens = 0
+        for i in indices:
+            offer_text, known = offers[i]
+            tokens = _BATCH_OUTPUT_TOKENS + estimate_text_tokens(
+                offer_text + json.dumps(known, ensure_ascii=False)
+            )
+            if (
+                not batches
+                or len(batches[-1]) >= batch_size
+                or batch_tokens + tokens > token_budget
+            ):
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(i)
+            batch_tokens += tokens
+        return batches
+
+    @staticmethod
+    def _unpack(
+        batch: _OfferBatch, known: list[dict[str, Any]]
+    ) -> list[OfferParameters] | None:
+        """Results in offer order, or None if offers are missing."""
+        by_number = {offer.offer_number: offer for offer in batch.offers}
+        if sorted(by_number) != list(range(1, len(known) + 1)):
+            return None
+        return [
+            OfferParameters(
+                **{
+                    **by_number[number].model_dump(exclude={"offer_number"}),
+                    **known[number - 1],
+                }
+            )
+            for number in range(1, len(known) + 1)
+        ]
+
+    def _prepare_batch(
+        self, offers: list[tuple[str, dict[str, Any] | None]]
+    ) -> tuple[
+        list[tuple[str, dict[str, Any]]],
+        list[OfferParameters | None],
+        list[str | None],
+    ]:
+        """Validate known parameters and answer what needs no LLM call."""
+        prepared = [
+            (offer_text, self._resolve_known(offer_text, known_parameters))
+            for offer_text, known_parameters in offers
+        ]
+        results: list[OfferParameters | None] = []
+        keys: list[str | None] = []
+        for offer_text, known in prepared:
+            key = None
+            result = None
+            if self.cache is not None:
+                key = self._cache_key(offer_text, known)
+                result = self.cache.get(key)
+            if result is None and self._request(offer_text, known) is None:
+                result = self._merge(None, known)
+            results.append(result)
+            keys.append(key if result is None else None)
+        return prepared, results, keys
+
+    def _save_batch(
+        self,
+        results: list[OfferParameters | None],
+        keys: list[str | None],
+    ) -> list[OfferParameters]:
+        if self.cache is not None:
+            for key, result in zip(keys, results):
+                if key is not None:
+                    self.cache.put(key, result)
+        return results
+
+    def extract_batch(
+        self,
+        offers: list[tuple[str, dict[str, Any] | None]],
+        batch_size: int = 10,
+        token_budget: int = 16_000,
+    ) -> list[OfferParameters]:
+        """Extract ``(offer_text, known_parameters)`` pairs, several offers
+        per LLM request.
+
+        Offers are packed into requests of at most ``batch_size`` offers
+        and about ``token_budget`` estimated tokens, so the system prompt
+        is sent once per batch. A batch that fails or misses offers is
+        retried offer by offer.
+        """
+        prepared, results, keys = self._prepare_batch(offers)
+        pending = [i for i, result in enumerate(results) if result is None]
+        for batch in self._pack(prepared, pending, batch_size, token_budget):
+            batch_offers = [prepared[i] for i in batch]
+            batch_results = None
+            if len(batch) > 1:
+                try:
+                    batch_results = self._unpack(
+                        self.batch_llm.invoke(
+                            self._batch_messages(batch_offers)
+                        ),
+                        [known for _, known in batch_offers],
+                    )
+                except Exception:
+                    batch_results = None
+            if batch_results is None:
+                batch_results = [
+                    self._extract(offer_text, known)
+                    for offer_text, known in batch_offers
+                ]
+            for i, result in zip(batch, batch_results):
+                results[i] = result
+        return self._save_batch(results, keys)
+
+    async def _extract_batch_async(
+        self, batch_offers: list[tuple[str, dict[str, Any]]]
+    ) -> list[OfferParameters]:
+        if len(batch_offers) > 1:
+            messages = self._batch_messages(batch_offers)
+            try:
+                batch_results = self._unpack(
+                    await self.scheduler.run(
+                        lambda: self.batch_llm.ainvoke(messages),
+                        estimate_tokens(messages)
+                        + _BATCH_OUTPUT_TOKENS * (len(batch_offers) - 1),
+                    ),
+                    [known for _, known in batch_offers],
+                )
+            except Exception:
+                batch_results = None
+            if batch_results is not None:
+                return batch_results
+
+        return await asyncio.gather(
+            *(
+                self._aextract(offer_text, known)
+                for offer_text, known in batch_offers
+            )
+        )
+
+    async def extract_batch_async(
+        self,
+        offers: list[tuple[str, dict[str, Any] | None]],
+        batch_size: int = 10,
+        token_budget: int = 16_000,
+    ) -> list[OfferParameters]:
+        """Like ``extract_batch``, with batches sent concurrently through
+        ``scheduler``."""
+        if self.scheduler is None:
+            self.scheduler = ExtractionScheduler()
+        prepared, results, keys = self._prepare_batch(offers)
+        pending = [i for i, result in enumerate(results) if result is None]
+        batches = self._pack(prepared, pending, batch_size, token_budget)
+        batch_results = await asyncio.gather(
+            *(
+                self._extract_batch_async([prepared[i] for i in batch])
+                for batch in batches
+            )
+        )
+        for batch, extracted in zip(batches, batch_results):
+            for i, result in zip(batch, extracted):
+                results[i] = result
+        return self._save_batch(results, keys)
+
+    def _request(
+        self, offer_text: str, known: dict[str, Any]
+    ) -> tuple[Any, list] | None:
+        """Structured-output LLM and messages asking for unknown fields."""
+        if not known:
+            return self.llm, self._messages(offer_text)
+
+        missing = frozenset(OfferParameters.model_fields.keys() - known.keys())
+        if not missing:
+            return None
+        return self._partial_llm(missing), self._messages(offer_text, known)
+
+    @staticmethod
+    def _response_model(known: dict[str, Any]) -> type[BaseModel] | None:
+        if not known:
+            return OfferParameters
+        missing = frozenset(OfferParameters.model_fields.keys() - known.keys())
+        return _partial_model(missing) if missing else None
+
+    def batch_api_body(
+        self,
+        offer_text: str,
+        known_parameters: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        """Chat completions request for a provider batch API.
+
+        Returns None when every parameter is already known.
+        """
+        known = self._resolve_known(offer_text, known_parameters)
+        response_model = self._response_model(known)
+        if response_model is None:
+            return None
+        body = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": (
+                        "system"
+                        if isinstance(message, SystemMessage)
+                        else "user"
+                    ),
+                    "content": message.content,
+                }
+                for message in self._messages(offer_text, known)
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "OfferParameters",
+                    "schema": response_model.model_json_schema(),
+                },
+            },
+        }
+        if self.chat.temperature is not None:
+            body["temperature"] = self.chat.temperature
+        return body
+
+    def parse_batch_api_answer(
+        self,
+        content: str | None,
+        offer_text: str,
+        known_parameters: dict[str, Any] | None = None,
+    ) -> OfferParameters:
+        """Parameters from the answer to a ``batch_api_body`` request."""
+        known = self._resolve_known(offer_text, known_parameters)
+        response_model = self._response_model(known)
+        extracted = None
+        if response_model is not None:
+            extracted = response_model.model_validate_json(content)
+        return self._merge(extracted, known)
+
+    @staticmethod
+    def _merge(
+        extracted: BaseModel | None, known: dict[str, Any]
+    ) -> OfferParameters:
+        if not known:
+            return extracted
+        extracted_fields = extracted.model_dump() if extracted else {}
+        return OfferParameters(**{**extracted_fields, **known})
+
+    async def _aextract(
+        self, offer_text: str, known: dict[str, Any]
+    ) -> OfferParameters:
+        extracted = None
+        request = self._request(offer_text, known)
+        if request is not None:
+            llm, messages = request
+            extracted = await self.scheduler.run(
+                lambda: llm.ainvoke(messages), estimate_tokens(messages)
+            )
+        return self._merge(extracted, known)
+
+    def _extract(
+        self, offer_text: str, known: dict[str, Any]
+    ) -> OfferParameters:
+        extracted = None
+        request = self._request(offer_text, known)
+        if request is not None:
+            llm, messages = request
+            extracted = llm.invoke(messages)
+        return self._merge(extracted, known)
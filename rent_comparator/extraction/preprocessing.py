@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import html
+import re
+import threading
+from typing import NamedTuple
+
+from rent_comparator.scrapers import WebsiteType
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[^\S\n]+|[\u200b-\u200d\ufeff]+")
+# "Powierzchnia\n:\n12\nm²" as rendered from separate HTML elements
+_DETACHED_COLON = re.compile(r"\n:(?:\n|$)")
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count; Polish text averages ~3 characters per token."""
+    return len(text) // 3
+
+
+class _Section(NamedTuple):
+    """Lines after the line starting with ``start`` up to, not including,
+    the line starting with ``end``."""
+
+    start: str
+    end: str | None
+
+
+class _SiteRules(NamedTuple):
+    sections: tuple[_Section, ...]
+    noise: re.Pattern
+
+
+# Listing bodies between the site navigation, related offers and footers.
+# Otodom pages end with the ad description appended after the footer.
+_SITE_RULES = {
+    WebsiteType.OTODOM: _SiteRules(
+        sections=(
+            _Section(start="Udostępnij", end="Zgłoś"),
+            _Section(start="USTAWIENIA PLIKÓW COOKIE", end=None),
+        ),
+        noise=re.compile(
+            r"Zapisz|(Wszystkie )?[Zz]djęcia \(\d+\)|Pokaż więcej"
+        ),
+    ),
+    WebsiteType.GRATKA: _SiteRules(
+        sections=(
+            _Section(start="Blog", end="Podoba Ci się ta nieruchomość?"),
+        ),
+        noise=re.compile(
+            r"Pokaż cały opis|Zobacz na mapie|Poznaj okolicę"
+            r"|Zanim tu zamieszkasz, sprawdź jak się żyje w tej okolicy\."
+        ),
+    ),
+}
+
+
+def _normalized_lines(text: str) -> list[str]:
+    text = html.unescape(_TAG.sub("\n", text))
+    lines = (_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return [line for line in lines if line]
+
+
+def _find_line(lines: list[str], prefix: str, start: int) -> int | None:
+    return next(
+        (i for i in range(start, len(lines)) if lines[i].startswith(prefix)),
+        None,
+    )
+
+
+def _listing_lines(lines: list[str], rules: _SiteRules) -> list[str]:
+    """Keep the title and the listing sections, or everything if the page
+    layout is not recognized."""
+    kept = lines[:1]
+    for section in rules.sections:
+        start = _find_line(lines, section.start, 1)
+        if start is None:
+            return lines
+        # Text glued to the marker, e.g. a description following the footer
+        rest = lines[start][len(section.start) :].strip()
+        kept.extend([rest] if rest else [])
+
+        end = len(lines)
+        if section.end is not None:
+            end = _find_line(lines, section.end, start + 1)
+            if end is None:
+                return lines
+        kept.extend(
+            line
+            for line in lines[start + 1 : end]
+            if not rules.noise.fullmatch(line)
+        )
+    return kept
+
+
+def preprocess_offer_text(
+    text: str, website_type: WebsiteType | None = None
+) -> str:
+    """Shrink scraped offer text before it is sent to the LLM.
+
+    HTML tags and blank lines are removed and whitespace is collapsed. For
+    known sites navigation, related offers and footers are dropped so only
+    the listing body is left.
+    """
+    lines = _normalized_lines(text)
+    rules = _SITE_RULES.get(website_type)
+    if rules is not None:
+        lines = _listing_lines(lines, rules)
+    return _DETACHED_COLON.sub(": ", "\n".join(lines))
+
+
+class TextPreprocessor:
+    """Preprocesses offer texts, counting estimated tokens saved.
+
+    Can be shared between threads.
+    """
+
+    def __init__(self):
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, source_name: str | None = None) -> str:
+        """Preprocess ``text`` scraped from the ``source_name`` site."""
+        website_type = next(
+            (w for w in WebsiteType if w.value == source_name), None
+        )
+        processed = preprocess_offer_text(text, website_type)
+        with self._lock:
+            self.tokens_before += estimate_text_tokens(text)
+            self.tokens_after += estimate_text_tokens(processed)
+        return processed
+
+    def report(self) -> str:
+        saved = 1 - self.tokens_after / self.tokens_before
+        return (
+            f"~{self.tokens_before} -> ~{self.tokens_after} tokens"
+            f" ({saved:.0%} fewer)"
+        )
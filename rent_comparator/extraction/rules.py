@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from typing import Any
+from typing import NamedTuple
+
+# "1 200", "1200,50", "1.200"; spaces may be non-breaking
+_AMOUNT = r"(\d{1,3}(?:[ \u00a0.]\d{3})+|\d+)(?:,(\d{1,2}))?"
+_DECIMAL = r"(\d+(?:[.,]\d+)?)"
+_FLOOR = r"(\d+|parter)(?:\s*/\s*(\d+))?"
+_PER_MONTH = r"\s*/\s*(?:mc|m-c|mies\.?|miesiąc)\b"
+
+
+class RuleMatch(NamedTuple):
+    """A parameter value read by a rule, with how much it can be trusted."""
+
+    value: Any
+    confidence: float
+
+
+def _amount(match: re.Match) -> float:
+    whole, fraction = match.group(1), match.group(2)
+    value = float(re.sub(r"[ \u00a0.]", "", whole))
+    return value + float(f"0.{fraction}") if fraction else value
+
+
+def _rent(match: re.Match) -> float | None:
+    # Lower amounts are prices per m² or per day, not a monthly rent
+    value = _amount(match)
+    return value if value >= 100 else None
+
+
+def _decimal(match: re.Match) -> float:
+    return float(match.group(1).replace(",", "."))
+
+
+def _integer(match: re.Match) -> int:
+    return int(match.group(1))
+
+
+def _floor(match: re.Match) -> int:
+    return 0 if match.group(1) == "parter" else int(match.group(1))
+
+
+def _total_floors(match: re.Match) -> int | None:
+    return int(match.group(2)) if match.group(2) else None
+
+
+class _Rule(NamedTuple):
+    field: str
+    pattern: re.Pattern
+    confidence: float
+    parse: Callable[[re.Match], Any]
+
+
+def _rule(
+    field: str,
+    pattern: str,
+    confidence: float,
+    parse: Callable[[re.Match], Any],
+) -> _Rule:
+    return _Rule(
+        field,
+        re.compile(pattern, re.MULTILINE | re.IGNORECASE),
+        confidence,
+        parse,
+    )
+
+
+# Per field from most to least specific. Labelled values from the listing
+# parameters come first, free-text phrases from descriptions last.
+_RULES = (
+    _rule("rent_price", rf"^{_AMOUNT} zł\n/miesiąc$", 0.95, _rent),
+    _rule("rent_price", rf"^{_AMOUNT} zł$", 0.85, _rent),
+    _rule(
+        "rent_price",
+        rf"\b(?:czynsz|cena|najem)\w*:?\s*{_AMOUNT}\s*zł(?:{_PER_MONTH})?",
+        0.7,
+        _rent,
+    ),
+    _rule("rent_price", rf"{_AMOUNT}\s*zł{_PER_MONTH}", 0.7, _rent),
+    _rule("other_prices", rf"^\+ Czynsz {_AMOUNT} zł$", 0.9, _amount),
+    _rule(
+        "other_prices",
+        rf"^Dodatkowy koszt: {_AMOUNT} zł/miesiąc$",
+        0.9,
+        _amount,
+    ),
+    _rule("area", rf"^Powierzchnia: {_DECIMAL}\s*m²$", 0.95, _decimal),
+    _rule("area", rf"^Pow\. całkowita\n{_DECIMAL} m²$", 0.9, _decimal),
+    _rule("area", rf"^{_DECIMAL} m²$", 0.85, _decimal),
+    _rule(
+        "area",
+        rf"\bpok[oó]j\w*[^.\n\d]{{0,40}}?{_DECIMAL} ?m(?:2|²)",
+        0.6,
+        _decimal,
+    ),
+    _rule(
+        "deposit",
+        rf"^kaucja:? {_AMOUNT} zł$",
+        0.95,
+        _amount,
+    ),
+    _rule(
+        "deposit",
+        rf"\bkaucj[aięy][^\d\n.]{{0,25}}{_AMOUNT}\s*(?:zł|pln)",
+        0.85,
+        _amount,
+    ),
+    _rule("rooms", r"^Liczba pokoi: (\d+)$", 0.9, _integer),
+    # Rooms of the whole apartment, also in offers of a single room
+    _rule("rooms", r"^(\d+) pok(?:oje|ój|oi)$", 0.6, _integer),
+    _rule("floor", rf"^Piętro:? ?\n?{_FLOOR}$", 0.9, _floor),
+    _rule("floor", rf"^piętro {_FLOOR}$", 0.85, _floor),
+    _rule("floor", r"^(parter)$", 0.85, _floor),
+    _rule("floor", r"\b(\d+)\.? piętrze\b", 0.6, _floor),
+    _rule("total_floors", rf"^Piętro:? ?\n?{_FLOOR}$", 0.9, _total_floors),
+    _rule("total_floors", rf"^piętro {_FLOOR}$", 0.85, _total_floors),
+    _rule("total_floors", r"^Liczba pięter\n(\d+)$", 0.9, _integer),
+)
+
+
+def extract_rule_parameters(offer_text: str) -> dict[str, RuleMatch]:
+    """Read common OfferParameters fields from Polish listing text.
+
+    For every field the most specific rule that matches wins. When that
+    rule finds different values in the same text its confidence is
+    lowered, since the offer likely describes several rooms.
+    """
+    matches: dict[str, RuleMatch] = {}
+    for rule in _RULES:
+        if rule.field in matches:
+            continue
+        values = [
+            value
+            for match in rule.pattern.finditer(offer_text)
+            if (value := rule.parse(match)) is not None
+        ]
+        if not values:
+            continue
+        confidence = rule.confidence
+        if len(set(values)) > 1:
+            confidence *= 0.7
+        matches[rule.field] = RuleMatch(values[0], confidence)
+    return matches
+
+
+def rule_parameters(offer_text: str, min_confidence: float) -> dict[str, Any]:
+    """Values of rule matches at least ``min_confidence`` confident."""
+    return {
+        field: match.value
+        for field, match in extract_rule_parameters(offer_text).items()
+        if match.confidence >= min_confidence
+    }
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import TypeVar
+
+import openai
+from langchain_core.messages import BaseMessage
+from rent_comparator.scrapers.rate_limiter import parse_retry_after
+
+from .preprocessing import estimate_text_tokens
+
+T = TypeVar("T")
+
+# Structured output of a single offer stays well below this
+_OUTPUT_TOKENS = 300
+
+
+def estimate_tokens(messages: list[BaseMessage]) -> int:
+    """Rough token count of a request, prompt plus expected output."""
+    return _OUTPUT_TOKENS + sum(
+        estimate_text_tokens(str(message.content)) for message in messages
+    )
+
+
+class _Budget:
+    """Per-minute budget refilled continuously, like a token bucket."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self._available = per_minute
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available."""
+        self._available = min(
+            self.capacity,
+            self._available + (now - self._updated) * self.capacity / 60,
+        )
+        self._updated = now
+        missing = min(amount, self.capacity) - self._available
+        return max(0.0, missing * 60 / self.capacity)
+
+    def take(self, amount: float) -> None:
+        self._available -= min(amount, self.capacity)
+
+    def drain(self) -> None:
+        self._available = 0.0
+
+
+class ExtractionScheduler:
+    """Runs LLM requests within requests- and tokens-per-minute limits.
+
+    At most ``max_concurrency`` requests are in flight. Rate limit errors
+    pause every request for the Retry-After time (or a jittered exponential
+    delay) before retrying, server errors are retried with jitter only.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        max_concurrency: int = 10,
+        max_retries: int = 5,
+        retry_base_delay: float = 1.0,
+    ):
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.n_requests = 0
+        self.n_tokens = 0
+        self.n_rate_limited = 0
+        self._requests = _Budget(requests_per_minute)
+        self._tokens = _Budget(tokens_per_minute)
+        self._paused_until = 0.0
+        self._started: float | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                wait = max(
+                    self._requests.wait_time(1, now),
+                    self._tokens.wait_time(tokens, now),
+                )
+                if not wait:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def _retry_delay(self, attempt: int) -> float:
+        return random.uniform(0, self.retry_base_delay * 2**attempt)
+
+    def _pause(self, error: openai.RateLimitError, attempt: int) -> None:
+        delay = parse_retry_after(error.response.headers.get("retry-after"))
+        if delay is None:
+            delay = self._retry_delay(attempt)
+        self._requests.drain()
+        self._tokens.drain()
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    async def run(self, request: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Await ``request()`` once the budgets allow ``tokens`` more."""
+        if self._started is None:
+            self._started = time.monotonic()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                await self._acquire(tokens)
+                self.n_requests += 1
+                self.n_tokens += tokens
+                try:
+                    return await request()
+                except openai.RateLimitError as error:
+                    self.n_rate_limited += 1
+                    if last_attempt:
+                        raise
+                    self._pause(error, attempt)
+                except (
+                    openai.APIConnectionError,
+                    openai.InternalServerError,
+                ):
+                    if last_attempt:
+                        raise
+                    await asyncio.sleep(self._retry_delay(attempt))
+
+    def report(self) -> str:
+        """Throughput since the first scheduled request."""
+        elapsed = time.monotonic() - (self._started or time.monotonic())
+        per_minute = 60 / elapsed if elapsed else 0.0
+        return (
+            f"{self.n_requests} requests ({self.n_rate_limited} rate limited),"
+            f" {self.n_requests * per_minute:.0f} requests/min,"
+            f" ~{self.n_tokens * per_minute:.0f} tokens/min"
+        )
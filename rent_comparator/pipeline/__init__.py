@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from .offer_pipeline import OfferPipeline
+from .offer_pipeline import PipelineSummary
+
+__all__ = ["OfferPipeline", "PipelineSummary"]
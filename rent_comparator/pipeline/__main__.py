@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from pydantic import Field
+from pydantic import NonNegativeFloat
+from pydantic import PositiveFloat
+from pydantic import PositiveInt
+from pydantic import SecretStr
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from pydantic_settings import SettingsConfigDict
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments import FilterParams
+from rent_comparator.experiments import SearchCriteria
+from rent_comparator.experiments.criteria import FilterType
+from rent_comparator.experiments.finder import OfferResult
+from rent_comparator.extraction import ExtractionScheduler
+from rent_comparator.extraction import OfferExtractor
+from rent_comparator.extraction import TextPreprocessor
+from rent_comparator.pipeline import OfferPipeline
+from rent_comparator.scrapers import AVAILABLE_WEBSITES
+from rent_comparator.scrapers import WebsiteType
+from rent_comparator.storage import OfferStore
+
+
+class PipelineSettings(BaseSettings):
+    """Scrape, extract and rank offers in one streaming run."""
+
+    store: Path = Field(
+        default=Path("rent_comparator/data/offers.db"),
+        description="Offer store for scraped offers and extracted parameters",
+    )
+    city: str = Field(default="wroclaw", description="City to search in")
+    max_pages: PositiveInt = Field(
+        default=10, description="Maximum pages per website"
+    )
+    sources: list[WebsiteType] = Field(
+        default_factory=lambda: list(AVAILABLE_WEBSITES.keys()),
+        description="List of sources to scrape",
+    )
+    incremental: bool = Field(
+        default=True,
+        description="Skip offers already in the store",
+    )
+    cache_folder: Path | None = Field(
+        default=None,
+        description="Folder for the on-disk HTTP response cache (disabled if omitted)",
+    )
+    offline: bool = Field(
+        default=False,
+        description="Replay responses from --cache_folder without network access",
+    )
+    model: str = Field(default="gpt-5-nano", description="OpenAI model to use")
+    openai_api_key: SecretStr
+    temperature: float = Field(default=0.0, description="LLM temperature")
+    extract_workers: PositiveInt = Field(
+        default=10, description="Offers extracted at the same time"
+    )
+    queue_size: PositiveInt = Field(
+        default=20,
+        description="Scraped offers waiting for extraction before scraping pauses",
+    )
+    requests_per_minute: PositiveFloat = Field(
+        default=500, description="Provider request limit"
+    )
+    tokens_per_minute: PositiveInt = Field(
+        default=200_000, description="Provider token limit"
+    )
+    preprocess: bool = Field(
+        default=True,
+        description="Strip page boilerplate from offer text before the LLM",
+    )
+    rule_confidence: float | None = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description=(
+            "Take fields matched by regex rules with at least this"
+            " confidence instead of asking the LLM, e.g. 0.8"
+        ),
+    )
+    criteria: SearchCriteria = Field(
+        default=SearchCriteria.TOTAL_COST, description="Search criteria"
+    )
+    then_by: list[SearchCriteria] = Field(
+        default_factory=list,
+        description="Criteria breaking ties of the search criteria, in order",
+    )
+    filters: list[FilterType] = Field(
+        default_factory=list, description="Filters to apply"
+    )
+    top_n: PositiveInt = Field(
+        default=10, description="Number of top offers to show"
+    )
+    rank_interval: NonNegativeFloat = Field(
+        default=2.0,
+        description=(
+            "Minimum seconds between rankings of newly extracted offers,"
+            " each rebuilds the finder's columns"
+        ),
+    )
+    min_rent: PositiveFloat = Field(
+        default=500.0, description="Minimum rent price (outlier filter)"
+    )
+    max_rent: PositiveFloat = Field(
+        default=10000.0, description="Maximum rent price (outlier filter)"
+    )
+    min_area: PositiveFloat = Field(
+        default=5.0, description="Minimum area in m² (outlier filter)"
+    )
+    max_area: PositiveFloat = Field(
+        default=30.0, description="Maximum area in m² (outlier filter)"
+    )
+
+    model_config = SettingsConfigDict(
+        cli_parse_args=True,
+        env_file=".env",
+        extra="ignore",
+        cli_kebab_case=True,
+        cli_ignore_unknown_args=True,
+    )
+
+    @staticmethod
+    def _print_top(top: list[OfferResult]) -> None:
+        for i, offer in enumerate(top, start=1):
+            print(
+                f"  {i}. {offer.total_cost:.0f} PLN"
+                f" [{offer.source}] {offer.url}"
+            )
+
+    async def cli_cmd(self) -> None:
+        """Run the pipeline, printing the ranking when it changes, at most
+        every ``rank_interval`` seconds."""
+        filter_params = FilterParams(filters=self.filters)
+
+        with OfferStore(self.store) as store:
+            finder = BestOfferFinder(
+                # Unused, offers are loaded from the store
+                self.store.parent,
+                min_rent=self.min_rent,
+                max_rent=self.max_rent,
+                min_area=self.min_area,
+                max_area=self.max_area,
+                store=store,
+            )
+            finder.load_offers()
+            print(f"Loaded {len(finder.offers)} offers from {self.store}")
+            top = finder.find_best(
+                self.criteria, filter_params, self.top_n, self.then_by
+            )
+            unranked = 0
+            ranked_at = time.monotonic()
+
+            def rank() -> None:
+                nonlocal top, unranked, ranked_at
+                new_top = finder.find_best(
+                    self.criteria, filter_params, self.top_n, self.then_by
+                )
+                if new_top != top:
+                    top = new_top
+                    print(
+                        f"\n=== Top {len(top)} ({unranked} new offers"
+                        " ranked) ==="
+                    )
+                    self._print_top(top)
+                unranked = 0
+                ranked_at = time.monotonic()
+
+            def on_result(offer: OfferResult) -> None:
+                # Ranking rebuilds the columns of all offers, doing it for
+                # every offer would be quadratic in their number
+                nonlocal unranked
+                unranked += 1
+                if time.monotonic() - ranked_at >= self.rank_interval:
+                    rank()
+
+            pipeline = OfferPipeline(
+                OfferExtractor(
+                    model=self.model,
+                    temperature=self.temperature,
+                    api_key=self.openai_api_key,
+                    scheduler=ExtractionScheduler(
+                        requests_per_minute=self.requests_per_minute,
+                        tokens_per_minute=self.tokens_per_minute,
+                        max_concurrency=self.extract_workers,
+                    ),
+                    min_rule_confidence=self.rule_confidence,
+                ),
+                store,
+                finder,
+                preprocessor=TextPreprocessor() if self.preprocess else None,
+                extract_workers=self.extract_workers,
+                queue_size=self.queue_size,
+                on_result=on_result,
+            )
+            summary = await pipeline.run(
+                [
+                    AVAILABLE_WEBSITES[source](
+                        cache_folder=self.cache_folder, offline=self.offline
+                    )
+                    for source in self.sources
+                ],
+                self.city,
+                incremental=self.incremental,
+                max_pages=self.max_pages,
+            )
+            if unranked:
+                top = finder.find_best(
+                    self.criteria, filter_params, self.top_n, self.then_by
+                )
+
+        print("\n=== Pipeline Complete ===")
+        print(f"Offers scraped: {summary.scraped}")
+        if summary.resumed:
+            print(f"Offers resumed from earlier runs: {summary.resumed}")
+        print(
+            f"Offers extracted: {summary.extracted} ({summary.failed} failed)"
+        )
+        if summary.first_result_after is not None:
+            print(
+                f"First ranked offer after: {summary.first_result_after:.1f}s"
+            )
+        print(f"Total time: {summary.elapsed:.1f}s")
+        print(f"\n=== Top {len(top)} Offers ===")
+        self._print_top(top)
+
+
+if __name__ == "__main__":
+    CliApp.run(PipelineSettings)
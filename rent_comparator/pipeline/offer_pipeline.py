@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from collections.abc import Container
+from typing import Any
+from typing import NamedTuple
+
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments.finder import OfferResult
+from rent_comparator.extraction import OfferExtractor
+from rent_comparator.extraction import TextPreprocessor
+from rent_comparator.scrapers import offer_id
+from rent_comparator.scrapers import OfferData
+from rent_comparator.scrapers import Website
+from rent_comparator.scrapers.offer_index import normalize_url
+from rent_comparator.storage import OfferStore
+
+
+class _ScrapedOffer(NamedTuple):
+    source: str
+    name: str
+    offer_data: OfferData
+
+
+class PipelineSummary(NamedTuple):
+    scraped: int
+    # Offers scraped by earlier runs but not extracted, queued again
+    resumed: int
+    extracted: int
+    failed: int
+    elapsed: float
+    # Seconds from the start until the first offer was ranked
+    first_result_after: float | None
+
+
+class OfferPipeline:
+    """Scrapes, extracts and ranks offers in one streaming run.
+
+    Scraped offers are saved to ``store`` and passed through a queue of at
+    most ``queue_size`` offers to ``extract_workers`` extraction tasks,
+    whose results are saved and added to ``finder`` right away. A full
+    queue blocks the scrapers, which in turn stop fetching once their
+    prefetch buffer is full, so the crawl never runs far ahead of the LLM.
+    """
+
+    def __init__(
+        self,
+        extractor: OfferExtractor,
+        store: OfferStore,
+        finder: BestOfferFinder,
+        preprocessor: TextPreprocessor | None = None,
+        extract_workers: int = 10,
+        queue_size: int = 20,
+        on_result: Callable[[OfferResult], None] | None = None,
+    ):
+        self.extractor = extractor
+        self.store = store
+        self.finder = finder
+        self.preprocessor = preprocessor
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+        self.on_result = on_result
+        self._scraped = 0
+        self._resumed = 0
+        self._extracted = 0
+        self._failed = 0
+        self._start = 0.0
+        self._first_result_after: float | None = None
+
+    async def _scrape(
+        self,
+        website: Website,
+        city: str,
+        queue: asyncio.Queue[_ScrapedOffer | None],
+        incremental: bool,
+        scrape_options: dict[str, Any],
+    ) -> None:
+        source = website.website_type.value
+        known_urls: Container[str] = ()
+        if incremental:
+            known_urls = {
+                normalize_url(url) for url in self.store.urls(source)
+            }
+            # Known offers are not scraped again, ones whose extraction
+            # failed or never ran are extracted from the store
+            for name in self.store.pending_extraction(source):
+                scraped = self.store.get_scraped(source, name)
+                offer_data = OfferData(
+                    **{
+                        field: scraped[field]
+                        for field in OfferData._fields
+                        if field in scraped
+                    }
+                )
+                self._resumed += 1
+                await queue.put(_ScrapedOffer(source, name, offer_data))
+        async for offer_data in website.scrape(
+            city=city, known_urls=known_urls, **scrape_options
+        ):
+            name = f"{city}_offer_{offer_id(offer_data.url)}"
+            self.store.add_scraped(
+                source,
+                name,
+                {
+                    key: value
+                    for key, value in offer_data._asdict().items()
+                    if value is not None
+                },
+            )
+            self._scraped += 1
+            # Waits while the extraction workers are behind
+            await queue.put(_ScrapedOffer(source, name, offer_data))
+
+    def _offer_input(
+        self, offer: _ScrapedOffer
+    ) -> tuple[str, dict[str, Any] | None]:
+        offer_data = offer.offer_data
+        # As in the extraction CLI, the page text is kept with known
+        # parameters
+        offer_text = offer_data.text
+        if self.preprocessor is not None:
+            offer_text = self.preprocessor(offer_text, offer.source)
+        return offer_text, offer_data.parameters
+
+    async def _extract_worker(
+        self, queue: asyncio.Queue[_ScrapedOffer | None]
+    ) -> None:
+        while (offer := await queue.get()) is not None:
+            try:
+                params = await self.extractor.extract_async(
+                    *self._offer_input(offer)
+                )
+            except Exception as e:
+                self._failed += 1
+                print(
+                    f"  Extraction failed: {offer.source}/{offer.name}: {e!r}"
+                )
+                continue
+            self.store.add_extracted(
+                offer.source, offer.name, params.model_dump_json()
+            )
+            self._extracted += 1
+            result = self.finder.add_offer(
+                offer.source,
+                f"{offer.name}.json",
+                offer.offer_data.url,
+                params,
+            )
+            if result is None:
+                continue
+            if self._first_result_after is None:
+                self._first_result_after = time.perf_counter() - self._start
+            if self.on_result is not None:
+                self.on_result(result)
+
+    async def run(
+        self,
+        websites: list[Website],
+        city: str,
+        incremental: bool = True,
+        **scrape_options: Any,
+    ) -> PipelineSummary:
+        """Scrape ``websites`` at the same time and extract their offers.
+
+        Offers already in the store are not scraped again when
+        ``incremental``, those without extracted parameters are extracted
+        from the store; ``scrape_options`` are passed on to
+        ``Website.scrape``.
+        """
+        self._start = time.perf_counter()
+        queue: asyncio.Queue[_ScrapedOffer | None] = asyncio.Queue(
+            maxsize=self.queue_size
+        )
+        workers = [
+            asyncio.create_task(self._extract_worker(queue))
+            for _ in range(self.extract_workers)
+        ]
+        try:
+            results = await asyncio.gather(
+                *(
+                    self._scrape(
+                        website, city, queue, incremental, scrape_options
+                    )
+                    for website in websites
+                ),
+                return_exceptions=True,
+            )
+            for website, result in zip(websites, results):
+                if isinstance(result, BaseException):
+                    print(f"{website.name}: scraping failed ({result!r})")
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.store.flush()
+
+        return PipelineSummary(
+            scraped=self._scraped,
+            resumed=self._resumed,
+            extracted=self._extracted,
+            failed=self._failed,
+            elapsed=time.perf_counter() - self._start,
+            first_result_after=self._first_result_after,
+        )
@@ -3,6 +3,8 @@ from __future__ import annotations
 from .base import OfferData
 from .base import Website
 from .gratka import GratkaWebsite
+from .offer_index import offer_id
+from .offer_index import OfferIndex
 from .olx import OLXWebsite
 from .otodom import OtodomWebsite
 from .sort_params import SortDirection
@@ -17,6 +19,8 @@ AVAILABLE_WEBSITES: dict[WebsiteType, type[Website]] = {
 
 __all__ = [
     "OfferData",
+    "OfferIndex",
+    "offer_id",
     "Website",
     "WebsiteType",
     "OtodomWebsite",
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import NamedTuple
 
 from pydantic import Field
+from pydantic import model_validator
+from pydantic import NonNegativeInt
+from pydantic import PositiveFloat
 from pydantic import PositiveInt
 from pydantic_settings import BaseSettings
 from pydantic_settings import CliApp
 from rent_comparator.scrapers import AVAILABLE_WEBSITES
+from rent_comparator.scrapers import offer_id
+from rent_comparator.scrapers import OfferIndex
 from rent_comparator.scrapers import SortDirection
 from rent_comparator.scrapers import SortField
+from rent_comparator.scrapers import Website
 from rent_comparator.scrapers import WebsiteType
+from rent_comparator.scrapers.offer_index import normalize_url
+from rent_comparator.storage import OfferStore
 
 
 class ScraperSettings(BaseSettings):
@@ -34,48 +47,187 @@ class ScraperSettings(BaseSettings):
     sort_direction: SortDirection | None = Field(
         default=None, description="Sort direction"
     )
+    max_concurrency: PositiveInt | None = Field(
+        default=None,
+        description="Maximum in-flight offer fetches per website (site default if omitted)",
+    )
+    requests_per_second: PositiveFloat | None = Field(
+        default=None,
+        description="Request rate limit per website (site default if omitted)",
+    )
+    burst: PositiveInt | None = Field(
+        default=None,
+        description="Request burst size per website (site default if omitted)",
+    )
+    parallel: bool = Field(
+        default=False, description="Scrape all sources at the same time"
+    )
+    cache_folder: Path | None = Field(
+        default=None,
+        description="Folder for the on-disk HTTP response cache (disabled if omitted)",
+    )
+    offline: bool = Field(
+        default=False,
+        description="Replay responses from --cache_folder without network access",
+    )
+    parse_workers: NonNegativeInt = Field(
+        default=0,
+        description="Processes parsing offer pages (0 parses in the event loop)",
+    )
+    store: Path | None = Field(
+        default=None,
+        description="Offer store to save to instead of one JSON file per offer",
+    )
+    incremental: bool = Field(
+        default=True,
+        description="Skip offers already scraped in a previous run",
+    )
 
-    def cli_cmd(self) -> None:
-        """Execute the scraping command."""
-        # Ensure output folder exists
-        self.output_folder.mkdir(parents=True, exist_ok=True)
+    @model_validator(mode="after")
+    def validate_offline(self) -> ScraperSettings:
+        """Ensure offline replay has a cache to replay from."""
+        if self.offline and self.cache_folder is None:
+            raise ValueError("--offline requires --cache_folder")
+        return self
+
+    def _create_website(self, website_type: WebsiteType) -> Website:
+        overrides = {
+            name: value
+            for name in (
+                "max_concurrency",
+                "requests_per_second",
+                "burst",
+                "cache_folder",
+                "offline",
+            )
+            if (value := getattr(self, name)) is not None
+        }
+        return AVAILABLE_WEBSITES[website_type](**overrides)
 
-        total_offers = 0
+    async def _scrape_source(
+        self,
+        website_type: WebsiteType,
+        parse_executor: ProcessPoolExecutor | None = None,
+        store: OfferStore | None = None,
+    ) -> _SourceSummary:
+        website = self._create_website(website_type)
+        source = website_type.value
 
-        # Scrape from selected websites
-        for website_type in self.sources:
-            website_cls = AVAILABLE_WEBSITES[website_type]
-            website = website_cls()
+        print(f"\n=== Scraping {website.name} ===")
 
+        if store is None:
             # Create source-specific folder
-            source_folder = self.output_folder / website_type.value
+            source_folder = self.output_folder / source
             source_folder.mkdir(parents=True, exist_ok=True)
+            # URL-keyed index of offers saved by previous runs
+            offer_index = OfferIndex(
+                self.output_folder / f"{source}_index.json", source_folder
+            )
+            known_urls = offer_index
+        else:
+            known_urls = {normalize_url(url) for url in store.urls(source)}
 
-            print(f"\n=== Scraping {website.name} ===")
-
-            for index, offer_data in enumerate(
-                website.scrape(
-                    city=self.city,
-                    max_pages=self.max_pages,
-                    sort_field=self.sort_field,
-                    sort_direction=self.sort_direction,
-                ),
-                start=1,
+        start = time.perf_counter()
+        index = 0
+        try:
+            async for offer_data in website.scrape(
+                city=self.city,
+                max_pages=self.max_pages,
+                sort_field=self.sort_field,
+                sort_direction=self.sort_direction,
+                known_urls=known_urls if self.incremental else (),
+                parse_executor=parse_executor,
             ):
-                # Save each offer to a separate JSON file with URL and text
-                offer_file = source_folder / f"{self.city}_offer_{index}.json"
-                offer_json = {"url": offer_data.url, "text": offer_data.text}
+                index += 1
+                # Name each offer by its URL-derived ID
+                offer_name = f"{self.city}_offer_{offer_id(offer_data.url)}"
+                offer_json = {
+                    key: value
+                    for key, value in offer_data._asdict().items()
+                    if value is not None
+                }
+                if store is not None:
+                    store.add_scraped(source, offer_name, offer_json)
+                    print(f"  Scraped offer {index} -> {source}/{offer_name}")
+                    continue
+
+                offer_file = source_folder / f"{offer_name}.json"
                 offer_file.write_text(
                     json.dumps(offer_json, indent=2, ensure_ascii=False),
                     encoding="utf-8",
                 )
+                offer_index.add(offer_data.url, offer_file.name)
 
-                total_offers += 1
                 print(f"  Scraped offer {index} -> {offer_file}")
+        finally:
+            if store is None:
+                offer_index.save()
+            else:
+                store.flush()
+
+        return _SourceSummary(
+            name=website.name,
+            offers=index,
+            elapsed=time.perf_counter() - start,
+        )
+
+    async def cli_cmd(self) -> None:
+        """Execute the scraping command."""
+        # Ensure output folder exists
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+
+        with (
+            (
+                ProcessPoolExecutor(max_workers=self.parse_workers)
+                if self.parse_workers
+                else nullcontext()
+            ) as parse_executor,
+            OfferStore(self.store) if self.store else nullcontext() as store,
+        ):
+            # Scrape from selected websites
+            if self.parallel:
+                # Every source has its own client and limits, so one slow
+                # host does not hold the others back
+                results = await asyncio.gather(
+                    *(
+                        self._scrape_source(source, parse_executor, store)
+                        for source in self.sources
+                    ),
+                    return_exceptions=True,
+                )
+            else:
+                results = [
+                    await self._scrape_source(source, parse_executor, store)
+                    for source in self.sources
+                ]
+
+        total_elapsed = time.perf_counter() - start
+        summaries = [r for r in results if isinstance(r, _SourceSummary)]
 
         print("\n=== Summary ===")
-        print(f"Total offers scraped: {total_offers}")
-        print(f"Results saved to: {self.output_folder}")
+        for source, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                print(f"{source.value}: failed ({result!r})")
+            else:
+                print(
+                    f"{result.name}: {result.offers} offers in "
+                    f"{result.elapsed:.1f}s ({result.offers_per_second:.2f} offers/s)"
+                )
+        print(f"Total offers scraped: {sum(s.offers for s in summaries)}")
+        print(f"Total time: {total_elapsed:.1f}s")
+        print(f"Results saved to: {self.store or self.output_folder}")
+
+
+class _SourceSummary(NamedTuple):
+    name: str
+    offers: int
+    elapsed: float
+
+    @property
+    def offers_per_second(self) -> float:
+        return self.offers / self.elapsed if self.elapsed > 0 else 0.0
 
 
 if __name__ == "__main__":
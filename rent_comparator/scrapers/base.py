@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+import asyncio
+import functools
+import random
+from collections.abc import AsyncIterator
+from collections.abc import Container
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any
 from typing import ClassVar
 from typing import NamedTuple
 
@@ -9,7 +16,15 @@ from bs4 import BeautifulSoup
 from pydantic import BaseModel
 from pydantic import HttpUrl
 from pydantic import NonNegativeInt
+from pydantic import PositiveFloat
+from pydantic import PositiveInt
+from pydantic import PrivateAttr
 
+from .html_text import html_to_text
+from .http_cache import CachingTransport
+from .offer_index import normalize_url
+from .rate_limiter import parse_retry_after
+from .rate_limiter import RateLimiter
 from .sort_params import SortDirection
 from .sort_params import SortField
 from .website_type import WebsiteType
@@ -20,6 +35,11 @@ class OfferData(NamedTuple):
 
     url: str
     text: str
+    # Free-text part of the listing, when the site exposes it separately
+    description: str | None = None
+    # Offer parameters read from structured page data, keyed like
+    # OfferParameters fields
+    parameters: dict[str, Any] | None = None
 
 
 class Website(BaseModel):
@@ -33,6 +53,15 @@ class Website(BaseModel):
     sort_field_param: ClassVar[str] = "by"
     sort_direction_param: ClassVar[str] = "direction"
     n_promoted_messages: NonNegativeInt = 0
+    max_concurrency: PositiveInt = 5
+    prefetch_limit: PositiveInt = 64
+    requests_per_second: PositiveFloat = 5.0
+    burst: PositiveInt = 5
+    max_retries: NonNegativeInt = 3
+    retry_base_delay: PositiveFloat = 1.0
+    cache_folder: Path | None = None
+    offline: bool = False
+    _rate_limiter: RateLimiter | None = PrivateAttr(default=None)
 
     def get_search_url(
         self,
@@ -68,42 +97,23 @@ class Website(BaseModel):
             )
         return query_params
 
-    def _fetch_offer_page(self, client: httpx.Client, href: str) -> OfferData:
-        """Fetch and parse individual offer page content.
-
-        Returns:
-            OfferData with url and text, or None if error
-        """
+    def _get_offer_url(self, href: str) -> str:
         if href.startswith("http"):
-            offer_url = href
-        else:
-            offer_url = f"{self.base_url}{href}"
-
-        # Fetch the offer page
-        offer_response = client.get(offer_url)
-        offer_response.raise_for_status()
-
-        # Parse and clean the offer page
-        offer_soup = BeautifulSoup(offer_response.content, "lxml")
-
-        # Remove script and style elements
-        for script in offer_soup(["script", "style"]):
-            script.decompose()
-
-        # Get text and clean it
-        text = offer_soup.get_text(separator="\n")
+            return href
+        return f"{self.base_url}{href}"
 
-        return OfferData(url=offer_url, text=text)
-
-    def scrape(
-        self,
-        city: str,
-        max_pages: int = 10,
-        sort_field: SortField | None = None,
-        sort_direction: SortDirection | None = None,
-    ) -> Iterator[OfferData]:
-        """Generator that yields full text content for each offer."""
-        client = httpx.Client(
+    def _create_client(self) -> httpx.AsyncClient:
+        # One extra connection so search pages never wait on offers
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=self.max_concurrency + 1)
+        )
+        if self.cache_folder is not None:
+            transport = CachingTransport(
+                self.cache_folder / self.website_type.value,
+                transport=transport,
+                offline=self.offline,
+            )
+        return httpx.AsyncClient(
             headers={
                 "User-Agent": (
                     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
@@ -111,8 +121,108 @@ class Website(BaseModel):
             },
             timeout=30.0,
             follow_redirects=True,
+            transport=transport,
         )
 
+    def _retry_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.retry_base_delay * 2**attempt)
+
+    async def _get(
+        self, client: httpx.AsyncClient, url: str
+    ) -> httpx.Response:
+        """GET ``url`` through the host rate limiter with retries.
+
+        429/503 responses slow the rate limiter down (honoring Retry-After),
+        other 5xx responses and transport errors are retried with jitter.
+        """
+        if self.offline:
+            # Replayed from the cache, there is no host to be polite to
+            response = await client.get(url)
+            response.raise_for_status()
+            return response
+
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(
+                self.requests_per_second, self.burst
+            )
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            await self._rate_limiter.acquire()
+            try:
+                response = await client.get(url)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
+                self._rate_limiter.backoff(
+                    self._retry_delay(attempt)
+                    if retry_after is None
+                    else retry_after
+                )
+                if not last_attempt:
+                    continue
+            elif response.status_code >= 500 and not last_attempt:
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+
+            response.raise_for_status()
+            self._rate_limiter.record_success()
+            return response
+
+    async def _download_offer_page(
+        self, client: httpx.AsyncClient, href: str
+    ) -> tuple[str, bytes]:
+        """Download raw offer page, returning its URL and content."""
+        offer_url = self._get_offer_url(href)
+        offer_response = await self._get(client, offer_url)
+        return offer_url, offer_response.content
+
+    async def _fetch_offer_page(
+        self, client: httpx.AsyncClient, href: str
+    ) -> OfferData:
+        """Fetch and parse individual offer page content.
+
+        Returns:
+            OfferData with url and text, or None if error
+        """
+        offer_url, content = await self._download_offer_page(client, href)
+        return self._parse_offer_page(offer_url, content)
+
+    @classmethod
+    def _parse_offer_page(cls, offer_url: str, content: bytes) -> OfferData:
+        """Extract the offer page text, leaving out scripts and styles.
+
+        Parsing depends only on the page, so it can run in another process.
+        """
+        return OfferData(url=offer_url, text=html_to_text(content))
+
+    async def _produce_offer_hrefs(
+        self,
+        client: httpx.AsyncClient,
+        city: str,
+        max_pages: int,
+        sort_field: SortField | None,
+        sort_direction: SortDirection | None,
+        hrefs: asyncio.Queue[tuple[str, asyncio.Future[OfferData | None]]],
+        pending: asyncio.Queue[asyncio.Future[OfferData | None] | None],
+        known_urls: Container[str],
+    ) -> None:
+        """Walk search pages and queue offer hrefs for the workers.
+
+        A future per offer goes to ``pending`` in listing order, so the
+        consumer can yield offers in order while workers finish them out
+        of order. Errors are forwarded to the consumer the same way.
+        """
+        loop = asyncio.get_running_loop()
+        queued_urls = set()
         try:
             for page in range(1, max_pages + 1):
                 print(f"[{self.name}] Scraping page {page}/{max_pages}...")
@@ -120,8 +230,13 @@ class Website(BaseModel):
                 url = self.get_search_url(
                     city, page, sort_field, sort_direction
                 )
-                response = client.get(url)
-                response.raise_for_status()
+                try:
+                    response = await self._get(client, url)
+                except httpx.HTTPError as e:
+                    print(
+                        f"[{self.name}] Failed to fetch page {page} ({e!r}), stopping..."
+                    )
+                    break
 
                 soup = BeautifulSoup(response.content, "lxml")
 
@@ -134,15 +249,149 @@ class Website(BaseModel):
                     )
                     break
 
-                # Fetch and yield each offer's full page content
+                n_known = 0
                 for offer_link in offer_links[self.n_promoted_messages :]:
                     href = offer_link.get("href")
                     if not href:
                         continue
+                    offer_url = normalize_url(self._get_offer_url(href))
+                    if offer_url in known_urls:
+                        n_known += 1
+                        continue
+                    # Promoted offers may repeat across search pages
+                    if offer_url in queued_urls:
+                        continue
+                    queued_urls.add(offer_url)
+
+                    future = loop.create_future()
+                    # Blocks while the consumer is too far behind
+                    await pending.put(future)
+                    hrefs.put_nowait((href, future))
 
-                    offer_data = self._fetch_offer_page(client, href)
+                if n_known:
+                    print(
+                        f"[{self.name}] Skipped {n_known} already scraped offers on page {page}"
+                    )
+        except Exception as e:
+            future = loop.create_future()
+            future.set_exception(e)
+            await pending.put(future)
+        await pending.put(None)
+
+    def _report_offer_failure(self, href: str, error: BaseException) -> None:
+        # A single broken offer must not abort the whole run
+        print(f"[{self.name}] Failed to fetch offer {href}: {error!r}")
+
+    def _set_parsed_offer(
+        self,
+        href: str,
+        future: asyncio.Future[OfferData | None],
+        parsed: asyncio.Future[OfferData],
+    ) -> None:
+        if future.done():
+            return
+        if parsed.cancelled():
+            future.set_result(None)
+        elif (error := parsed.exception()) is not None:
+            self._report_offer_failure(href, error)
+            future.set_result(None)
+        else:
+            future.set_result(parsed.result())
+
+    async def _offer_worker(
+        self,
+        client: httpx.AsyncClient,
+        hrefs: asyncio.Queue[tuple[str, asyncio.Future[OfferData | None]]],
+        parse_executor: Executor | None,
+    ) -> None:
+        """Download offers and parse them inline or in ``parse_executor``.
+
+        With an executor the worker hands the raw page over and moves on to
+        the next download, so parsing never holds up network I/O.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            href, future = await hrefs.get()
+            try:
+                offer_url, content = await self._download_offer_page(
+                    client, href
+                )
+                if parse_executor is None:
+                    future.set_result(
+                        self._parse_offer_page(offer_url, content)
+                    )
+                    continue
+                parsed = loop.run_in_executor(
+                    parse_executor,
+                    self._parse_offer_page,
+                    offer_url,
+                    content,
+                )
+            except Exception as e:
+                self._report_offer_failure(href, e)
+                future.set_result(None)
+                continue
+            parsed.add_done_callback(
+                functools.partial(self._set_parsed_offer, href, future)
+            )
+
+    async def scrape(
+        self,
+        city: str,
+        max_pages: int = 10,
+        sort_field: SortField | None = None,
+        sort_direction: SortDirection | None = None,
+        known_urls: Container[str] = (),
+        parse_executor: Executor | None = None,
+    ) -> AsyncIterator[OfferData]:
+        """Async generator that yields full text content for each offer.
+
+        One task walks the search pages and queues offer hrefs while a pool
+        of ``max_concurrency`` workers fetches them, so the next search
+        page is requested before the current one is drained. At most
+        ``prefetch_limit`` offers are queued ahead of the consumer and
+        offers are yielded in listing order. Offers whose normalized URL
+        is in ``known_urls`` are never downloaded. Pages are parsed in
+        ``parse_executor`` when given, e.g. a ProcessPoolExecutor, so CPU
+        bound parsing scales with cores instead of blocking the event loop.
+        """
+        hrefs: asyncio.Queue[tuple[str, asyncio.Future[OfferData | None]]] = (
+            asyncio.Queue()
+        )
+        pending: asyncio.Queue[asyncio.Future[OfferData | None] | None] = (
+            asyncio.Queue(maxsize=self.prefetch_limit)
+        )
+
+        # Fresh limiter per run, shared by the producer and all workers
+        self._rate_limiter = RateLimiter(self.requests_per_second, self.burst)
+
+        async with self._create_client() as client:
+            tasks = [
+                asyncio.create_task(
+                    self._produce_offer_hrefs(
+                        client,
+                        city,
+                        max_pages,
+                        sort_field,
+                        sort_direction,
+                        hrefs,
+                        pending,
+                        known_urls,
+                    )
+                ),
+                *(
+                    asyncio.create_task(
+                        self._offer_worker(client, hrefs, parse_executor)
+                    )
+                    for _ in range(self.max_concurrency)
+                ),
+            ]
+            try:
+                while (future := await pending.get()) is not None:
+                    offer_data = await future
                     if offer_data:
                         yield offer_data
-
-        finally:
-            client.close()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
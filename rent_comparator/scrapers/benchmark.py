@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import time
+import zipfile
+from collections.abc import Callable
+from html import escape
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from pydantic import Field
+from pydantic import PositiveInt
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from rent_comparator.scrapers.html_text import extract_script
+from rent_comparator.scrapers.html_text import html_to_text
+from rent_comparator.scrapers.http_cache import read_cache_entry
+
+
+def _bs4_text(content: bytes) -> str:
+    """Reference implementation, as the scrapers parsed pages before."""
+    soup = BeautifulSoup(content, "lxml")
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return soup.get_text(separator="\n")
+
+
+def _bs4_next_data(content: bytes) -> str | None:
+    script = BeautifulSoup(content, "lxml").find(
+        "script", {"id": "__NEXT_DATA__"}
+    )
+    return script.get_text() if script else None
+
+
+def _build_page(text: str, with_next_data: bool) -> bytes:
+    """Rebuild an HTML page around scraped offer text.
+
+    data.zip only keeps the extracted text, so the lines are wrapped back
+    into markup together with script, style and JSON payloads comparable
+    to the ones on the live sites.
+    """
+    lines = text.split("\n")
+    body = "\n".join(
+        f'<div class="c{i % 7}"><span>{escape(line)}</span></div>'
+        + (f"<script>window.x{i}={i};</script>" if i % 25 == 0 else "")
+        for i, line in enumerate(lines[1:])
+    )
+    next_data = ""
+    if with_next_data:
+        payload = {"props": {"pageProps": {"ad": {"description": text}}}}
+        next_data = (
+            '<script id="__NEXT_DATA__" type="application/json">'
+            f"{json.dumps(payload)}</script>"
+        )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f"<title>{escape(lines[0])}</title>"
+        f"<style>{'.c{margin:0;padding:0}' * 200}</style>"
+        f"<script>{'var a=[1,2,3];' * 500}</script></head>"
+        f"<body>{body}{next_data}</body></html>"
+    ).encode()
+
+
+def _time(function: Callable[[bytes], object], pages: list[bytes]) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        function(page)
+    return time.perf_counter() - start
+
+
+class HtmlTextBenchmarkSettings(BaseSettings):
+    """Benchmark html_to_text against the BeautifulSoup implementation."""
+
+    data_zip: Path = Field(
+        default=Path("rent_comparator/data.zip"),
+        description="Archive with scraped offers to rebuild pages from",
+    )
+    cache_folder: Path | None = Field(
+        default=None,
+        description="HTTP cache with raw pages to use instead of data.zip",
+    )
+    repeat: PositiveInt = Field(
+        default=3, description="Timing repetitions, the best one is reported"
+    )
+
+    def _load_pages(self) -> list[bytes]:
+        if self.cache_folder is not None:
+            pages = []
+            for path in sorted(self.cache_folder.glob("*/*.gz")):
+                metadata, content = read_cache_entry(path)
+                if metadata["status_code"] == 200:
+                    pages.append(content)
+            return pages
+
+        with zipfile.ZipFile(self.data_zip) as archive:
+            return [
+                _build_page(
+                    json.loads(archive.read(name))["text"],
+                    with_next_data="/otodom/" in name,
+                )
+                for name in sorted(archive.namelist())
+                if "/rent_prices/" in name and name.endswith(".json")
+            ]
+
+    def cli_cmd(self) -> None:
+        pages = self._load_pages()
+        next_data_pages = [p for p in pages if b"__NEXT_DATA__" in p]
+        print(
+            f"Benchmarking {len(pages)} pages"
+            f" ({sum(map(len, pages)) / 1e6:.1f} MB)\n"
+        )
+
+        text_mismatches = sum(
+            _bs4_text(page) != html_to_text(page) for page in pages
+        )
+        next_data_mismatches = sum(
+            _bs4_next_data(page) != extract_script(page, "__NEXT_DATA__")
+            for page in next_data_pages
+        )
+        print(f"Text mismatches: {text_mismatches}/{len(pages)}")
+        print(
+            "__NEXT_DATA__ mismatches:"
+            f" {next_data_mismatches}/{len(next_data_pages)}\n"
+        )
+
+        for name, reference, fast, bench_pages in (
+            ("Page text", _bs4_text, html_to_text, pages),
+            (
+                "__NEXT_DATA__",
+                _bs4_next_data,
+                lambda page: extract_script(page, "__NEXT_DATA__"),
+                next_data_pages,
+            ),
+        ):
+            if not bench_pages:
+                continue
+            reference_time = min(
+                _time(reference, bench_pages) for _ in range(self.repeat)
+            )
+            fast_time = min(
+                _time(fast, bench_pages) for _ in range(self.repeat)
+            )
+            print(f"=== {name} ===")
+            print(
+                f"BeautifulSoup: {reference_time * 1e3 / len(bench_pages):.2f}"
+                " ms/page"
+            )
+            print(
+                f"Fast path: {fast_time * 1e3 / len(bench_pages):.2f} ms/page"
+            )
+            print(f"Speedup: {reference_time / fast_time:.1f}x\n")
+
+
+if __name__ == "__main__":
+    CliApp.run(HtmlTextBenchmarkSettings)
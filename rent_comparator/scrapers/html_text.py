@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+
+from bs4.dammit import EncodingDetector
+from lxml import etree
+
+# Strings inside these tags are not plain text for BeautifulSoup and are
+# skipped by get_text()
+_STRING_CONTAINER_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+_PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class _TextCollector:
+    """lxml parser target collecting text the way BeautifulSoup does.
+
+    BeautifulSoup builds its tree from the same lxml parser events, so
+    flushing and whitespace handling are mirrored here without building
+    any tree.
+    """
+
+    def __init__(self):
+        self.strings: list[str] = []
+        self._data: list[str] = []
+        self._open_tags: list[str] = []
+        self._n_string_containers = 0
+        self._n_preserve_whitespace = 0
+
+    def _flush(self) -> None:
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if self._n_string_containers:
+            return
+        if not self._n_preserve_whitespace and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self.strings.append(data)
+
+    def start(self, tag: str, attrib: dict, nsmap: dict | None = None) -> None:
+        self._flush()
+        self._open_tags.append(tag)
+        if tag in _STRING_CONTAINER_TAGS:
+            self._n_string_containers += 1
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self._n_preserve_whitespace += 1
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        tag = self._open_tags.pop()
+        if tag in _STRING_CONTAINER_TAGS:
+            self._n_string_containers -= 1
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self._n_preserve_whitespace -= 1
+
+    def data(self, data: str) -> None:
+        self._data.append(data)
+
+    def comment(self, text: str) -> None:
+        # Comments, doctypes and processing instructions end the current
+        # string but are never part of the text
+        self._flush()
+
+    def pi(self, target: str, data: str) -> None:
+        self._flush()
+
+    def doctype(self, name: str, pubid: str, system: str) -> None:
+        self._flush()
+
+    def close(self) -> list[str]:
+        self._flush()
+        return self.strings
+
+
+def _detect_encoding(content: bytes) -> str | None:
+    return next(iter(EncodingDetector(content, is_html=True).encodings), None)
+
+
+def html_to_text(content: bytes, separator: str = "\n") -> str:
+    """Extract page text without building a BeautifulSoup tree.
+
+    Produces the same result as ``BeautifulSoup(content, "lxml")
+    .get_text(separator)``, which already leaves out script, style and
+    template contents, but streams lxml parser events instead.
+    """
+    parser = etree.HTMLParser(
+        target=_TextCollector(),
+        recover=True,
+        encoding=_detect_encoding(content),
+    )
+    parser.feed(content)
+    return separator.join(parser.close())
+
+
+def extract_script(content: bytes, script_id: str) -> str | None:
+    """Slice the contents of ``<script id=script_id>`` out of a raw page.
+
+    Script contents are raw text in HTML, so no parsing is needed to read
+    embedded JSON such as Next.js ``__NEXT_DATA__``.
+    """
+    match = re.search(
+        rb"<script\b[^>]*\bid=([\"']?)"
+        + re.escape(script_id.encode())
+        + rb"\1(?=[\s>])[^>]*>(.*?)</script\s*>",
+        content,
+        re.DOTALL | re.IGNORECASE,
+    )
+    if match is None:
+        return None
+    return match.group(2).decode(_detect_encoding(content) or "utf-8")
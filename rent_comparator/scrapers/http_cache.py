@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+import httpx
+
+# Headers describing how the body travelled over the wire, the cached body is
+# stored decoded so these no longer apply on replay
+_WIRE_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding", "connection"}
+)
+_CACHEABLE_STATUSES = frozenset({200, 301, 302, 303, 307, 308})
+
+
+def read_cache_entry(path: Path) -> tuple[dict, bytes]:
+    """Read cached response metadata and decoded body from ``path``."""
+    metadata, _, content = gzip.decompress(path.read_bytes()).partition(b"\n")
+    return json.loads(metadata), content
+
+
+class CacheMissError(httpx.RequestError):
+    """Raised in offline mode for requests that are not in the cache."""
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """HTTP transport backed by an on-disk, gzip compressed response cache.
+
+    GET responses are stored per URL. Later requests for the same URL are
+    sent with If-None-Match/If-Modified-Since and a 304 is answered from the
+    cache. In offline mode the network is never used, which allows
+    replaying a scrape when only the parsing logic changed.
+    """
+
+    def __init__(
+        self,
+        cache_folder: Path,
+        transport: httpx.AsyncBaseTransport | None = None,
+        offline: bool = False,
+    ):
+        self.cache_folder = cache_folder
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.offline = offline
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, url: httpx.URL) -> Path:
+        key = hashlib.sha1(str(url).encode()).hexdigest()
+        return self.cache_folder / f"{key}.gz"
+
+    def _load(self, url: httpx.URL) -> tuple[dict, bytes] | None:
+        path = self._entry_path(url)
+        if not path.exists():
+            return None
+        return read_cache_entry(path)
+
+    def _store(
+        self, response: httpx.Response, content: bytes
+    ) -> tuple[dict, bytes]:
+        metadata = {
+            "url": str(response.request.url),
+            "status_code": response.status_code,
+            "headers": [
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in _WIRE_HEADERS
+            ],
+        }
+        path = self._entry_path(response.request.url)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(
+            gzip.compress(json.dumps(metadata).encode() + b"\n" + content)
+        )
+        tmp_path.replace(path)
+        return metadata, content
+
+    @staticmethod
+    def _replay(
+        entry: tuple[dict, bytes], request: httpx.Request
+    ) -> httpx.Response:
+        metadata, content = entry
+        return httpx.Response(
+            metadata["status_code"],
+            headers=metadata["headers"],
+            content=content,
+            request=request,
+        )
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+
+        entry = self._load(request.url)
+        if self.offline:
+            if entry is None:
+                raise CacheMissError(
+                    f"{request.url} is not cached", request=request
+                )
+            return self._replay(entry, request)
+
+        if entry is not None:
+            headers = httpx.Headers(entry[0]["headers"])
+            if "etag" in headers:
+                request.headers["If-None-Match"] = headers["etag"]
+            if "last-modified" in headers:
+                request.headers["If-Modified-Since"] = headers["last-modified"]
+
+        response = await self.transport.handle_async_request(request)
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            return self._replay(entry, request)
+        if response.status_code not in _CACHEABLE_STATUSES:
+            return response
+
+        # Read the decoded body so it can be stored and handed back as is
+        response.request = request
+        content = await response.aread()
+        return self._replay(self._store(response, content), request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
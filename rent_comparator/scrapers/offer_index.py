@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Drop query string, fragment and trailing slash from an offer URL."""
+    parts = urlsplit(url)
+    return urlunsplit(
+        (parts.scheme, parts.netloc.lower(), parts.path.rstrip("/"), "", "")
+    )
+
+
+def offer_id(url: str) -> str:
+    """Stable offer identifier derived from its URL."""
+    return hashlib.sha1(normalize_url(url).encode()).hexdigest()[:16]
+
+
+class OfferIndex:
+    """URL-keyed index of offers already saved to a source folder.
+
+    The index is persisted as JSON next to the source folder. When it does
+    not exist yet it is rebuilt from the offer files already in the folder.
+    """
+
+    def __init__(self, path: Path, source_folder: Path):
+        self.path = path
+        self.offers: dict[str, str] = {}
+        if path.exists():
+            self.offers = json.loads(path.read_text(encoding="utf-8"))
+        elif source_folder.is_dir():
+            for offer_file in source_folder.glob("*.json"):
+                data = json.loads(offer_file.read_text(encoding="utf-8"))
+                self.offers[normalize_url(data["url"])] = offer_file.name
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and normalize_url(url) in self.offers
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    def add(self, url: str, file_name: str) -> None:
+        self.offers[normalize_url(url)] = file_name
+
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(self.offers, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import json
+from typing import Any
 from typing import ClassVar
 
-import httpx
-from bs4 import BeautifulSoup
 from pydantic import HttpUrl
 from pydantic import NonNegativeInt
 from pydantic_settings import BaseSettings
 
 from .base import OfferData
 from .base import Website
+from .html_text import extract_script
+from .html_text import html_to_text
 from .sort_params import SortDirection
 from .sort_params import SortField
 from .website_type import WebsiteType
@@ -43,31 +44,124 @@ class OtodomWebsite(Website):
             )
         )
 
-    def _fetch_offer_page(self, client: httpx.Client, href: str) -> OfferData:
-        """Fetch and parse Otodom offer page from MainContent div."""
-        if href.startswith("http"):
-            offer_url = href
-        else:
-            offer_url = f"{self.base_url}{href}"
+    @classmethod
+    def _parse_offer_page(cls, offer_url: str, content: bytes) -> OfferData:
+        """Parse Otodom offer page, appending the ad description.
 
-        # Fetch the offer page
-        offer_response = client.get(offer_url)
-        offer_response.raise_for_status()
+        Price, area, rooms, floor and location are read straight from the
+        ad in ``__NEXT_DATA__``.
+        """
+        ad = json.loads(extract_script(content, "__NEXT_DATA__"))["props"][
+            "pageProps"
+        ]["ad"]
+        description = ad["description"]
 
-        # Parse and clean the offer page
-        offer_soup = BeautifulSoup(offer_response.content, "lxml")
+        return OfferData(
+            url=offer_url,
+            text=html_to_text(content) + description,
+            description=description,
+            parameters=_ad_parameters(ad),
+        )
+
+
+def _to_number(value: Any) -> float | None:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    try:
+        return float(str(value).replace(" ", "").replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_floor(value: Any) -> int | None:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value == "ground_floor":
+        return 0
+    if isinstance(value, str) and value.startswith("floor_"):
+        value = value.removeprefix("floor_")
+    number = _to_number(value)
+    return int(number) if number is not None else None
 
-        description = json.loads(
-            offer_soup.find("script", {"id": "__NEXT_DATA__"}).get_text()
-        )["props"]["pageProps"]["ad"]["description"]
-        # Remove script and style elements
-        for script in offer_soup(["style", "scripts"]):
-            script.decompose()
 
-        # Get text and clean it
-        text = offer_soup.get_text(separator="\n")
+def _address_part(address: dict[str, Any], key: str) -> str | None:
+    value = address.get(key)
+    return value.get("name") if isinstance(value, dict) else value
 
-        return OfferData(url=offer_url, text=text + description)
+
+def _ad_parameters(ad: dict[str, Any]) -> dict[str, Any]:
+    """Map an Otodom ``__NEXT_DATA__`` ad to OfferParameters fields.
+
+    Only fields present in the ad are returned, the rest is left to the
+    LLM.
+    """
+    characteristics = {
+        c["key"]: c.get("value")
+        for c in ad.get("characteristics") or []
+        if "key" in c
+    }
+    target = ad.get("target") or {}
+
+    parameters: dict[str, Any] = {}
+    rent_price = _to_number(characteristics.get("price", target.get("Price")))
+    if rent_price:
+        parameters["rent_price"] = rent_price
+    other_prices = _to_number(characteristics.get("rent", target.get("Rent")))
+    if other_prices is not None and other_prices >= 0:
+        parameters["other_prices"] = other_prices
+    deposit = _to_number(characteristics.get("deposit", target.get("Deposit")))
+    if deposit is not None and deposit >= 0:
+        parameters["deposit"] = deposit
+    area = _to_number(characteristics.get("m", target.get("Area")))
+    if area:
+        parameters["area"] = area
+    rooms = _to_number(
+        characteristics.get("rooms_num", target.get("Rooms_num"))
+    )
+    if rooms is not None:
+        parameters["rooms"] = int(rooms)
+    floor = _parse_floor(
+        characteristics.get("floor_no", target.get("Floor_no"))
+    )
+    if floor is not None:
+        parameters["floor"] = floor
+    total_floors = _to_number(
+        characteristics.get(
+            "building_floors_num", target.get("Building_floors_num")
+        )
+    )
+    if total_floors is not None:
+        parameters["total_floors"] = int(total_floors)
+    if available_from := characteristics.get("free_from"):
+        parameters["available_from"] = str(available_from)
+
+    address = (ad.get("location") or {}).get("address") or {}
+    street = _address_part(address, "street")
+    street_number = (
+        address["street"].get("number")
+        if isinstance(address.get("street"), dict)
+        else None
+    )
+    if street and street_number:
+        street = f"{street} {street_number}"
+    location = [
+        part
+        for part in (
+            _address_part(address, "subdistrict"),
+            _address_part(address, "district"),
+            _address_part(address, "city"),
+        )
+        if part
+    ]
+    if location:
+        parameters["location"] = ", ".join(location)
+    if street:
+        parameters["address"] = ", ".join(
+            filter(
+                None, [street, *location, _address_part(address, "province")]
+            )
+        )
+    return parameters
 
 
 class _CityToVoivodeship(BaseSettings):
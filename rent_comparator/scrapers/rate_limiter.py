@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate to a single host.
+
+    The bucket refills at ``rate`` tokens per second up to ``burst``. When the
+    host signals overload the rate is halved and requests are paused, then it
+    recovers additively towards ``requests_per_second`` on every success.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        burst: int,
+        min_requests_per_second: float = 0.1,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_requests_per_second = min_requests_per_second
+        self.rate = requests_per_second
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def backoff(self, delay: float) -> None:
+        """Slow down after the host rejected a request for ``delay`` seconds."""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_requests_per_second, self.rate / 2)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + delay)
+
+    def record_success(self) -> None:
+        """Recover the rate step by step after successful requests."""
+        self.rate = min(
+            self.requests_per_second,
+            self.rate + self.requests_per_second / 10,
+        )
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date.
+
+    Infinite, NaN and negative delays are invalid and return None, like
+    unparseable values, so callers use their own backoff.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return seconds if math.isfinite(seconds) and seconds >= 0 else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from .query_server import LatencyStats
+from .query_server import QueryRequest
+from .query_server import QueryServer
+
+__all__ = ["LatencyStats", "QueryRequest", "QueryServer"]
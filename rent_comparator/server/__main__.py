@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
+from pathlib import Path
+
+from pydantic import Field
+from pydantic import NonNegativeInt
+from pydantic import PositiveFloat
+from pydantic import PositiveInt
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from pydantic_settings import SettingsConfigDict
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.server import QueryServer
+from rent_comparator.storage import OfferStore
+
+
+class ServerSettings(BaseSettings):
+    """Serve best offer queries over local HTTP."""
+
+    host: str = Field(default="127.0.0.1", description="Address to bind")
+    port: int = Field(default=8765, description="Port to listen on")
+    data_folder: Path = Field(
+        default=Path("rent_comparator/data/extracted_parameters"),
+        description="Folder with extracted offer parameters",
+    )
+    store: Path | None = Field(
+        default=None,
+        description="Offer store to load offers from instead of data_folder",
+    )
+    snapshot_folder: Path | None = Field(
+        default=Path("rent_comparator/data/offer_snapshot"),
+        description=(
+            "Folder of the binary offer snapshot, so reloads read only"
+            " changed offer files; null disables it"
+        ),
+    )
+    reload_interval: PositiveFloat = Field(
+        default=30.0, description="Seconds between checks for changed offers"
+    )
+    cache_size: NonNegativeInt = Field(
+        default=256, description="Query results cached per dataset version"
+    )
+    latency_window: PositiveInt = Field(
+        default=10_000, description="Latest queries in latency percentiles"
+    )
+    min_rent: PositiveFloat = Field(
+        default=500.0, description="Minimum rent price (outlier filter)"
+    )
+    max_rent: PositiveFloat = Field(
+        default=10000.0, description="Maximum rent price (outlier filter)"
+    )
+    min_area: PositiveFloat = Field(
+        default=5.0, description="Minimum area in m² (outlier filter)"
+    )
+    max_area: PositiveFloat = Field(
+        default=30.0, description="Maximum area in m² (outlier filter)"
+    )
+    load_workers: PositiveInt = Field(
+        default=8, description="Threads reading offer files"
+    )
+
+    model_config = SettingsConfigDict(
+        cli_parse_args=True,
+        env_file=".env",
+        extra="ignore",
+        cli_kebab_case=True,
+        cli_ignore_unknown_args=True,
+    )
+
+    def cli_cmd(self) -> None:
+        """Load offers and answer queries until interrupted."""
+        with OfferStore(self.store) if self.store else nullcontext() as store:
+            server = QueryServer(
+                lambda: BestOfferFinder(
+                    self.data_folder,
+                    min_rent=self.min_rent,
+                    max_rent=self.max_rent,
+                    min_area=self.min_area,
+                    max_area=self.max_area,
+                    store=store,
+                    load_workers=self.load_workers,
+                    snapshot_folder=self.snapshot_folder,
+                    cache_size=self.cache_size,
+                ),
+                host=self.host,
+                port=self.port,
+                reload_interval=self.reload_interval,
+                latency_window=self.latency_window,
+            )
+            server.load()
+            host, port = server.address
+            print(
+                f"Serving {len(server.finder.offers)} offers on"
+                f" http://{host}:{port} (POST /query, GET /stats)"
+            )
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                print("\nStopped")
+
+
+if __name__ == "__main__":
+    CliApp.run(ServerSettings)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic import PositiveInt
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments import FilterParams
+from rent_comparator.experiments import SearchCriteria
+from rent_comparator.experiments.finder import OfferResult
+
+_OFFERS_ADAPTER = TypeAdapter(list[OfferResult])
+
+
+class QueryRequest(BaseModel):
+    """Body of a ``POST /query`` request."""
+
+    criteria: SearchCriteria = SearchCriteria.TOTAL_COST
+    then_by: list[SearchCriteria] = []
+    filter_params: FilterParams = FilterParams()
+    top_n: PositiveInt = 10
+
+
+class LatencyStats:
+    """Latencies of the last ``window`` queries."""
+
+    def __init__(self, window: int = 10_000):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+        self.total += 1
+
+    def summary(self) -> dict[str, float | int]:
+        """Query count and latency percentiles in milliseconds."""
+        summary: dict[str, float | int] = {"queries": self.total}
+        if self._latencies:
+            latencies = np.array(self._latencies) * 1e3
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            summary.update(
+                p50_ms=p50, p90_ms=p90, p99_ms=p99, max_ms=latencies.max()
+            )
+        return summary
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients issuing many queries reuse the connection
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, with Nagle's algorithm the
+    # body would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def do_GET(self) -> None:
+        if self.path != "/stats":
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+        self._send(200, json.dumps(self.server.query_server.stats()).encode())
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/query":
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+        try:
+            request = QueryRequest.model_validate_json(body or b"{}")
+        except ValidationError as e:
+            self._send_error(400, str(e))
+            return
+        try:
+            response = self.server.query_server.query(request)
+        except Exception as e:
+            self._send_error(500, repr(e))
+        else:
+            self._send(200, response)
+        self.server.query_server.latency.add(time.perf_counter() - start)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Requests are not logged, the dashboard issues too many."""
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], query_server: QueryServer):
+        super().__init__(address, _RequestHandler)
+        self.query_server = query_server
+
+
+class QueryServer:
+    """Local HTTP API answering ``find_best`` queries from memory.
+
+    ``POST /query`` takes a :class:`QueryRequest` and returns the offers
+    with the dataset version they come from; ``GET /stats`` returns the
+    dataset size, version, latency percentiles and result cache hit rate.
+    Every ``reload_interval`` seconds a background thread checks the
+    finder's source and, if offers changed, loads a new finder that
+    replaces the current one once its index is built, so queries never
+    wait for it.
+    """
+
+    def __init__(
+        self,
+        create_finder: Callable[[], BestOfferFinder],
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        reload_interval: float = 30.0,
+        latency_window: int = 10_000,
+    ):
+        self.create_finder = create_finder
+        self.reload_interval = reload_interval
+        self.latency = LatencyStats(latency_window)
+        self.loaded_at = 0.0
+        # Swapped as a whole, so a query never mixes two datasets
+        self._loaded: tuple[BestOfferFinder, int] | None = None
+        self._source_state: object = None
+        self._stopped = threading.Event()
+        self._http_server = _HTTPServer((host, port), self)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._http_server.server_address[:2]
+
+    @property
+    def finder(self) -> BestOfferFinder:
+        return self._loaded[0]
+
+    @property
+    def version(self) -> int:
+        """Number of loads so far, identifying the served dataset."""
+        return 0 if self._loaded is None else self._loaded[1]
+
+    def load(self) -> None:
+        """Load a new finder and make it answer queries."""
+        finder = self.create_finder()
+        # Read before loading, so changes made meanwhile trigger a reload
+        source_state = finder.source_state()
+        finder.load_offers()
+        finder.columns
+        self._loaded = (finder, self.version + 1)
+        self._source_state = source_state
+        self.loaded_at = time.time()
+
+    def _reload_loop(self) -> None:
+        while not self._stopped.wait(self.reload_interval):
+            try:
+                if self.finder.source_state() == self._source_state:
+                    continue
+                start = time.perf_counter()
+                self.load()
+                print(
+                    f"Reloaded {len(self.finder.offers)} offers"
+                    f" (version {self.version})"
+                    f" in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as e:
+                print(f"Reload failed, serving version {self.version}: {e}")
+
+    def query(self, request: QueryRequest) -> bytes:
+        """JSON response to ``request``."""
+        finder, version = self._loaded
+        offers = finder.find_best(
+            request.criteria,
+            request.filter_params,
+            request.top_n,
+            request.then_by,
+        )
+        return b'{"version":%d,"offers":%s}' % (
+            version,
+            _OFFERS_ADAPTER.dump_json(offers),
+        )
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "version": self.version,
+            "offers": len(self.finder.offers),
+            "loaded_at": self.loaded_at,
+            "latency": self.latency.summary(),
+            "cache": self.finder.result_cache.stats(),
+        }
+
+    def serve_forever(self) -> None:
+        """Load offers and serve until :meth:`shutdown`."""
+        if self._loaded is None:
+            self.load()
+        reload_thread = threading.Thread(target=self._reload_loop, daemon=True)
+        reload_thread.start()
+        try:
+            self._http_server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._http_server.server_close()
+
+    def shutdown(self) -> None:
+        self._http_server.shutdown()
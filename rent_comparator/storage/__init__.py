@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from .offer_store import OfferStore
+from .offer_store import StoredOffer
+
+__all__ = ["OfferStore", "StoredOffer"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from pydantic_settings import CliApp
+from rent_comparator.storage import OfferStore
+
+
+class MigrationSettings(BaseSettings):
+    """Import per-offer JSON folders into a single offer store."""
+
+    data_folder: Path = Field(
+        default=Path("rent_comparator/data"),
+        description="Folder with rent_prices and extracted_parameters subfolders",
+    )
+    store: Path = Field(
+        default=Path("rent_comparator/data/offers.db"),
+        description="Offer store to import into",
+    )
+
+    def cli_cmd(self) -> None:
+        """Copy every scraped and extracted offer file into the store."""
+        total_scraped = 0
+        total_extracted = 0
+
+        with OfferStore(self.store, batch_size=1000) as store:
+            for source_folder in sorted(
+                (self.data_folder / "rent_prices").glob("*")
+            ):
+                if not source_folder.is_dir():
+                    continue
+                for offer_file in source_folder.glob("*.json"):
+                    store.add_scraped(
+                        source_folder.name,
+                        offer_file.stem,
+                        json.loads(offer_file.read_text(encoding="utf-8")),
+                    )
+                    total_scraped += 1
+
+            for source_folder in sorted(
+                (self.data_folder / "extracted_parameters").glob("*")
+            ):
+                if not source_folder.is_dir():
+                    continue
+                for offer_file in source_folder.glob("*.json"):
+                    store.add_extracted(
+                        source_folder.name,
+                        offer_file.stem,
+                        offer_file.read_text(encoding="utf-8"),
+                    )
+                    total_extracted += 1
+
+        print("=== Migration Complete ===")
+        print(f"Scraped offers imported: {total_scraped}")
+        print(f"Extracted parameters imported: {total_extracted}")
+        print(f"Store: {self.store}")
+
+
+if __name__ == "__main__":
+    CliApp.run(MigrationSettings)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scraped_offers (
+    source TEXT NOT NULL,
+    offer_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (source, offer_id)
+);
+CREATE INDEX IF NOT EXISTS scraped_offers_url ON scraped_offers (url);
+CREATE TABLE IF NOT EXISTS extracted_parameters (
+    source TEXT NOT NULL,
+    offer_id TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    PRIMARY KEY (source, offer_id)
+);
+"""
+
+
+class StoredOffer(NamedTuple):
+    """Extracted parameters of an offer with the URL it was scraped from."""
+
+    source: str
+    offer_id: str
+    url: str
+    parameters: str
+
+
+class OfferStore:
+    """Single-file SQLite store for scraped offers and extracted parameters.
+
+    Scraped offers are kept as zlib compressed JSON next to their URL, so
+    URLs and parameters can be read without decompressing page text. Writes
+    are buffered and committed in batches of ``batch_size``. The store can
+    be shared between threads.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._scraped_buffer: list[tuple[str, str, str, bytes]] = []
+        self._extracted_buffer: list[tuple[str, str, str]] = []
+
+    def __enter__(self) -> OfferStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def add_scraped(
+        self, source: str, offer_id: str, offer: dict[str, Any]
+    ) -> None:
+        """Queue a scraped offer (``url``, ``text`` and optional extras)."""
+        data = zlib.compress(json.dumps(offer, ensure_ascii=False).encode())
+        with self._lock:
+            self._scraped_buffer.append((source, offer_id, offer["url"], data))
+            if len(self._scraped_buffer) >= self.batch_size:
+                self._flush()
+
+    def add_extracted(
+        self, source: str, offer_id: str, parameters: str
+    ) -> None:
+        """Queue extracted parameters, given as OfferParameters JSON."""
+        with self._lock:
+            self._extracted_buffer.append((source, offer_id, parameters))
+            if len(self._extracted_buffer) >= self.batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scraped_offers VALUES (?, ?, ?, ?)",
+                self._scraped_buffer,
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO extracted_parameters VALUES (?, ?, ?)",
+                self._extracted_buffer,
+            )
+        self._scraped_buffer = []
+        self._extracted_buffer = []
+
+    def flush(self) -> None:
+        """Commit all queued writes."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            self._flush()
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def data_version(self) -> int:
+        """Number that changes whenever another connection commits."""
+        return self._query("PRAGMA data_version")[0][0]
+
+    def sources(self) -> list[str]:
+        return [
+            row[0]
+            for row in self._query(
+                "SELECT DISTINCT source FROM scraped_offers ORDER BY source"
+            )
+        ]
+
+    def urls(self, source: str) -> list[str]:
+        """URLs of all offers scraped from ``source``."""
+        return [
+            row[0]
+            for row in self._query(
+                "SELECT url FROM scraped_offers WHERE source = ?", (source,)
+            )
+        ]
+
+    def get_scraped(self, source: str, offer_id: str) -> dict[str, Any] | None:
+        rows = self._query(
+            "SELECT data FROM scraped_offers WHERE source = ? AND offer_id = ?",
+            (source, offer_id),
+        )
+        return json.loads(zlib.decompress(rows[0][0])) if rows else None
+
+    def pending_extraction(self, source: str) -> list[str]:
+        """IDs of offers from ``source`` without extracted parameters."""
+        return [
+            row[0]
+            for row in self._query(
+                "SELECT s.offer_id FROM scraped_offers s"
+                " LEFT JOIN extracted_parameters e"
+                " ON e.source = s.source AND e.offer_id = s.offer_id"
+                " WHERE s.source = ? AND e.offer_id IS NULL"
+                " ORDER BY s.offer_id",
+                (source,),
+            )
+        ]
+
+    def iter_extracted(self) -> Iterator[StoredOffer]:
+        """Extracted parameters of all offers together with their URLs."""
+        for row in self._query(
+            "SELECT e.source, e.offer_id, s.url, e.parameters"
+            " FROM extracted_parameters e JOIN scraped_offers s"
+            " ON s.source = e.source AND s.offer_id = e.offer_id"
+            " ORDER BY e.source, e.offer_id"
+        ):
+            yield StoredOffer(*row)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture
+def data_folder(tmp_path: Path) -> Path:
+    """Extracted parameters folder, scraped offers are next to it."""
+    folder = tmp_path / "extracted_parameters"
+    folder.mkdir()
+    return folder
+
+
+@pytest.fixture
+def write_offer(data_folder: Path) -> Callable[..., Path]:
+    """Writes the extracted parameters and URL of one offer."""
+
+    def write_offer(source: str, name: str, **parameters: Any) -> Path:
+        parameters = {
+            "area": 15,
+            "rooms": None,
+            "address": None,
+            "location": None,
+            "floor": None,
+            "total_floors": None,
+            "available_from": None,
+            "utilities_included": None,
+            **parameters,
+        }
+        offer_file = data_folder / source / f"{name}.json"
+        offer_file.parent.mkdir(exist_ok=True)
+        offer_file.write_text(json.dumps(parameters))
+        scraped_file = (
+            data_folder.parent / "rent_prices" / source / offer_file.name
+        )
+        scraped_file.parent.mkdir(parents=True, exist_ok=True)
+        scraped_file.write_text(
+            json.dumps({"url": f"https://{source}.pl/{name}"})
+        )
+        return offer_file
+
+    return write_offer
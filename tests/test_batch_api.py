@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import SecretStr
+from rent_comparator.extraction import BatchExtraction
+from rent_comparator.extraction import OfferExtractor
+from rent_comparator.extraction import OfferParameters
+from rent_comparator.extraction.batch_api import BatchStatus
+
+
+def _parameters(rent_price: float) -> OfferParameters:
+    return OfferParameters(
+        rent_price=rent_price,
+        area=15,
+        rooms=None,
+        address=None,
+        location="Krzyki",
+        floor=None,
+        total_floors=None,
+        available_from=None,
+        utilities_included=None,
+    )
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeBatchProvider:
+    """Batch API answering from ``answers``, None answers are errors.
+
+    Batches report ``in_progress`` until listed in ``completed``; polling
+    one of them raises :class:`Interrupted` while ``interrupt`` is set.
+    """
+
+    def __init__(self, answers: dict[str, OfferParameters | None]):
+        self.answers = answers
+        self.completed: set[str] = set()
+        self.interrupt = False
+        self.submitted: list[list[str]] = []
+        self._files: dict[str, list[str]] = {}
+
+    def upload(self, path: Path) -> str:
+        file_id = f"file-{len(self._files)}"
+        self._files[file_id] = [
+            json.loads(line)["custom_id"]
+            for line in path.read_text().splitlines()
+        ]
+        return file_id
+
+    def submit(self, file_id: str) -> str:
+        self.submitted.append(self._files[file_id])
+        return f"batch-{len(self.submitted) - 1}"
+
+    def status(self, batch_id: str) -> BatchStatus:
+        if batch_id not in self.completed:
+            if self.interrupt:
+                raise Interrupted
+            return BatchStatus("in_progress")
+        return BatchStatus("completed", output_file_id=f"output-{batch_id}")
+
+    def _output_line(self, custom_id: str) -> str:
+        parameters = self.answers[custom_id]
+        if parameters is None:
+            response = {"status_code": 500, "body": {}}
+        else:
+            response = {
+                "status_code": 200,
+                "body": {
+                    "choices": [
+                        {"message": {"content": parameters.model_dump_json()}}
+                    ]
+                },
+            }
+        return json.dumps({"custom_id": custom_id, "response": response})
+
+    def download(self, file_id: str) -> bytes:
+        batch = int(file_id.removeprefix("output-batch-"))
+        return "\n".join(
+            self._output_line(custom_id) for custom_id in self.submitted[batch]
+        ).encode()
+
+
+def _offers(*custom_ids: str) -> dict[str, tuple[str, None]]:
+    return {
+        custom_id: (f"Pokój {custom_id}", None) for custom_id in custom_ids
+    }
+
+
+def _extraction(provider: FakeBatchProvider, folder: Path) -> BatchExtraction:
+    return BatchExtraction(
+        OfferExtractor(SecretStr("test")),
+        provider,
+        folder,
+        max_requests_per_batch=2,
+        poll_interval=0,
+    )
+
+
+def test_resumes_partially_completed_batches(tmp_path: Path):
+    offers = _offers("a", "b", "c")
+    provider = FakeBatchProvider({"a": _parameters(1000), "b": None})
+    provider.answers["c"] = _parameters(1500)
+    extraction = _extraction(provider, tmp_path)
+
+    assert extraction.submit(offers) == []
+    assert provider.submitted == [["a", "b"], ["c"]]
+
+    provider.completed.add("batch-0")
+    provider.interrupt = True
+    results = extraction.results(offers)
+    first = {result.custom_id: result for result in next(results)}
+    assert first["a"].parameters == _parameters(1000)
+    assert first["b"].parameters is None and first["b"].error
+    # Interrupted while waiting for the second batch
+    with pytest.raises(Interrupted):
+        next(results)
+
+    provider.interrupt = False
+    resumed = _extraction(provider, tmp_path)
+    assert resumed.in_flight() == {"c"}
+    # Saved offers are not passed again, the failed one is retried
+    provider.answers["b"] = _parameters(1200)
+    resumed.submit({"b": offers["b"], "c": offers["c"]})
+    assert provider.submitted == [["a", "b"], ["c"], ["b"]]
+
+    provider.completed.update({"batch-1", "batch-2"})
+    second, third = resumed.results(offers)
+    assert [(r.custom_id, r.parameters) for r in second + third] == [
+        ("c", _parameters(1500)),
+        ("b", _parameters(1200)),
+    ]
+    assert resumed.in_flight() == set()
+
+
+def test_failed_offers_are_submitted_again(tmp_path: Path):
+    offers = _offers("a", "b")
+    provider = FakeBatchProvider({"a": _parameters(1000), "b": None})
+    extraction = _extraction(provider, tmp_path)
+    extraction.submit(offers)
+    provider.completed.add("batch-0")
+    failed = [
+        result.custom_id
+        for results in extraction.results(offers)
+        for result in results
+        if result.parameters is None
+    ]
+    assert failed == ["b"]
+
+    provider.answers["b"] = _parameters(1200)
+    retry = _extraction(provider, tmp_path)
+    retry.submit({custom_id: offers[custom_id] for custom_id in failed})
+    assert provider.submitted[-1] == ["b"]
+    provider.completed.add("batch-1")
+    (results,) = list(retry.results(offers))
+    assert [(r.custom_id, r.parameters) for r in results] == [
+        ("b", _parameters(1200))
+    ]
+
+
+def test_offers_missing_from_output_are_failures(tmp_path: Path):
+    offers = _offers("a", "b")
+    provider = FakeBatchProvider({"a": _parameters(1000), "b": None})
+    provider.download = lambda file_id: provider._output_line("a").encode()
+    extraction = _extraction(provider, tmp_path)
+    extraction.submit(offers)
+    provider.completed.add("batch-0")
+    (results,) = list(extraction.results(offers))
+    assert {r.custom_id: r.error for r in results}["b"] == "batch completed"
+
+
+def test_fully_known_offers_skip_the_batch(tmp_path: Path):
+    provider = FakeBatchProvider({})
+    extraction = _extraction(provider, tmp_path)
+    known = _parameters(900).model_dump()
+    (result,) = extraction.submit({"a": ("Pokój", known)})
+    assert result.parameters == _parameters(900)
+    assert provider.submitted == []
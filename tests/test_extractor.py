@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+from pydantic import SecretStr
+from rent_comparator.extraction import OfferExtractor
+from rent_comparator.extraction import OfferParameters
+
+# What the LLM reads from every offer
+ANSWER = {
+    "rent_price": 1000,
+    "other_prices": 100,
+    "area": 12,
+    "rooms": 3,
+    "address": None,
+    "location": "Krzyki",
+    "floor": 1,
+    "total_floors": 4,
+    "available_from": None,
+    "utilities_included": True,
+    "furnished": True,
+    "only_for_students": True,
+}
+
+
+class FakeStructuredLLM:
+    def __init__(self, chat: FakeChat, schema: type[BaseModel]):
+        self.chat = chat
+        self.schema = schema
+
+    def invoke(self, messages: list) -> BaseModel:
+        self.chat.requests.append((self.schema, messages))
+        return self.schema(
+            **{
+                name: value
+                for name, value in ANSWER.items()
+                if name in self.schema.model_fields
+            }
+        )
+
+
+class FakeChat:
+    temperature = 0.0
+
+    def __init__(self):
+        self.requests: list[tuple[type[BaseModel], list]] = []
+
+    def with_structured_output(self, schema: type[BaseModel]) -> Any:
+        return FakeStructuredLLM(self, schema)
+
+
+@pytest.fixture
+def extractor() -> OfferExtractor:
+    extractor = OfferExtractor(SecretStr("test"))
+    extractor.chat = FakeChat()
+    extractor.llm = extractor.chat.with_structured_output(OfferParameters)
+    return extractor
+
+
+def test_without_known_parameters_every_field_is_requested(
+    extractor: OfferExtractor,
+):
+    result = extractor.extract("Pokój 12 m²")
+    schema, messages = extractor.chat.requests[0]
+    assert schema is OfferParameters
+    assert "already known" not in messages[1].content
+    assert result == OfferParameters(**ANSWER)
+
+
+def test_known_parameters_are_kept_and_only_missing_fields_requested(
+    extractor: OfferExtractor,
+):
+    known = {"rent_price": 1500, "area": 14.5, "location": "Stare Miasto"}
+    result = extractor.extract("Pokój", known)
+
+    schema, messages = extractor.chat.requests[0]
+    assert schema.model_fields.keys() == (
+        OfferParameters.model_fields.keys() - known.keys()
+    )
+    assert json.dumps(known, ensure_ascii=False) in messages[1].content
+    assert result == OfferParameters(**{**ANSWER, **known})
+
+
+def test_invalid_known_parameters_are_asked_for(extractor: OfferExtractor):
+    result = extractor.extract(
+        "Pokój", {"rent_price": -5, "area": 14, "balcony": True}
+    )
+    schema, messages = extractor.chat.requests[0]
+    assert "rent_price" in schema.model_fields
+    assert "area" not in schema.model_fields
+    assert "balcony" not in messages[1].content
+    assert (result.rent_price, result.area) == (1000, 14)
+
+
+def test_fully_known_offers_skip_the_llm(extractor: OfferExtractor):
+    known = OfferParameters(**ANSWER).model_dump()
+    known["rent_price"] = 1800
+    assert extractor.extract("Pokój", known).rent_price == 1800
+    assert extractor.chat.requests == []
+    assert extractor.batch_api_body("Pokój", known) is None
+
+
+def test_batch_api_body_asks_for_missing_fields(extractor: OfferExtractor):
+    body = extractor.batch_api_body("Pokój", {"rent_price": 1500})
+    schema = body["response_format"]["json_schema"]["schema"]
+    assert "rent_price" not in schema["properties"]
+    assert "area" in schema["properties"]
+    answer = json.dumps(
+        {name: value for name, value in ANSWER.items() if name != "rent_price"}
+    )
+    result = extractor.parse_batch_api_answer(
+        answer, "Pokój", {"rent_price": 1500}
+    )
+    assert result == OfferParameters(**{**ANSWER, "rent_price": 1500})
+
+
+def test_package_import_skips_llm_clients_and_scrapers():
+    code = (
+        "import sys, rent_comparator.extraction\n"
+        "print(sorted(m for m in sys.modules if m.startswith(("
+        "'rent_comparator.scrapers', 'langchain', 'openai'))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.stdout == "[]\n", result.stderr
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+from rent_comparator.experiments.filter_plan import FilterPlan
+from rent_comparator.experiments.filter_plan import FilterStep
+
+
+def _step(description: str, mask: np.ndarray, cost: float = 1) -> FilterStep:
+    return FilterStep(description, float(mask.mean()), cost, mask.__getitem__)
+
+
+def _masks(n_rows: int = 1000) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    return {
+        "half": rng.random(n_rows) < 0.5,
+        "most": rng.random(n_rows) < 0.9,
+        # Few rows pass, the following steps run on those rows only
+        "rare": rng.random(n_rows) < 0.02,
+        "every": np.ones(n_rows, dtype=bool),
+        "none": np.zeros(n_rows, dtype=bool),
+    }
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        names
+        for n_steps in range(4)
+        for names in itertools.permutations(_masks(), n_steps)
+    ],
+)
+def test_rows_are_the_and_of_all_masks(names: tuple[str, ...]):
+    masks = _masks()
+    steps = [_step(name, masks[name]) for name in names]
+    expected = np.ones(1000, dtype=bool)
+    for name in names:
+        expected &= masks[name]
+    plan = FilterPlan(steps, 1000)
+    assert plan.rows().tolist() == np.flatnonzero(expected).tolist()
+
+
+def test_steps_run_by_cost_per_row_removed():
+    masks = _masks()
+    plan = FilterPlan(
+        [
+            _step("most", masks["most"]),
+            _step("every", masks["every"]),
+            _step("half", masks["half"]),
+            # Cheaper per row removed than "half" despite its cost
+            _step("rare", masks["rare"], cost=1.5),
+        ],
+        1000,
+    )
+    assert [step.description for step in plan.steps] == [
+        "rare",
+        "half",
+        "most",
+    ]
+    assert [step.description for step in plan.skipped] == ["every"]
+
+
+def test_explain_lists_steps_in_execution_order():
+    masks = _masks()
+    plan = FilterPlan(
+        [
+            _step("most", masks["most"]),
+            _step("none", masks["none"]),
+            _step("every", masks["every"]),
+            _step("half", masks["half"]),
+        ],
+        1000,
+    )
+    lines = plan.explain().splitlines()
+    assert lines[0] == "Filter plan over 1000 offers:"
+    assert [line.split()[1] for line in lines[1:4]] == ["none", "half", "most"]
+    assert "-> " not in plan.explain()
+
+    plan.rows()
+    lines = plan.explain().splitlines()
+    assert lines[1].endswith("-> 0 offers")
+    assert lines[2].endswith("(not run, no offers left)")
+    assert lines[3].endswith("(not run, no offers left)")
+    assert lines[4] == "  skipped: every (keeps every offer)"
+    assert lines[5] == "Estimated result: 0 offers"
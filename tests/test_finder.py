@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+
+import pytest
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments import FilterParams
+from rent_comparator.experiments import SearchCriteria
+from rent_comparator.experiments.criteria import FilterType
+from rent_comparator.experiments.finder import OfferResult
+from rent_comparator.extraction import OfferParameters
+
+
+def _finder() -> BestOfferFinder:
+    """Offers with few distinct values, so many of them tie, and some
+    without area."""
+    finder = BestOfferFinder(Path())
+    # Set directly, add_offer skips offers without area as outliers
+    finder.offers = [
+        finder._offer_result(
+            "olx",
+            f"offer_{i}.json",
+            f"https://olx.pl/{i}",
+            OfferParameters(
+                rent_price=1000 + 100 * (i % 4),
+                other_prices=100 * (i % 3),
+                area=None if i % 7 == 0 else 10 + i % 5,
+                rooms=None,
+                address=f"ul. Długa {i}" if i % 2 else None,
+                location=["Krzyki", "Psie Pole", "Śródmieście"][i % 3],
+                floor=None,
+                total_floors=None,
+                available_from=None,
+                utilities_included=[None, True, False][i % 3],
+                deposit=500 * (i % 2),
+                only_for_woman=i % 5 == 0,
+                only_for_students=i % 4 == 0,
+                minimal_rent_duration_months=[0, 6, 12][i % 3],
+            ),
+        )
+        for i in range(60)
+    ]
+    return finder
+
+
+def _value(offer: OfferResult, criteria: SearchCriteria) -> float | None:
+    parameters = offer.parameters
+    return {
+        SearchCriteria.TOTAL_COST: offer.total_cost,
+        SearchCriteria.COST_PER_METER: offer.cost_per_meter,
+        SearchCriteria.RENT_PRICE: parameters.rent_price,
+        SearchCriteria.DEPOSIT: parameters.deposit,
+        SearchCriteria.MINIMAL_RENT_DURATION: (
+            parameters.minimal_rent_duration_months
+        ),
+        SearchCriteria.AREA: (
+            None if parameters.area is None else -parameters.area
+        ),
+    }[criteria]
+
+
+def _passes(offer: OfferResult, filter_params: FilterParams) -> bool:
+    parameters = offer.parameters
+    flags = {
+        FilterType.INCLUDE_ONLY_STUDENTS: parameters.only_for_students,
+        FilterType.EXCLUDE_ONLY_STUDENTS: not parameters.only_for_students,
+        FilterType.INCLUDE_ONLY_WOMEN: parameters.only_for_woman,
+        FilterType.EXCLUDE_ONLY_WOMEN: not parameters.only_for_woman,
+        FilterType.INCLUDE_UTILITIES: parameters.utilities_included is True,
+        FilterType.EXCLUDE_UTILITIES: parameters.utilities_included is False,
+    }
+    places = f"{parameters.location} {parameters.address}".lower()
+    return (
+        all(flags[filter_type] for filter_type in filter_params.filters)
+        and offer.file_name not in filter_params.exclude_offers
+        and not any(
+            location in places
+            for location in filter_params.exclude_locations or ()
+        )
+        and (
+            not filter_params.include_locations
+            or any(
+                location in places
+                for location in filter_params.include_locations
+            )
+        )
+    )
+
+
+def _reference(
+    offers: list[OfferResult],
+    ordering: list[SearchCriteria],
+    filter_params: FilterParams,
+    top_n: int,
+) -> list[OfferResult]:
+    """Filter and ``sorted`` selection, offers missing the first criteria
+    are left out and missing tie-breaking values rank last."""
+    ranked = [
+        offer
+        for offer in offers
+        if _passes(offer, filter_params)
+        and _value(offer, ordering[0]) is not None
+    ]
+    return sorted(
+        ranked,
+        key=lambda offer: [
+            (value is None, value or 0)
+            for value in (_value(offer, c) for c in ordering)
+        ],
+    )[:top_n]
+
+
+FILTER_PARAMS = [
+    *(FilterParams(filters=[filter_type]) for filter_type in FilterType),
+    FilterParams(
+        filters=[FilterType.EXCLUDE_ONLY_WOMEN, FilterType.INCLUDE_UTILITIES]
+    ),
+    FilterParams(include_locations=["krzyki", "długa 1"]),
+    FilterParams(exclude_locations=["psie"]),
+    FilterParams(include_locations=["nowhere"]),
+    FilterParams(exclude_offers={"offer_1.json": "", "offer_2.json": ""}),
+]
+
+
+@pytest.mark.parametrize("criteria", SearchCriteria)
+@pytest.mark.parametrize("filter_params", FILTER_PARAMS)
+@pytest.mark.parametrize("top_n", [1, 5, 100])
+def test_find_best_matches_sorted_reference(
+    criteria: SearchCriteria, filter_params: FilterParams, top_n: int
+):
+    finder = _finder()
+    assert finder.find_best(criteria, filter_params, top_n) == _reference(
+        list(finder.offers), [criteria], filter_params, top_n
+    )
+
+
+@pytest.mark.parametrize("filter_params", FILTER_PARAMS)
+def test_apply_filters_keeps_passing_offers(filter_params: FilterParams):
+    offers = _finder().offers
+    assert BestOfferFinder.apply_filters(offers, filter_params) == [
+        offer for offer in offers if _passes(offer, filter_params)
+    ]
+
+
+@pytest.mark.parametrize(
+    "criteria, then_by",
+    list(itertools.permutations(SearchCriteria, 2)),
+)
+def test_ties_are_broken_by_then_by(
+    criteria: SearchCriteria, then_by: SearchCriteria
+):
+    finder = _finder()
+    assert finder.find_best(
+        criteria, FilterParams(), 10, [then_by]
+    ) == _reference(
+        list(finder.offers), [criteria, then_by], FilterParams(), 10
+    )
+
+
+def test_offers_without_area_are_left_out_of_area_rankings():
+    finder = _finder()
+    best = finder.find_best(SearchCriteria.AREA, FilterParams(), 100)
+    assert len(best) < len(finder.offers)
+    assert all(offer.parameters.area is not None for offer in best)
+    assert (
+        len(finder.find_best(SearchCriteria.TOTAL_COST, FilterParams(), 100))
+        == 60
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+from rent_comparator.scrapers.html_text import extract_script
+from rent_comparator.scrapers.html_text import html_to_text
+
+PAGES = Path(__file__).parent / "pages"
+
+
+def _lines(text: str) -> list[str]:
+    return [line for line in text.split("\n") if line.strip()]
+
+
+@pytest.mark.parametrize(
+    "page", sorted(PAGES.glob("*.html")), ids=lambda path: path.stem
+)
+@pytest.mark.parametrize("separator", ["\n", " | "])
+def test_text_matches_beautifulsoup(page: Path, separator: str):
+    content = page.read_bytes()
+    assert html_to_text(content, separator) == BeautifulSoup(
+        content, "lxml"
+    ).get_text(separator)
+
+
+def test_olx_page_text():
+    text = html_to_text((PAGES / "olx_offer.html").read_bytes())
+    assert _lines(text) == [
+        "Pokój jednoosobowy Krzyki - OLX.pl",
+        "Pokój jednoosobowy, Krzyki",
+        "1\xa0500 zł",
+        "Prywatne",
+        "Powierzchnia: 14 m²",
+        "Umeblowane: Tak",
+        "Rodzaj zabudowy: Blok",
+        "Opis",
+        "Do wynajęcia pokój ",
+        "14 m2",
+        " w 3-pokojowym mieszkaniu.",
+        "Kaucja: 1500 zł.",
+        "Media według zużycia.",
+    ]
+
+
+def test_otodom_page_keeps_preformatted_whitespace():
+    text = html_to_text((PAGES / "otodom_offer.html").read_bytes())
+    assert "  ul. Świdnicka 12\n  50-066 Wrocław  " in text
+    assert "Dzień dobry,   jestem zainteresowany" in text
+    assert "Zapraszam & pozdrawiam <3" in text
+    assert "__NEXT_DATA__" not in text and "pageProps" not in text
+
+
+def test_declared_encoding_is_used():
+    content = (PAGES / "gratka_offer.html").read_bytes()
+    with pytest.raises(UnicodeDecodeError):
+        content.decode()
+    lines = _lines(html_to_text(content))
+    assert "Pokój do wynajęcia, Wrocław, Śródmieście" in lines
+    assert "12 m²" in lines
+    assert not any("gratka" in line for line in lines)
+
+
+def test_extract_next_data():
+    script = extract_script(
+        (PAGES / "otodom_offer.html").read_bytes(), "__NEXT_DATA__"
+    )
+    ad = json.loads(script)["props"]["pageProps"]["ad"]
+    assert ad["target"]["Price"] == 2600
+    assert "Starym Mieście" in ad["description"]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"<script id='data'>{}</script>", "{}"),
+        (b"<SCRIPT type=x id=data async>[1]</SCRIPT >", "[1]"),
+        (b'<script id="data-2">1</script><script id="data">2</script>', "2"),
+        (b'<script id="other">1</script>', None),
+        (b'<div id="data">1</div>', None),
+    ],
+)
+def test_extract_script_by_id(content: bytes, expected: str | None):
+    assert extract_script(content, "data") == expected
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+from pathlib import Path
+
+import httpx
+import pytest
+from rent_comparator.scrapers.http_cache import CacheMissError
+from rent_comparator.scrapers.http_cache import CachingTransport
+from rent_comparator.scrapers.http_cache import read_cache_entry
+
+URL = "https://fake.pl/offer/a"
+LAST_MODIFIED = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+
+class FakeServer:
+    """Serves a gzip encoded page, or 304 when it did not change."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            self.status_code,
+            headers={
+                "Content-Encoding": "gzip",
+                "ETag": '"v1"',
+                "Last-Modified": LAST_MODIFIED,
+            },
+            content=gzip.compress(b"<html>Offer</html>"),
+        )
+
+
+def _get(
+    cache_folder: Path,
+    server: FakeServer,
+    offline: bool = False,
+    method: str = "GET",
+) -> httpx.Response:
+    transport = CachingTransport(
+        cache_folder, transport=httpx.MockTransport(server), offline=offline
+    )
+
+    async def get() -> httpx.Response:
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.request(method, URL)
+            await response.aread()
+            return response
+
+    return asyncio.run(get())
+
+
+def test_response_is_stored_decoded(tmp_path: Path):
+    response = _get(tmp_path, FakeServer())
+    assert response.status_code == 200
+    assert response.content == b"<html>Offer</html>"
+
+    (entry,) = tmp_path.glob("*.gz")
+    metadata, content = read_cache_entry(entry)
+    assert content == b"<html>Offer</html>"
+    assert metadata["url"] == URL
+    headers = httpx.Headers(metadata["headers"])
+    assert headers["etag"] == '"v1"'
+    assert "content-encoding" not in headers
+    assert "content-length" not in headers
+
+
+def test_not_modified_response_is_replayed(tmp_path: Path):
+    server = FakeServer()
+    _get(tmp_path, server)
+    response = _get(tmp_path, server)
+
+    first, second = server.requests
+    assert "If-None-Match" not in first.headers
+    assert second.headers["If-None-Match"] == '"v1"'
+    assert second.headers["If-Modified-Since"] == LAST_MODIFIED
+    assert response.status_code == 200
+    assert response.content == b"<html>Offer</html>"
+    assert response.headers["etag"] == '"v1"'
+
+
+def test_offline_replays_without_the_network(tmp_path: Path):
+    _get(tmp_path, FakeServer())
+    server = FakeServer()
+    response = _get(tmp_path, server, offline=True)
+    assert response.content == b"<html>Offer</html>"
+    assert not server.requests
+
+
+def test_offline_cache_miss(tmp_path: Path):
+    server = FakeServer()
+    with pytest.raises(CacheMissError, match="is not cached"):
+        _get(tmp_path, server, offline=True)
+    assert not server.requests
+
+
+@pytest.mark.parametrize(
+    "status_code, method", [(404, "GET"), (500, "GET"), (200, "POST")]
+)
+def test_uncacheable_responses_are_not_stored(
+    tmp_path: Path, status_code: int, method: str
+):
+    response = _get(tmp_path, FakeServer(status_code), method=method)
+    assert response.status_code == status_code
+    assert response.content == b"<html>Offer</html>"
+    assert not list(tmp_path.glob("*.gz"))
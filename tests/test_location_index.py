@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+from rent_comparator.experiments.location_index import fold_location
+from rent_comparator.experiments.location_index import LocationIndex
+
+PLACES = [
+    "Poznań\0ul. Św. Marcin 5",
+    "Psie Pole\0ul. Łokietka 2",
+    "Stare Miasto\0Rynek 1",
+    "Krzyki\0",
+    "\0Wrocław, Psie Pole",
+]
+
+
+def _matching(location: str) -> list[str]:
+    index = LocationIndex(PLACES)
+    return [PLACES[place_id] for place_id in index.matching(location)]
+
+
+@pytest.mark.parametrize(
+    "text, folded",
+    [
+        ("Poznań", "poznan"),
+        ("ŁÓDŹ", "lodz"),
+        ("  Stare   Miasto ", "stare miasto"),
+        ("ul. Św.Marcin", "ul sw marcin"),
+    ],
+)
+def test_fold_location(text: str, folded: str):
+    assert fold_location(text) == folded
+
+
+@pytest.mark.parametrize("location", ["poznan", "POZNAŃ", "Poznan"])
+def test_case_and_diacritics_are_ignored(location: str):
+    assert _matching(location) == [PLACES[0]]
+
+
+def test_partial_tokens_match():
+    assert _matching("pozn") == [PLACES[0]]
+    assert _matching("okiet") == [PLACES[1]]
+    assert _matching("ole") == [PLACES[1], PLACES[4]]
+
+
+def test_multi_word_locations():
+    assert _matching("psie pole") == [PLACES[1], PLACES[4]]
+    assert _matching("Psie-Pole") == [PLACES[1], PLACES[4]]
+    assert _matching("sw marcin") == [PLACES[0]]
+    # Words must be adjacent and in order
+    assert _matching("pole psie") == []
+
+
+def test_location_and_address_are_matched_separately():
+    assert _matching("krzyki") == [PLACES[3]]
+    assert _matching("rynek") == [PLACES[2]]
+    assert _matching("miasto rynek") == []
+
+
+def test_mask_of_any_location():
+    index = LocationIndex(PLACES)
+    assert index.mask(["krzyki", "rynek"]).tolist() == [
+        False,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert not index.mask([]).any()
+
+
+def test_matches_cache_keeps_recent_queries():
+    index = LocationIndex(PLACES, cache_size=2)
+    index.matching("krzyki")
+    index.matching("rynek")
+    index.matching("Krzyki")
+    index.matching("pole")
+    assert list(index._matches) == ["krzyki", "pole"]
+    assert _matching("rynek") == [PLACES[2]]
+
+
+def test_matches_are_not_cached_without_cache_size():
+    index = LocationIndex(PLACES, cache_size=0)
+    assert index.matching("krzyki").tolist() == [3]
+    assert not index._matches
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Container
+from pathlib import Path
+from typing import Any
+
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.extraction import OfferParameters
+from rent_comparator.pipeline import OfferPipeline
+from rent_comparator.scrapers import OfferData
+from rent_comparator.scrapers import WebsiteType
+from rent_comparator.storage import OfferStore
+
+
+class FakeWebsite:
+    """Site listing offers ``<url>`` with their rent as page text."""
+
+    website_type = WebsiteType.OLX
+    name = "Fake"
+
+    def __init__(self, rents: dict[str, int]):
+        self.rents = rents
+        self.scraped: list[str] = []
+
+    async def scrape(
+        self, city: str, known_urls: Container[str], **options: Any
+    ) -> AsyncIterator[OfferData]:
+        for url, rent in self.rents.items():
+            if url in known_urls:
+                continue
+            self.scraped.append(url)
+            yield OfferData(url=url, text=str(rent))
+
+
+class FakeExtractor:
+    """Reads the rent from the text, failing once for ``fail_once``."""
+
+    def __init__(self, fail_once: set[str] = frozenset()):
+        self.fail_once = set(fail_once)
+        self.texts: list[str] = []
+
+    async def extract_async(
+        self, offer_text: str, known_parameters: dict[str, Any] | None = None
+    ) -> OfferParameters:
+        self.texts.append(offer_text)
+        if offer_text in self.fail_once:
+            self.fail_once.remove(offer_text)
+            raise RuntimeError("LLM unavailable")
+        return OfferParameters(
+            rent_price=float(offer_text),
+            area=15,
+            rooms=None,
+            address=None,
+            location=None,
+            floor=None,
+            total_floors=None,
+            available_from=None,
+            utilities_included=None,
+        )
+
+
+def _run(
+    store: OfferStore, website: FakeWebsite, extractor: FakeExtractor
+) -> tuple[OfferPipeline, Any]:
+    pipeline = OfferPipeline(
+        extractor, store, BestOfferFinder(Path()), extract_workers=2
+    )
+    return pipeline, asyncio.run(pipeline.run([website], "wroclaw"))
+
+
+def test_failed_offers_are_extracted_by_the_next_run(tmp_path: Path):
+    website = FakeWebsite({"https://olx.pl/a": 1000, "https://olx.pl/b": 1200})
+    extractor = FakeExtractor(fail_once={"1200"})
+    with OfferStore(tmp_path / "offers.db") as store:
+        pipeline, summary = _run(store, website, extractor)
+        assert (summary.scraped, summary.extracted, summary.failed) == (
+            2,
+            1,
+            1,
+        )
+        assert len(pipeline.finder.offers) == 1
+
+        website.rents["https://olx.pl/c"] = 900
+        pipeline, summary = _run(store, website, extractor)
+        # Only the new offer is fetched, the failed one comes from the store
+        assert website.scraped[2:] == ["https://olx.pl/c"]
+        assert (summary.scraped, summary.resumed, summary.extracted) == (
+            1,
+            1,
+            2,
+        )
+        assert summary.failed == 0
+        assert sorted(
+            offer.parameters.rent_price for offer in pipeline.finder.offers
+        ) == [900, 1200]
+        assert store.pending_extraction("olx") == []
+
+        pipeline, summary = _run(store, website, extractor)
+        assert (summary.scraped, summary.resumed, summary.extracted) == (
+            0,
+            0,
+            0,
+        )
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from rent_comparator.extraction import OfferParameters
+from rent_comparator.scrapers import OtodomWebsite
+from rent_comparator.scrapers.html_text import extract_script
+from rent_comparator.scrapers.otodom import _ad_parameters
+
+PAGES = Path(__file__).parent / "pages"
+
+
+def _page_ad() -> dict:
+    content = (PAGES / "otodom_offer.html").read_bytes()
+    return json.loads(extract_script(content, "__NEXT_DATA__"))["props"][
+        "pageProps"
+    ]["ad"]
+
+
+def test_parse_offer_page():
+    offer = OtodomWebsite._parse_offer_page(
+        "https://www.otodom.pl/pl/oferta/kawalerka",
+        (PAGES / "otodom_offer.html").read_bytes(),
+    )
+    assert offer.parameters == {
+        "rent_price": 2600,
+        "other_prices": 450,
+        "deposit": 2600,
+        "area": 28,
+        "rooms": 1,
+        "floor": 3,
+        "total_floors": 5,
+        "available_from": "2025-11-01",
+        "location": "Stare Miasto, Wrocław",
+        "address": "ul. Świdnicka 12, Stare Miasto, Wrocław, dolnośląskie",
+    }
+    # Valid for OfferParameters once the LLM filled the other fields
+    OfferParameters(
+        **{
+            "rooms": None,
+            "address": None,
+            "location": None,
+            "floor": None,
+            "total_floors": None,
+            "available_from": None,
+            "utilities_included": None,
+            **offer.parameters,
+        }
+    )
+    # The page text is kept for the fields left to the LLM
+    assert "Powierzchnia\n28 m²" in offer.text
+    assert offer.text.endswith(offer.description)
+
+
+def test_target_is_used_without_characteristics():
+    ad = _page_ad()
+    del ad["characteristics"]
+    ad["target"]["Floor_no"] = ["ground_floor"]
+    assert _ad_parameters(ad) == {
+        "rent_price": 2600,
+        "area": 28,
+        "rooms": 1,
+        "floor": 0,
+        "total_floors": 5,
+        "location": "Stare Miasto, Wrocław",
+        "address": "ul. Świdnicka 12, Stare Miasto, Wrocław, dolnośląskie",
+    }
+
+
+def test_missing_and_invalid_values_are_left_out():
+    ad = {
+        "characteristics": [
+            {"key": "price", "value": "Zapytaj o cenę"},
+            {"key": "m", "value": "12,5"},
+            {"key": "rent", "value": "-1"},
+            {"key": "floor_no", "value": "floor_10"},
+            {"key": "building_floors_num", "value": ""},
+            {"label": "bez klucza"},
+        ],
+        "location": {"address": {"street": None, "city": {"name": "Wrocław"}}},
+    }
+    assert _ad_parameters(ad) == {
+        "area": 12.5,
+        "floor": 10,
+        "location": "Wrocław",
+    }
+    assert _ad_parameters({}) == {}
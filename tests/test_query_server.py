@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.server import QueryServer
+
+
+@pytest.fixture
+def server(
+    data_folder: Path, write_offer: Callable[..., Path]
+) -> Iterator[QueryServer]:
+    """Server of offers ``a`` and ``b``, ``b`` is the cheapest."""
+    write_offer("olx", "a", rent_price=1500)
+    write_offer("olx", "b", rent_price=1000, other_prices=200)
+    server = QueryServer(
+        lambda: BestOfferFinder(data_folder), port=0, reload_interval=0.05
+    )
+    server.load()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def _request(
+    server: QueryServer, path: str, body: dict[str, Any] | None = None
+) -> tuple[int, dict[str, Any]]:
+    host, port = server.address
+    request = urllib.request.Request(
+        f"http://{host}:{port}{path}",
+        data=None if body is None else json.dumps(body).encode(),
+        method="GET" if body is None else "POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_query_stats_and_reload(
+    server: QueryServer, write_offer: Callable[..., Path]
+):
+    status, response = _request(
+        server, "/query", {"criteria": "total_cost", "top_n": 1}
+    )
+    assert status == 200
+    assert response["version"] == 1
+    assert [offer["file_name"] for offer in response["offers"]] == ["b.json"]
+
+    status, stats = _request(server, "/stats")
+    assert status == 200
+    assert stats["offers"] == 2
+    assert stats["latency"]["queries"] == 1
+
+    write_offer("olx", "c", rent_price=900)
+    deadline = time.monotonic() + 5
+    while server.version == 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    status, response = _request(server, "/query", {"top_n": 1})
+    assert response["version"] == 2
+    assert [offer["file_name"] for offer in response["offers"]] == ["c.json"]
+
+
+def test_failed_query_is_an_error(server: QueryServer):
+    def fail(*args: Any) -> None:
+        raise RuntimeError("broken index")
+
+    server.finder.find_best = fail
+    status, response = _request(server, "/query", {})
+    assert status == 500
+    assert "broken index" in response["error"]
+    assert _request(server, "/stats")[1]["latency"]["queries"] == 1
+    assert _request(server, "/query", {"top_n": 0})[0] == 400
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+import pytest
+from rent_comparator.scrapers.rate_limiter import parse_retry_after
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("0", 0.0), ("120", 120.0), ("1.5", 1.5), (" 3 ", 3.0)],
+)
+def test_seconds(value: str, expected: float):
+    assert parse_retry_after(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [None, "", "soon", "inf", "-inf", "Infinity", "nan", "-1", "-0.5"],
+)
+def test_invalid_values_fall_back_to_backoff(value: str | None):
+    assert parse_retry_after(value) is None
+
+
+def test_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    seconds = parse_retry_after(format_datetime(retry_at, usegmt=True))
+    assert 55 < seconds <= 60
+
+
+def test_past_http_date_retries_now():
+    retry_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == 0
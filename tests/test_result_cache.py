@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from rent_comparator.experiments import BestOfferFinder
+from rent_comparator.experiments import FilterParams
+from rent_comparator.experiments import SearchCriteria
+from rent_comparator.experiments.criteria import FilterType
+from rent_comparator.experiments.result_cache import query_key
+from rent_comparator.experiments.result_cache import QueryResultCache
+from rent_comparator.extraction import OfferParameters
+
+
+def _parameters(rent_price: float) -> OfferParameters:
+    return OfferParameters(
+        rent_price=rent_price,
+        area=15,
+        rooms=None,
+        address=None,
+        location="Krzyki",
+        floor=None,
+        total_floors=None,
+        available_from=None,
+        utilities_included=None,
+    )
+
+
+def _finder(*rent_prices: float) -> BestOfferFinder:
+    finder = BestOfferFinder(Path())
+    for i, rent_price in enumerate(rent_prices):
+        finder.add_offer(
+            "olx", f"{i}.json", f"https://olx.pl/{i}", _parameters(rent_price)
+        )
+    return finder
+
+
+def _best_files(finder: BestOfferFinder) -> list[str]:
+    best = finder.find_best(SearchCriteria.TOTAL_COST, FilterParams(), 1)
+    return [offer.file_name for offer in best]
+
+
+def test_add_offer_invalidates_results():
+    finder = _finder(1500, 1200)
+    assert _best_files(finder) == ["1.json"]
+    assert _best_files(finder) == ["1.json"]
+    assert finder.result_cache.hits == 1
+
+    version = finder.version
+    finder.add_offer("olx", "2.json", "https://olx.pl/2", _parameters(900))
+    assert finder.version > version
+    assert _best_files(finder) == ["2.json"]
+    assert finder.result_cache.hits == 1
+
+
+def test_columns_rebuild_invalidates_results():
+    finder = _finder(1500, 1200)
+    assert _best_files(finder) == ["1.json"]
+
+    # Offers changed behind the finder's back rebuild the columns
+    finder.offers.append(
+        finder._offer_result(
+            "olx", "2.json", "https://olx.pl/2", _parameters(900)
+        )
+    )
+    version = finder.version
+    assert _best_files(finder) == ["2.json"]
+    assert finder.version > version
+    assert finder.result_cache.hits == 0
+
+
+def test_queries_differing_in_top_n_or_then_by_have_different_keys():
+    criteria = SearchCriteria.TOTAL_COST
+    filter_params = FilterParams()
+    key = query_key(criteria, filter_params, 10)
+    assert query_key(criteria, filter_params, 5) != key
+    assert query_key(criteria, filter_params, 10, [SearchCriteria.AREA]) != key
+    assert query_key(
+        criteria,
+        filter_params,
+        10,
+        [SearchCriteria.AREA, SearchCriteria.DEPOSIT],
+    ) != query_key(
+        criteria,
+        filter_params,
+        10,
+        [SearchCriteria.DEPOSIT, SearchCriteria.AREA],
+    )
+    # Repeating the criteria does not change the order
+    assert query_key(criteria, filter_params, 10, [criteria]) == key
+
+
+def test_equivalent_filters_have_equal_keys():
+    criteria = SearchCriteria.TOTAL_COST
+    assert query_key(
+        criteria,
+        FilterParams(
+            filters=[
+                FilterType.EXCLUDE_ONLY_WOMEN,
+                FilterType.INCLUDE_UTILITIES,
+            ],
+            include_locations=["Śródmieście", "krzyki"],
+        ),
+        10,
+    ) == query_key(
+        criteria,
+        FilterParams(
+            filters=[
+                FilterType.INCLUDE_UTILITIES,
+                FilterType.EXCLUDE_ONLY_WOMEN,
+            ],
+            include_locations=["Krzyki", "srodmiescie", "krzyki"],
+        ),
+        10,
+    )
+
+
+def test_cache_is_cleared_for_another_version():
+    cache = QueryResultCache(max_size=2)
+    cache.get("a", 1)
+    cache.put("a", 1, [])
+    cache.put("b", 1, [])
+    cache.get("a", 1)
+    cache.put("c", 1, [])
+    # Least recently used result is evicted
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == ()
+    assert cache.get("a", 2) is None
+    assert len(cache) == 0
+    # Results of an older version are not stored
+    cache.put("a", 1, [])
+    assert len(cache) == 0
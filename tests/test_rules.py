@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from rent_comparator.extraction.rules import extract_rule_parameters
+from rent_comparator.extraction.rules import rule_parameters
+from rent_comparator.scrapers.html_text import html_to_text
+
+PAGES = Path(__file__).parent / "pages"
+
+
+def _values(offer_text: str) -> dict[str, Any]:
+    return rule_parameters(offer_text, min_confidence=0)
+
+
+@pytest.mark.parametrize(
+    "offer_text, expected",
+    [
+        # Listing parameters of OLX, Otodom and Gratka
+        (
+            "1 500 zł\n/miesiąc\n+ Czynsz 300 zł\nPowierzchnia: 12,5 m²\n"
+            "kaucja: 1 500 zł\nLiczba pokoi: 3\nPiętro: 3/5",
+            {
+                "rent_price": 1500,
+                "other_prices": 300,
+                "area": 12.5,
+                "deposit": 1500,
+                "rooms": 3,
+                "floor": 3,
+                "total_floors": 5,
+            },
+        ),
+        (
+            "Pow. całkowita\n28 m²\nPiętro\nparter\nLiczba pięter\n4",
+            {"area": 28, "floor": 0, "total_floors": 4},
+        ),
+        (
+            "2 000 zł\n/miesiąc\nDodatkowy koszt: 250,50 zł/miesiąc",
+            {"rent_price": 2000, "other_prices": 250.5},
+        ),
+        # Amounts with non-breaking, regular and dot thousand separators
+        ("1\xa0200 zł", {"rent_price": 1200}),
+        ("1 200,50 zł", {"rent_price": 1200.5}),
+        ("1.200 zł", {"rent_price": 1200}),
+        # Descriptions
+        (
+            "Do wynajęcia pokój o powierzchni 14 m2. Cena: 1200 zł/mc."
+            " Kaucja w wysokości 1000 zł. Mieszkanie na 2. piętrze.",
+            {"rent_price": 1200, "area": 14, "deposit": 1000, "floor": 2},
+        ),
+        ("Najem 1100 zł + media", {"rent_price": 1100}),
+        ("Mieszkanie 3 pokoje", {}),
+        # Prices per m² or per day are not the monthly rent
+        ("Cena 45 zł/m²", {}),
+        ("80 zł", {}),
+        ("Brak danych", {}),
+    ],
+)
+def test_rule_values(offer_text: str, expected: dict[str, Any]):
+    assert _values(offer_text) == expected
+
+
+def test_most_specific_rule_wins():
+    matches = extract_rule_parameters(
+        "Pokój 10 m2 w mieszkaniu\nPowierzchnia: 12 m²"
+    )
+    assert matches["area"].value == 12
+    assert matches["area"].confidence == 0.95
+
+
+def test_different_values_lower_the_confidence():
+    matches = extract_rule_parameters(
+        "Pokój 10 m2 za 1100 zł/mc, drugi pokój 12 m2 za 1300 zł/mc"
+    )
+    assert matches["rent_price"].value == 1100
+    assert matches["rent_price"].confidence == pytest.approx(0.7 * 0.7)
+    assert matches["area"].confidence == pytest.approx(0.6 * 0.7)
+    assert rule_parameters(
+        "Pokój 10 m2 za 1100 zł/mc", min_confidence=0.6
+    ) == {"rent_price": 1100, "area": 10}
+    assert (
+        rule_parameters(
+            "Pokój 10 m2 za 1100 zł/mc, drugi pokój 12 m2 za 1300 zł/mc",
+            min_confidence=0.6,
+        )
+        == {}
+    )
+
+
+@pytest.mark.parametrize(
+    "page, expected",
+    [
+        (
+            "olx_offer",
+            {"rent_price": 1500, "area": 14, "deposit": 1500},
+        ),
+        (
+            "otodom_offer",
+            {"area": 28, "floor": 3, "total_floors": 5},
+        ),
+        (
+            "gratka_offer",
+            {
+                "rent_price": 1200,
+                "area": 12,
+                "deposit": 1200,
+                "floor": 0,
+            },
+        ),
+    ],
+)
+def test_confident_values_of_pages(page: str, expected: dict[str, Any]):
+    offer_text = html_to_text((PAGES / f"{page}.html").read_bytes())
+    assert rule_parameters(offer_text, min_confidence=0.8) == expected
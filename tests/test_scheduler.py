@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+import httpx
+import openai
+import pytest
+from rent_comparator.extraction import ExtractionScheduler
+
+
+def _rate_limit_error(retry_after: str | None) -> openai.RateLimitError:
+    headers = {} if retry_after is None else {"retry-after": retry_after}
+    response = httpx.Response(
+        429,
+        headers=headers,
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat"),
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def _pause(retry_after: str | None) -> float:
+    """Seconds requests are paused for after a 429 with ``retry_after``."""
+    scheduler = ExtractionScheduler(retry_base_delay=1.0)
+    scheduler._pause(_rate_limit_error(retry_after), attempt=0)
+    return scheduler._paused_until - time.monotonic()
+
+
+def test_retry_after_seconds():
+    assert 119 < _pause("120") <= 120
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 < _pause(format_datetime(retry_at, usegmt=True)) <= 60
+
+
+@pytest.mark.parametrize("retry_after", [None, "inf", "nan", "-5", "soon"])
+def test_invalid_retry_after_falls_back_to_jitter(retry_after: str | None):
+    assert -0.1 < _pause(retry_after) <= 1.0
+
+
+def test_rate_limited_request_is_retried():
+    scheduler = ExtractionScheduler()
+    errors = [_rate_limit_error("0")]
+
+    async def request() -> str:
+        if errors:
+            raise errors.pop()
+        return "answer"
+
+    assert asyncio.run(scheduler.run(request, tokens=10)) == "answer"
+    assert (scheduler.n_requests, scheduler.n_rate_limited) == (2, 1)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from rent_comparator.experiments.snapshot import FileStat
+from rent_comparator.experiments.snapshot import OfferSnapshot
+from rent_comparator.experiments.snapshot import SnapshotOffer
+from rent_comparator.extraction import OfferParameters
+
+
+class _Loader:
+    """Loads offers whose rent is the file's size, recording the keys."""
+
+    def __init__(self):
+        self.files: dict[str, FileStat] = {}
+        self.loaded: list[list[str]] = []
+
+    def __call__(self, keys: list[str]) -> list[SnapshotOffer]:
+        self.loaded.append(keys)
+        return [
+            SnapshotOffer(
+                "olx",
+                key.split("/")[1],
+                f"https://olx.pl/{key}",
+                OfferParameters(
+                    rent_price=self.files[key].size,
+                    area=15,
+                    rooms=None,
+                    address=None,
+                    location="Krzyki",
+                    floor=None,
+                    total_floors=None,
+                    available_from=None,
+                    utilities_included=None,
+                ),
+            )
+            for key in keys
+        ]
+
+    def refresh(self, folder: Path) -> tuple[OfferSnapshot, int]:
+        return OfferSnapshot.refresh(folder, dict(self.files), self)
+
+
+def _rents(snapshot: OfferSnapshot) -> dict[str, float]:
+    return {
+        snapshot.file_name(row): float(snapshot.rows[row]["rent_price"])
+        for row in range(len(snapshot))
+    }
+
+
+def test_refresh_reads_only_changed_files(tmp_path: Path):
+    loader = _Loader()
+    loader.files = {
+        f"olx/{name}.json": FileStat(1, 1000 + i)
+        for i, name in enumerate("abc")
+    }
+    snapshot, n_loaded = loader.refresh(tmp_path)
+    assert n_loaded == 3
+    assert loader.loaded == [["olx/a.json", "olx/b.json", "olx/c.json"]]
+
+    assert loader.refresh(tmp_path)[1] == 0
+    assert len(loader.loaded) == 1
+
+    loader.files["olx/b.json"] = FileStat(2, 1500)
+    del loader.files["olx/c.json"]
+    reloaded, n_loaded = loader.refresh(tmp_path)
+    assert n_loaded == 1
+    assert loader.loaded[-1] == ["olx/b.json"]
+    assert _rents(reloaded) == {"a.json": 1000, "b.json": 1500}
+    assert _rents(OfferSnapshot.load(tmp_path)) == _rents(reloaded)
+    assert reloaded.offer(1).parameters.rent_price == 1500
+    # The snapshot loaded before is still readable
+    assert _rents(snapshot)["b.json"] == 1001
+
+
+def test_save_keeps_arrays_of_open_snapshots(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    loader = _Loader()
+    loader.files = {"olx/a.json": FileStat(1, 1000)}
+    loader.refresh(tmp_path)
+    first_arrays = {path.name for path in tmp_path.glob("*.npy")}
+    opened = OfferSnapshot.load(tmp_path)
+
+    # Mapped files cannot be deleted on Windows
+    def unlink(path: Path, missing_ok: bool = False) -> None:
+        raise PermissionError(path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Path, "unlink", unlink)
+        loader.files["olx/a.json"] = FileStat(2, 1200)
+        loader.refresh(tmp_path)
+    assert first_arrays < {path.name for path in tmp_path.glob("*.npy")}
+    assert _rents(opened) == {"a.json": 1000}
+    assert _rents(OfferSnapshot.load(tmp_path)) == {"a.json": 1200}
+
+    loader.files["olx/a.json"] = FileStat(3, 1300)
+    loader.refresh(tmp_path)
+    assert len(list(tmp_path.glob("*.npy"))) == 3
+    assert _rents(OfferSnapshot.load(tmp_path)) == {"a.json": 1300}
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from collections.abc import Container
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import ClassVar
+
+import httpx
+from pydantic import PrivateAttr
+from rent_comparator.scrapers import OfferData
+from rent_comparator.scrapers import Website
+from rent_comparator.scrapers import WebsiteType
+
+Handler = Callable[[httpx.Request], Any]
+
+
+class FakeWebsite(Website):
+    """Site answered by ``handler`` instead of the network."""
+
+    website_type: ClassVar[WebsiteType] = WebsiteType.OLX
+    name: ClassVar[str] = "Fake"
+    base_url: ClassVar[str] = "https://fake.pl"
+    search_path: ClassVar[str] = "/search/{city}?page={page}"
+    offer_selector: ClassVar[str] = "a.offer"
+    requests_per_second: float = 1000.0
+    burst: int = 100
+    retry_base_delay: float = 0.001
+    _handler: Handler = PrivateAttr()
+
+    def __init__(self, handler: Handler, **config: Any):
+        super().__init__(**config)
+        self._handler = handler
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self._handler))
+
+    @classmethod
+    def _parse_offer_page(cls, offer_url: str, content: bytes) -> OfferData:
+        if content == b"unparseable":
+            raise ValueError("broken page")
+        return super()._parse_offer_page(offer_url, content)
+
+
+class FakeSite:
+    """Search pages listing ``pages[page]`` hrefs and their offer pages.
+
+    An offer answers only after ``after[href]`` finished, and with the
+    statuses of ``statuses[href]`` before succeeding.
+    """
+
+    def __init__(
+        self,
+        pages: dict[int, list[str]],
+        after: dict[str, str] | None = None,
+        statuses: dict[str, list[int]] | None = None,
+        bodies: dict[str, str] | None = None,
+    ):
+        self.pages = pages
+        self.after = after or {}
+        self.statuses = {href: list(s) for href, s in (statuses or {}).items()}
+        self.bodies = bodies or {}
+        self.requested: list[str] = []
+        self.finished: list[str] = []
+        self._finished: dict[str, asyncio.Event] = {}
+
+    def _event(self, path: str) -> asyncio.Event:
+        return self._finished.setdefault(path, asyncio.Event())
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requested.append(
+            f"{path}?{request.url.query.decode()}"
+            if request.url.query
+            else path
+        )
+        if path.startswith("/search/"):
+            hrefs = self.pages.get(int(request.url.params["page"]), [])
+            links = "".join(
+                f'<a class="offer" href="{href}">offer</a>' for href in hrefs
+            )
+            return httpx.Response(200, text=f"<html><body>{links}</body>")
+        if path in self.after:
+            await self._event(self.after[path]).wait()
+        self.finished.append(path)
+        self._event(path).set()
+        statuses = self.statuses.get(path)
+        if statuses:
+            return httpx.Response(
+                statuses.pop(0), headers={"Retry-After": "0"}
+            )
+        return httpx.Response(
+            200,
+            text=self.bodies.get(path, f"<html><body>Offer {path}</body>"),
+        )
+
+
+def _scrape(
+    site: FakeSite,
+    max_pages: int = 3,
+    known_urls: Container[str] = (),
+    parse_executor: Executor | None = None,
+    **config: Any,
+) -> list[OfferData]:
+    website = FakeWebsite(site, **config)
+
+    async def scrape() -> list[OfferData]:
+        return [
+            offer
+            async for offer in website.scrape(
+                "wroclaw",
+                max_pages=max_pages,
+                known_urls=known_urls,
+                parse_executor=parse_executor,
+            )
+        ]
+
+    return asyncio.run(scrape())
+
+
+def _urls(offers: list[OfferData]) -> list[str]:
+    return [offer.url for offer in offers]
+
+
+def test_offers_are_yielded_in_listing_order():
+    hrefs = [f"/offer/{i}" for i in range(5)]
+    # Every offer waits for the next one, so workers finish them in reverse
+    site = FakeSite(
+        {1: hrefs[:3], 2: hrefs[3:]},
+        after=dict(zip(hrefs, hrefs[1:])),
+    )
+    offers = _scrape(site, max_pages=2)
+    assert _urls(offers) == [f"https://fake.pl{href}" for href in hrefs]
+    assert site.finished == hrefs[::-1]
+    assert offers[0].text == "Offer /offer/0"
+
+
+def test_scraping_stops_at_an_empty_search_page():
+    site = FakeSite({1: ["/offer/a"], 2: [], 3: ["/offer/c"]})
+    assert _urls(_scrape(site, max_pages=3)) == ["https://fake.pl/offer/a"]
+    assert "/search/wroclaw?page=3" not in site.requested
+
+
+def test_known_and_duplicate_offers_are_skipped():
+    site = FakeSite(
+        {
+            1: ["/offer/a", "/offer/b", "/offer/b?promoted=1"],
+            2: ["https://fake.pl/offer/b/", "/offer/c"],
+        }
+    )
+    offers = _scrape(site, max_pages=2, known_urls={"https://fake.pl/offer/a"})
+    assert _urls(offers) == [
+        "https://fake.pl/offer/b",
+        "https://fake.pl/offer/c",
+    ]
+    assert "/offer/a" not in site.requested
+    assert site.requested.count("/offer/b") == 1
+
+
+def test_failed_offers_do_not_stop_the_others():
+    site = FakeSite(
+        {1: ["/offer/a", "/offer/missing", "/offer/c"]},
+        statuses={"/offer/missing": [404]},
+    )
+    assert _urls(_scrape(site, max_pages=1)) == [
+        "https://fake.pl/offer/a",
+        "https://fake.pl/offer/c",
+    ]
+
+
+def test_rate_limited_offers_are_retried():
+    site = FakeSite(
+        {1: ["/offer/a", "/offer/b"]}, statuses={"/offer/a": [429, 503]}
+    )
+    assert _urls(_scrape(site, max_pages=1)) == [
+        "https://fake.pl/offer/a",
+        "https://fake.pl/offer/b",
+    ]
+    assert site.requested.count("/offer/a") == 3
+
+
+def test_rate_limited_offers_fail_after_max_retries():
+    site = FakeSite(
+        {1: ["/offer/a", "/offer/b"]}, statuses={"/offer/a": [429] * 3}
+    )
+    offers = _scrape(site, max_pages=1, max_retries=2)
+    assert _urls(offers) == ["https://fake.pl/offer/b"]
+    assert site.requested.count("/offer/a") == 3
+
+
+def test_offers_are_parsed_in_the_executor():
+    hrefs = ["/offer/a", "/offer/broken", "/offer/c"]
+    site = FakeSite(
+        {1: hrefs},
+        after={"/offer/a": "/offer/c"},
+        bodies={"/offer/broken": "unparseable"},
+    )
+    with ThreadPoolExecutor(2) as executor:
+        offers = _scrape(site, max_pages=1, parse_executor=executor)
+    assert _urls(offers) == [
+        "https://fake.pl/offer/a",
+        "https://fake.pl/offer/c",
+    ]
+    assert [offer.text for offer in offers] == [
+        "Offer /offer/a",
+        "Offer /offer/c",
+    ]